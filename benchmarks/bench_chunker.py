@@ -0,0 +1,68 @@
+"""
+Benchmark prompt volume of the fixed-size Chunker against BoundaryChunker
+and ContentDefinedChunker.
+
+Each strategy chunks the same cleaned pages; the table shows chunk count,
+characters sent (overlap included) and total prompt tokens including the
+extraction prompt template, i.e. what the LLM stage is billed for.
+
+Usage:
+    python -m benchmarks.bench_chunker [PDF ...] [--chunk-size 4000]
+"""
+
+import argparse
+from pathlib import Path
+from typing import Callable, List
+
+from src.pdf_investor_summarizer.chunker import BoundaryChunker, Chunker, ContentDefinedChunker
+from src.pdf_investor_summarizer.extractor import PROMPT_TEMPLATE
+from src.pdf_investor_summarizer.pdf_loader import PdfLoader
+from src.pdf_investor_summarizer.text_cleaner import TextCleaner
+from src.pdf_investor_summarizer.utils.cost import count_tokens
+
+DEFAULT_PDF = Path(__file__).resolve().parent.parent / "tests" / "assets" / "company_report.pdf"
+
+
+def token_counter() -> Callable[[str], int]:
+    try:
+        count_tokens("probe")
+        return count_tokens
+    except Exception as e:  # tiktoken downloads its encoding on first use
+        print(f"tiktoken encoding unavailable ({type(e).__name__}); estimating 4 chars/token.")
+        return lambda text: (len(text) + 3) // 4
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", type=Path, default=[DEFAULT_PDF])
+    parser.add_argument("--chunk-size", type=int, default=4000)
+    parser.add_argument("--overlap", type=int, default=400, help="Overlap of the fixed-size splitter.")
+    parser.add_argument("--boundary-overlap", type=int, default=200)
+    args = parser.parse_args()
+
+    count = token_counter()
+    template_tokens = count(PROMPT_TEMPLATE.format(chunk=""))
+    raw_pages: List[str] = []
+    for pdf in args.pdfs:
+        with PdfLoader(pdf) as loader:
+            raw_pages.extend(loader.load())
+
+    strategies = [
+        (f"Chunker(overlap={args.overlap})", Chunker(args.chunk_size, args.overlap)),
+        (f"BoundaryChunker(overlap={args.boundary_overlap})", BoundaryChunker(args.chunk_size, args.boundary_overlap)),
+        (
+            f"ContentDefinedChunker(overlap={args.boundary_overlap})",
+            ContentDefinedChunker(args.chunk_size, args.boundary_overlap),
+        ),
+    ]
+    print(f"{len(raw_pages)} pages, prompt template = {template_tokens} tokens")
+    print(f"{'strategy':<34} {'chunks':>7} {'chars':>9} {'prompt tokens':>14}")
+    for name, chunker in strategies:
+        pages = TextCleaner(keep_paragraphs=chunker.paragraph_aware).clean_pages(raw_pages)
+        chunks = [c.text for c in chunker.split_pages(pages)]
+        tokens = sum(count(c) for c in chunks) + template_tokens * len(chunks)
+        print(f"{name:<34} {len(chunks):>7} {sum(map(len, chunks)):>9} {tokens:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Aggregate throughput of ``analyze_async`` with N documents analyzed
+concurrently on one event loop.
+
+Generates distinct synthetic reports (text pages plus image-only pages for
+the OCR path) and analyzes N of them at once with ``asyncio.gather`` against
+a local FakeChatModel, for each N and each way of preparing documents:
+
+* ``inline``: loading, OCR, cleaning and chunking on the event loop (the
+  behaviour before ``prepare_executor``), so documents are parsed one after
+  the other and the loop stalls meanwhile;
+* ``thread``: the loop's default thread pool (the default);
+* ``process``: a shared ProcessPoolExecutor of ``--workers`` processes.
+
+Each run happens in a fresh process with an empty cache. The table shows
+documents/sec, pages/sec and the longest event loop stall, measured by a
+ticker task that should wake up every 10 ms:
+
+    python -m benchmarks.bench_concurrent --pages 60 --concurrency 1 4 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.bench_pipeline import fake_ocr_image
+from benchmarks.fake_llm import FakeChatModel, ensure_token_counting
+from benchmarks.synthetic import write_pdf
+
+EXECUTORS = ("inline", "thread", "process")
+TICK = 0.01
+
+
+class InlineExecutor(Executor):
+    """Runs submitted calls immediately in the caller's thread, blocking the event loop."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def install_fakes(config: Dict[str, Any]) -> None:
+    """Quiet logging and simulated OCR; also the initializer of pool workers."""
+    import logging
+
+    from src.pdf_investor_summarizer import pdf_loader
+
+    logging.basicConfig(level=logging.ERROR)
+    pdf_loader._ocr_image = partial(fake_ocr_image, latency=config["ocr_latency"])
+    pdf_loader.PdfLoader._rasterize = lambda self, first, last, dpi=None: [None] * (last - first + 1)
+
+
+async def _analyze_all(analyzer, sources: List[Path]) -> Dict[str, Any]:
+    stalls = [0.0]
+
+    async def ticker():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(TICK)
+            now = time.perf_counter()
+            stalls.append(now - last - TICK)
+            last = now
+
+    tick = asyncio.ensure_future(ticker())
+    started = time.perf_counter()
+    results = await asyncio.gather(*(analyzer.analyze_async(source) for source in sources))
+    elapsed = time.perf_counter() - started
+    tick.cancel()
+    await analyzer.aclose()
+    return {"seconds": elapsed, "max_stall": max(stalls), "results": results}
+
+
+def run_scenario(kind: str, sources: List[Path], config: Dict[str, Any], cache_dir: Path) -> Dict[str, Any]:
+    """Analyze `sources` concurrently; meant to execute in its own process."""
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    from src.pdf_investor_summarizer.report_analyzer import ReportAnalyzer
+    from src.pdf_investor_summarizer.utils.cache import configure_cache
+
+    configure_cache(path=cache_dir)
+    ensure_token_counting()
+    install_fakes(config)
+
+    if kind == "process":
+        executor: Optional[Executor] = ProcessPoolExecutor(
+            max_workers=config["workers"], initializer=install_fakes, initargs=(config,)
+        )
+    else:
+        executor = InlineExecutor() if kind == "inline" else None
+    analyzer = ReportAnalyzer(
+        chunk_size=config["chunk_size"],
+        overlap=config["overlap"],
+        loader_kwargs={"ocr_workers": config["ocr_workers"]},
+        scheduler_kwargs={"max_concurrency": config["max_concurrency"]},
+        prepare_executor=executor,
+    )
+    llm = FakeChatModel(latency=config["latency"], jitter=config["jitter"], seed=config["seed"])
+    analyzer.extractor.llm = llm
+    try:
+        run = asyncio.run(_analyze_all(analyzer, sources))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    elapsed = run["seconds"]
+    pages = sum(r["metrics"]["counters"].get("pages", 0) for r in run["results"])
+    return {
+        "documents": len(sources),
+        "seconds": round(elapsed, 3),
+        "documents_per_sec": round(len(sources) / elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 2),
+        "max_loop_stall_ms": round(run["max_stall"] * 1000, 1),
+        "llm_requests": llm.stats["requests"],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60, help="Pages per document.")
+    parser.add_argument("--image-every", type=int, default=10, help="Every n-th page is image-only (0: none).")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Documents analyzed at once.")
+    parser.add_argument("--executors", nargs="+", choices=EXECUTORS, default=list(EXECUTORS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Processes of the process executor.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean fake LLM latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--chunk-size", type=int, default=4000)
+    parser.add_argument("--overlap", type=int, default=400)
+    parser.add_argument("--ocr-workers", type=int, default=1)
+    parser.add_argument("--ocr-latency", type=float, default=0.05, help="Simulated OCR seconds per page.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = {
+        "workers": args.workers,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "max_concurrency": args.max_concurrency,
+        "chunk_size": args.chunk_size,
+        "overlap": args.overlap,
+        "ocr_workers": args.ocr_workers,
+        "ocr_latency": args.ocr_latency,
+        "seed": args.seed,
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Distinct documents, so concurrent analyses share no LLM cache entries
+        sources = [
+            write_pdf(Path(tmp) / f"report-{i}.pdf", args.pages, image_every=args.image_every,
+                      title=f"Synthetic Annual Report {i}")
+            for i in range(max(args.concurrency))
+        ]
+        for kind in args.executors:
+            for n in args.concurrency:
+                name = f"{kind} x{n}"
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    results[name] = pool.submit(
+                        run_scenario, kind, sources[:n], config, Path(tmp) / f"cache-{kind}-{n}"
+                    ).result()
+
+    print(f"{args.pages} pages per document ({args.image_every and args.pages // args.image_every} image-only), "
+          f"LLM latency {args.latency}s, {args.workers} worker processes")
+    print(f"{'scenario':<14} {'seconds':>8} {'docs/s':>7} {'pages/s':>8} {'max stall ms':>13} {'requests':>9}")
+    for name, r in results.items():
+        print(f"{name:<14} {r['seconds']:>8.2f} {r['documents_per_sec']:>7.2f} {r['pages_per_sec']:>8.1f} "
+              f"{r['max_loop_stall_ms']:>13.1f} {r['llm_requests']:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
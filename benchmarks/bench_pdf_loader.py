@@ -0,0 +1,60 @@
+"""
+Benchmark PdfLoader text extraction time as a function of page count.
+
+Compares the legacy per-page ``extract_text(path, page_numbers=[i])`` loop
+(which re-parses the document for every page) against the single-pass
+``_extract_page_texts`` engine used by ``PdfLoader.load``.
+
+Usage:
+    python -m benchmarks.bench_pdf_loader --pages 10 50 100 200
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from pdfminer.high_level import extract_text
+
+from benchmarks.synthetic import write_pdf
+from src.pdf_investor_summarizer.pdf_loader import _extract_page_texts
+
+
+def legacy_load(pdf_path: Path, num_pages: int) -> List[str]:
+    return [extract_text(str(pdf_path), page_numbers=[i]) for i in range(num_pages)]
+
+
+def single_pass_load(pdf_path: Path) -> List[str]:
+    return list(_extract_page_texts(pdf_path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the single-pass engine.")
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'legacy s':>10} {'single s':>10} {'speedup':>8} {'ms/page':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_pages in args.pages:
+            pdf_path = write_pdf(Path(tmp) / f"synthetic_{num_pages}.pdf", num_pages)
+
+            start = time.perf_counter()
+            pages = single_pass_load(pdf_path)
+            single = time.perf_counter() - start
+
+            if args.skip_legacy:
+                legacy_str, speedup = "-", "-"
+            else:
+                start = time.perf_counter()
+                expected = legacy_load(pdf_path, num_pages)
+                legacy = time.perf_counter() - start
+                assert pages == expected, "single-pass output differs from legacy output"
+                legacy_str, speedup = f"{legacy:.2f}", f"{legacy / single:.1f}x"
+
+            print(f"{num_pages:>6} {legacy_str:>10} {single:>10.2f} {speedup:>8} {1000 * single / num_pages:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
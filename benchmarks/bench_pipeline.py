@@ -0,0 +1,208 @@
+"""
+End-to-end offline benchmark of ReportAnalyzer on a synthetic report.
+
+Generates a multi-hundred-page PDF (text pages plus image-only pages for the
+OCR path) and runs ``analyze`` and/or ``analyze_async`` against a local
+FakeChatModel with configurable latency and error rate. Each scenario runs in
+a fresh process with an empty cache; the table shows pages/sec, chunks/sec,
+peak RSS and the stage breakdown.
+
+OCR is simulated by default (``--ocr-latency`` seconds per page), so neither
+poppler nor Tesseract is needed; ``--real-ocr`` uses pdf2image + Tesseract.
+Injected LLM errors only apply to the async scenarios, which retry through
+the scheduler; the sync path has no retries.
+
+Save a baseline, then compare later runs against it; the exit status is 1
+if throughput drops or peak RSS grows by more than ``--tolerance``:
+
+    python -m benchmarks.bench_pipeline --pages 300 --save-baseline
+    python -m benchmarks.bench_pipeline --pages 300 --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.fake_llm import FakeChatModel, FakeRateLimitError, ensure_token_counting
+from benchmarks.synthetic import write_pdf
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+SCENARIOS = ("sync", "async", "async-streaming")
+
+# Metrics where higher is better, and where lower is better
+THROUGHPUT_METRICS = ("pages_per_sec", "chunks_per_sec")
+FOOTPRINT_METRICS = ("peak_rss_mb",)
+
+
+def fake_ocr_image(image, lang: str, timeout: float, latency: float = 0.05) -> Tuple[str, float]:
+    """Simulated Tesseract call; module-level so OCR worker processes can run it."""
+    time.sleep(latency)
+    return "Scanned page: revenue outlook remains stable for the coming year.", 90.0
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(scenario: str, pdf_path: Path, config: Dict[str, Any], cache_dir: Path) -> Dict[str, Any]:
+    """Run one scenario; meant to execute in its own process."""
+    import logging
+    import os
+
+    # Per-page and per-retry warnings would drown the report
+    logging.basicConfig(level=logging.ERROR)
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    from src.pdf_investor_summarizer import pdf_loader
+    from src.pdf_investor_summarizer.report_analyzer import ReportAnalyzer
+    from src.pdf_investor_summarizer.utils.cache import configure_cache
+
+    configure_cache(path=cache_dir)
+    ensure_token_counting()
+    if not config["real_ocr"]:
+        pdf_loader._ocr_image = partial(fake_ocr_image, latency=config["ocr_latency"])
+        pdf_loader.PdfLoader._rasterize = lambda self, first, last, dpi=None: [None] * (last - first + 1)
+
+    analyzer = ReportAnalyzer(
+        chunk_size=config["chunk_size"],
+        overlap=config["overlap"],
+        streaming=scenario == "async-streaming",
+        loader_kwargs={"ocr_workers": config["ocr_workers"]},
+        scheduler_kwargs={
+            "max_concurrency": config["max_concurrency"],
+            "base_delay": 0.01,
+            "max_delay": 0.1,
+            "retry_on": (FakeRateLimitError,),
+        },
+    )
+    is_sync = scenario == "sync"
+    llm = FakeChatModel(
+        latency=config["latency"],
+        jitter=config["jitter"],
+        error_rate=0.0 if is_sync else config["error_rate"],
+        seed=config["seed"],
+    )
+    analyzer.extractor.llm = llm
+
+    started = time.perf_counter()
+    if is_sync:
+        profiler = analyzer.new_profiler()
+        analyzer.analyze(pdf_path, profiler=profiler)
+        metrics = profiler.report()
+    else:
+        metrics = asyncio.run(analyzer.analyze_async(pdf_path))["metrics"]
+    elapsed = time.perf_counter() - started
+
+    pages = metrics["counters"].get("pages", 0)
+    chunks = metrics["counters"].get("chunks", 0)
+    return {
+        "seconds": round(elapsed, 3),
+        "pages": pages,
+        "chunks": chunks,
+        "pages_per_sec": round(pages / elapsed, 2),
+        "chunks_per_sec": round(chunks / elapsed, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "llm_requests": llm.stats["requests"],
+        "llm_errors": llm.stats["errors"],
+        "llm_p50": metrics["llm_latency"]["p50"],
+        "llm_p95": metrics["llm_latency"]["p95"],
+        "stages": metrics["stages"],
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Return one message per metric that regressed by more than `tolerance` (a fraction)."""
+    regressions = []
+    for scenario, current in results.items():
+        reference = baseline.get(scenario)
+        if not reference:
+            continue
+        for metric in THROUGHPUT_METRICS:
+            if current[metric] < reference[metric] * (1 - tolerance):
+                regressions.append(f"{scenario}: {metric} {current[metric]} < baseline {reference[metric]}")
+        for metric in FOOTPRINT_METRICS:
+            if current[metric] > reference[metric] * (1 + tolerance):
+                regressions.append(f"{scenario}: {metric} {current[metric]} > baseline {reference[metric]}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--image-every", type=int, default=10, help="Every n-th page is image-only (0: none).")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean fake LLM latency in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--chunk-size", type=int, default=4000)
+    parser.add_argument("--overlap", type=int, default=400)
+    parser.add_argument("--ocr-workers", type=int, default=1)
+    parser.add_argument("--ocr-latency", type=float, default=0.05, help="Simulated OCR seconds per page.")
+    parser.add_argument("--real-ocr", action="store_true", help="Use pdf2image + Tesseract instead of simulated OCR.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=None, help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", nargs="?", type=Path, const=DEFAULT_BASELINE, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression.")
+    args = parser.parse_args(argv)
+
+    config = {
+        "pages": args.pages,
+        "image_every": args.image_every,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "max_concurrency": args.max_concurrency,
+        "chunk_size": args.chunk_size,
+        "overlap": args.overlap,
+        "ocr_workers": args.ocr_workers,
+        "ocr_latency": args.ocr_latency,
+        "real_ocr": args.real_ocr,
+        "seed": args.seed,
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = write_pdf(Path(tmp) / "synthetic.pdf", args.pages, image_every=args.image_every)
+        for scenario in args.scenarios:
+            # A fresh process per scenario: independent peak RSS, cold caches
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                results[scenario] = pool.submit(
+                    run_scenario, scenario, pdf_path, config, Path(tmp) / f"cache-{scenario}"
+                ).result()
+
+    print(f"{args.pages} pages ({args.image_every and args.pages // args.image_every} image-only), "
+          f"LLM latency {args.latency}s, error rate {args.error_rate}")
+    print(f"{'scenario':<16} {'seconds':>8} {'pages/s':>8} {'chunks/s':>9} {'RSS MB':>7} {'requests':>9} {'p95 s':>6}  stages")
+    for scenario, r in results.items():
+        stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in r["stages"].items())
+        print(f"{scenario:<16} {r['seconds']:>8.2f} {r['pages_per_sec']:>8.1f} {r['chunks_per_sec']:>9.1f} "
+              f"{r['peak_rss_mb']:>7.1f} {r['llm_requests']:>9} {r['llm_p95']:>6.2f}  {stages}")
+
+    status = 0
+    if args.baseline is not None:
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if stored.get("config") != config:
+            print(f"warning: baseline was recorded with a different config: {stored.get('config')}")
+        regressions = compare(results, stored.get("scenarios", {}), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if not regressions:
+            print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+        status = 1 if regressions else 0
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps({"config": config, "scenarios": results}, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline saved to {args.save_baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Local stand-in for ChatOpenAI: configurable latency and error rate, no network."""
+
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.pdf_investor_summarizer.extractor import EXTRACTION_FIELDS
+
+_SECTION = re.compile(r"<<<BEGIN SECTION (\d+)>>>\n(.*?)\n<<<END SECTION \1>>>", re.S)
+_EXCERPT = re.compile(r"<<<BEGIN>>>\n(.*?)\n<<<END>>>", re.S)
+
+
+class FakeRateLimitError(Exception):
+    """Raised for injected failures; retried by LLMScheduler like a real 429."""
+
+
+class FakeResponse:
+    def __init__(self, content: str, usage: Dict[str, int]):
+        self.content = content
+        self.response_metadata = {"usage": usage}
+
+
+class FakeChatModel:
+    """
+    Answers extraction prompts (single or batched) with a valid JSON object
+    quoting the first sentence of each excerpt, after a simulated delay.
+
+    Parameters
+    ----------
+    latency : float
+        Mean seconds per request.
+    jitter : float
+        Latency is drawn uniformly from latency * [1 - jitter, 1 + jitter].
+    error_rate : float
+        Probability that a request raises FakeRateLimitError.
+    seed : int, optional
+        Seed for reproducible latencies and failures.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.5, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0}
+
+    def bind(self, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency * self.random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def _answer(self, prompt: str) -> FakeResponse:
+        self.stats["requests"] += 1
+        if self.random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            raise FakeRateLimitError("429 Too Many Requests (injected)")
+
+        def fields(excerpt: str) -> Dict[str, list]:
+            sentence = excerpt.strip().split(". ")[0][:200]
+            return {field: [sentence] if i == 0 and sentence else [] for i, field in enumerate(EXTRACTION_FIELDS)}
+
+        sections = _SECTION.findall(prompt)
+        if sections:
+            answer = {number: fields(text) for number, text in sections}
+        else:
+            match = _EXCERPT.search(prompt)
+            answer = fields(match.group(1) if match else "")
+        content = json.dumps(answer)
+        # ~4 characters per token, good enough for usage accounting
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+        return FakeResponse(content, usage)
+
+    def invoke(self, prompt: str) -> FakeResponse:
+        time.sleep(self._delay())
+        return self._answer(prompt)
+
+    async def ainvoke(self, prompt: str) -> FakeResponse:
+        await asyncio.sleep(self._delay())
+        return self._answer(prompt)
+
+
+class ApproximateEncoding:
+    """Offline stand-in for a tiktoken encoding: about 4 characters per token."""
+
+    name = "approximate"
+
+    def encode(self, text: str, disallowed_special=()) -> List[int]:
+        return [0] * ((len(text) + 3) // 4)
+
+    def encode_batch(self, texts: Sequence[str], num_threads: int = 8, disallowed_special=()) -> List[List[int]]:
+        return [self.encode(text) for text in texts]
+
+
+def ensure_token_counting(model: str = "gpt-3.5-turbo") -> None:
+    """
+    Make token counting work offline: tiktoken downloads its encodings on
+    first use, so fall back to ApproximateEncoding when that fails.
+    """
+    from src.pdf_investor_summarizer.utils import cost
+
+    try:
+        cost.get_encoding(model)
+    except Exception as e:
+        print(f"tiktoken encoding unavailable ({type(e).__name__}); estimating 4 chars/token.")
+        cost._encodings[model] = ApproximateEncoding()
@@ -0,0 +1,169 @@
+"""Generate synthetic multi-page PDFs for benchmarks (no third-party writer needed)."""
+
+import zlib
+from pathlib import Path
+from typing import List, Tuple, Union
+
+PARAGRAPHS = [
+    "Revenue grew 12% year over year, driven by strong demand in the cloud segment.",
+    "Management expects operating margin to expand by 150 basis points next year.",
+    "The company completed the acquisition of a regional logistics provider in Q3.",
+    "A new share buyback programme of $500 million was approved by the board.",
+    "Input cost inflation remains a key risk for the consumer products division.",
+    "Capital expenditure will be focused on automation and new manufacturing capacity.",
+    "The group entered two new markets in Southeast Asia during the reporting period.",
+    "Net debt decreased to 1.2x EBITDA following strong free cash flow generation.",
+]
+
+
+STATEMENT = [
+    ("", "2023", "2022"),
+    ("Revenue", "12,345", "11,020"),
+    ("Cost of sales", "(7,210)", "(6,540)"),
+    ("Gross profit", "5,135", "4,480"),
+    ("Operating expenses", "(2,900)", "(2,710)"),
+    ("Operating profit", "2,235", "1,770"),
+    ("Net finance costs", "(310)", "(295)"),
+    ("Profit before tax", "1,925", "1,475"),
+    ("Income tax expense", "(480)", "(369)"),
+    ("Profit for the year", "1,445", "1,106"),
+    ("Earnings per share (pence)", "42.1", "32.4"),
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(page_index: int, lines_per_page: int, title: str = "Synthetic Annual Report") -> bytes:
+    ops = ["BT", "/F1 10 Tf", "12 TL", "50 790 Td"]
+    ops.append(f"({_escape(title)} - page {page_index + 1}) Tj T*")
+    for line in range(lines_per_page):
+        text = PARAGRAPHS[(page_index + line) % len(PARAGRAPHS)]
+        ops.append(f"({_escape(text)}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1")
+
+
+def _statement_stream(page_index: int) -> bytes:
+    """A financial statement page: every cell placed on its own, like real report tables."""
+
+    def text_at(x: int, y: int, text: str) -> str:
+        return f"BT /F1 10 Tf 1 0 0 1 {x} {y} Tm ({_escape(text)}) Tj ET"
+
+    ops = [text_at(50, 790, f"Consolidated income statement - page {page_index + 1}")]
+    y = 760
+    for label, current, previous in STATEMENT:
+        if label:
+            ops.append(text_at(50, y, label))
+        ops.append(text_at(330, y, current))
+        ops.append(text_at(430, y, previous))
+        y -= 14
+    ops.append(text_at(50, y - 20, PARAGRAPHS[page_index % len(PARAGRAPHS)]))
+    return "\n".join(ops).encode("latin-1")
+
+
+def _scan_image(lines: int = 6) -> Tuple[int, int, bytes]:
+    """
+    Render report sentences into an 8-bit grayscale bitmap, standing in for a
+    scanned page: it has no text layer, so the loader must OCR it.
+
+    Returns
+    -------
+    Tuple[int, int, bytes]
+        Width, height and Flate-compressed pixel rows.
+    """
+    from PIL import Image, ImageDraw
+
+    width, height = 1200, 40 + 30 * lines
+    image = Image.new("L", (width, height), color=255)
+    draw = ImageDraw.Draw(image)
+    for i in range(lines):
+        draw.text((20, 20 + 30 * i), PARAGRAPHS[i % len(PARAGRAPHS)], fill=0)
+    return width, height, zlib.compress(image.tobytes())
+
+
+def build_pdf(
+    num_pages: int,
+    lines_per_page: int = 40,
+    image_every: int = 0,
+    table_every: int = 0,
+    title: str = "Synthetic Annual Report",
+) -> bytes:
+    """
+    Build a PDF with `num_pages` pages of report-like sentences.
+
+    Parameters
+    ----------
+    num_pages : int
+        Number of pages.
+    lines_per_page : int
+        Sentences per text page.
+    image_every : int
+        If > 0, every `image_every`-th page is image-only (a scanned-looking
+        bitmap without a text layer) to exercise the OCR path.
+    table_every : int
+        If > 0, every `table_every`-th text page is an income statement table.
+    title : str
+        Heading of every text page; distinct titles give distinct documents.
+
+    Returns
+    -------
+    bytes
+        The complete PDF document.
+    """
+    objects: List[bytes] = []
+    # 1: catalog, 2: pages tree, 3: font, 4: scan image, then (page, content) pairs
+    page_ids = [5 + 2 * i for i in range(num_pages)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {num_pages} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    if image_every > 0:
+        width, height, pixels = _scan_image()
+        objects.append(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+            b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % (width, height, len(pixels))
+            + pixels + b"\nendstream"
+        )
+    else:
+        objects.append(b"<< >>")
+    for i, pid in enumerate(page_ids):
+        scanned = image_every > 0 and (i + 1) % image_every == 0
+        resources = "/XObject << /Im1 4 0 R >>" if scanned else "/Font << /F1 3 0 R >>"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << {resources} >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        if scanned:
+            stream = b"q 495 0 0 110 50 680 cm /Im1 Do Q"
+        elif table_every > 0 and (i + 1) % table_every == 0:
+            stream = _statement_stream(i)
+        else:
+            stream = _page_stream(i, lines_per_page, title)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+
+def write_pdf(
+    path: Union[str, Path],
+    num_pages: int,
+    lines_per_page: int = 40,
+    image_every: int = 0,
+    table_every: int = 0,
+    title: str = "Synthetic Annual Report",
+) -> Path:
+    path = Path(path)
+    path.write_bytes(build_pdf(num_pages, lines_per_page, image_every, table_every, title))
+    return path
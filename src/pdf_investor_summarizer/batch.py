@@ -0,0 +1,216 @@
+# src/pdf_investor_summarizer/batch.py
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+from src.pdf_investor_summarizer.report_analyzer import ReportAnalyzer, prepare_chunks_report
+
+
+def _write_json_atomic(path: Path, data: Any) -> None:
+    """Write JSON via a temp file and rename, so a crash never leaves a truncated file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_name, path)
+
+
+def discover_pdfs(inputs: Iterable[Path]) -> List[Path]:
+    """
+    Expand input paths into a sorted list of PDF files: directories are
+    searched recursively for *.pdf, files are taken as-is.
+    """
+    found: List[Path] = []
+    for item in inputs:
+        item = Path(item)
+        if item.is_dir():
+            found.extend(p for p in item.rglob("*") if p.is_file() and p.suffix.lower() == ".pdf")
+        else:
+            found.append(item)
+    return sorted(set(found))
+
+
+class Manifest:
+    """
+    Per-document processing status persisted next to the outputs, used to
+    resume a batch after a crash. A document is skipped on resume only if it
+    finished successfully and its size and mtime are unchanged.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            self.documents: Dict[str, Dict[str, Any]] = json.loads(path.read_text(encoding="utf-8"))["documents"]
+        except FileNotFoundError:
+            self.documents = {}
+
+    @staticmethod
+    def _fingerprint(source: Path) -> Optional[Dict[str, Any]]:
+        """Size and mtime of `source`, or None if it cannot be stat'ed (missing, unreadable)."""
+        try:
+            stat = source.stat()
+        except OSError:
+            return None
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_done(self, source: Path) -> bool:
+        entry = self.documents.get(str(source))
+        return bool(entry) and entry.get("fingerprint") is not None and entry.get("status") == "done" and entry.get("fingerprint") == self._fingerprint(source)
+
+    def record(self, source: Path, status: str, **fields: Any) -> None:
+        self.documents[str(source)] = {
+            "status": status,
+            "fingerprint": self._fingerprint(source),
+            "updated": time.time(),
+            **fields,
+        }
+        _write_json_atomic(self.path, {"documents": self.documents})
+
+
+class BatchRunner:
+    """
+    Analyzes many PDFs: loading, OCR, cleaning and chunking run in a process
+    pool, while every document's chunks go through one shared async LLM
+    dispatcher (a single ReportAnalyzer, hence one Extractor and one
+    LLMScheduler with a global concurrency cap and rate budgets).
+
+    Each document's summary is written to ``output_dir/<relative path>.json``
+    and its status to ``output_dir/manifest.json``.
+
+    Parameters
+    ----------
+    output_dir : Path
+        Directory for per-document JSON outputs and the manifest.
+    workers : int
+        Processes used for the CPU-bound preparation stage.
+    max_documents : int, optional
+        Documents in flight at once (being prepared, extracted or written),
+        bounding memory on long queues. Defaults to 4 * workers, enough to
+        keep the pool busy while earlier documents wait for the LLM.
+    analyzer_kwargs : dict, optional
+        Options for the shared ReportAnalyzer.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(
+        self,
+        output_dir: Path,
+        workers: int = 4,
+        analyzer_kwargs: Optional[dict] = None,
+        max_documents: Optional[int] = None,
+    ):
+        self.output_dir = Path(output_dir)
+        self.workers = max(1, workers)
+        self.max_documents = max(1, max_documents or 4 * self.workers)
+        self.analyzer = ReportAnalyzer(**(analyzer_kwargs or {}))
+        self.manifest = Manifest(self.output_dir / self.MANIFEST_NAME)
+
+    def output_path(self, source: Path, root: Optional[Path] = None) -> Path:
+        """
+        Output JSON of `source`: its path relative to `root` mirrored under
+        output_dir, or, outside a common root, ``<stem>-<hash>.json`` with a
+        short hash of the resolved source path, so that same-named PDFs from
+        different directories do not overwrite each other.
+        """
+        if root is not None and source.is_relative_to(root):
+            return self.output_dir / source.relative_to(root).with_suffix(".json")
+        digest = hashlib.blake2b(str(Path(source).resolve()).encode("utf-8"), digest_size=4).hexdigest()
+        return self.output_dir / f"{source.stem}-{digest}.json"
+
+    def check_outputs(self, sources: List[Path], root: Optional[Path] = None) -> None:
+        """Raise ValueError if two sources would be written to the same output file."""
+        seen: Dict[Path, Path] = {}
+        for source in sources:
+            output = self.output_path(source, root)
+            if output in seen:
+                raise ValueError(f"{seen[output]} and {source} would both be written to {output}")
+            seen[output] = source
+
+    async def _process(self, source: Path, root: Optional[Path], pool: Executor) -> bool:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        profiler = self.analyzer.new_profiler()
+        try:
+            chunks, report = await loop.run_in_executor(
+                pool,
+                prepare_chunks_report,
+                source,
+                self.analyzer.cleaner,
+                self.analyzer.chunker,
+                self.analyzer.loader_kwargs,
+            )
+            # Load, OCR, clean and chunk timings and counters from the worker process
+            profiler.absorb(report)
+            result = await self.analyzer.analyze_chunks_async(
+                [chunk.text for chunk in chunks], profiler=profiler, pages=[chunk.pages for chunk in chunks]
+            )
+            output = self.output_path(source, root)
+            _write_json_atomic(output, result)
+        except Exception as e:
+            logger.error(f"Failed to analyze {source}: {e}")
+            self.manifest.record(source, "failed", error=f"{type(e).__name__}: {e}")
+            return False
+        elapsed = time.perf_counter() - started
+        logger.info(f"Analyzed {source} ({len(chunks)} chunks) in {elapsed:.1f}s -> {output}")
+        self.manifest.record(source, "done", output=str(output), chunks=len(chunks), seconds=round(elapsed, 3))
+        return True
+
+    async def run(self, sources: Iterable[Path], root: Optional[Path] = None) -> Dict[str, int]:
+        """
+        Analyze every source not already completed according to the manifest.
+        The analyzer's clients and connection pools, bound to the running
+        event loop, are closed on return.
+
+        Parameters
+        ----------
+        sources : iterable of Path
+            PDF files to process.
+        root : Path, optional
+            Base directory used to mirror input paths under output_dir.
+
+        Returns
+        -------
+        dict
+            Counts of "done", "failed" and "skipped" documents.
+
+        Raises
+        ------
+        ValueError
+            If two sources map to the same output file; nothing is processed.
+        """
+        try:
+            return await self._run(list(sources), root)
+        finally:
+            await self.analyzer.aclose()
+            # Shared clients included: their async pool does not outlive this event loop
+            await self.analyzer.clients.aclose()
+
+    async def _run(self, sources: List[Path], root: Optional[Path]) -> Dict[str, int]:
+        self.check_outputs(sources, root)
+        todo = [s for s in sources if not self.manifest.is_done(s)]
+        counts = {"done": 0, "failed": 0, "skipped": len(sources) - len(todo)}
+        logger.info(f"Batch: {len(todo)} to process, {counts['skipped']} already done.")
+        if not todo:
+            return counts
+        slots = asyncio.Semaphore(self.max_documents)
+
+        async def bounded(source: Path, pool: Executor) -> bool:
+            async with slots:
+                return await self._process(source, root, pool)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            outcomes = await asyncio.gather(*(bounded(s, pool) for s in todo))
+        counts["done"] = sum(outcomes)
+        counts["failed"] = len(outcomes) - counts["done"]
+        return counts
@@ -1,9 +1,26 @@
 """Chunk text into overlapping segments."""
 
-from typing import List
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Sequence, Tuple
+import re
+import zlib
 import logging
 logger = logging.getLogger(__name__)
 
+from src.pdf_investor_summarizer.utils.cost import get_encoding
+
+Span = Tuple[int, int]
+
+
+@dataclass
+class Chunk:
+    """A chunk of text and the 0-based indices of the pages it was taken from."""
+
+    text: str
+    pages: List[int] = field(default_factory=list)
+
+
 class Chunker:
     """Splits text into fixed-size chunks with overlap.
 
@@ -15,22 +32,373 @@ class Chunker:
         Overlap size between consecutive chunks.
     """
 
+    # Whether chunking benefits from the cleaner keeping paragraph breaks
+    paragraph_aware = False
+
     def __init__(self, chunk_size: int = 4000, overlap: int = 400) -> None:
         self.chunk_size = chunk_size
         self.overlap = overlap
 
-    def split(self, text: str) -> List[str]:
-        chunks: List[str] = []
+    def spans(self, text: str) -> List[Span]:
+        """Return the (start, end) character offsets of each chunk of `text`."""
+        spans: List[Span] = []
         start = 0
         while start < len(text):
             end = min(start + self.chunk_size, len(text))
-            chunks.append(text[start:end])
-            logger.debug(f"Chunk {len(chunks)-1}: {repr(text[start:end][:100])} ...")
+            spans.append((start, end))
             if end == len(text):
                 break
             step = self.chunk_size - self.overlap
             if step < 1:
                 step = 1
             start += step
+        return spans
+
+    def split(self, text: str) -> List[str]:
+        chunks: List[str] = []
+        for start, end in self.spans(text):
+            chunks.append(text[start:end])
+            logger.debug(f"Chunk {len(chunks)-1}: {repr(text[start:end][:100])} ...")
         return chunks
 
+    def _page_spans(self, text: str, page_starts: Sequence[int]) -> List[Span]:
+        """Chunk spans for text joined from pages starting at `page_starts`."""
+        return self.spans(text)
+
+    def split_pages(self, pages: Sequence[str], sep: str = "\n") -> List[Chunk]:
+        """
+        Chunk ``sep.join(pages)`` and record which pages each chunk came from.
+        """
+        page_starts: List[int] = []
+        pos = 0
+        for page in pages:
+            page_starts.append(pos)
+            pos += len(page) + len(sep)
+        text = sep.join(pages)
+        chunks: List[Chunk] = []
+        for start, end in self._page_spans(text, page_starts):
+            chunks.append(self._page_chunk(text[start:end], start, page_starts))
+            logger.debug(f"Chunk {len(chunks)-1} (pages {chunks[-1].pages}): {repr(text[start:end][:100])} ...")
+        return chunks
+
+    def iter_split(self, pieces: Iterable[str], sep: str = "\n") -> Iterator[str]:
+        """
+        Incrementally chunk a stream of text pieces (e.g. cleaned pages).
+
+        Yields exactly the chunks that ``split(sep.join(pieces))`` would return,
+        but emits each one as soon as enough text has arrived, holding at most
+        ``chunk_size`` characters plus the current piece in memory.
+        """
+        for chunk in self.iter_split_pages(pieces, sep):
+            yield chunk.text
+
+    def iter_split_pages(self, pages: Iterable[str], sep: str = "\n") -> Iterator[Chunk]:
+        """
+        Incremental split_pages: yields exactly the chunks, page indices
+        included, that ``split_pages(list(pages))`` would return, each as soon
+        as enough text has arrived.
+        """
+        step = max(self.chunk_size - self.overlap, 1)
+        buffer = None
+        # Offset of buffer[0] in the joined text, and where each page starts in it
+        offset = 0
+        page_starts: List[int] = []
+        count = 0
+        for page in pages:
+            if buffer is None:
+                page_starts.append(0)
+                buffer = page
+            else:
+                page_starts.append(offset + len(buffer) + len(sep))
+                buffer = buffer + sep + page
+            # A chunk is final only once text exists beyond its end
+            while len(buffer) > self.chunk_size:
+                chunk = self._page_chunk(buffer[:self.chunk_size], offset, page_starts)
+                logger.debug(f"Chunk {count} (pages {chunk.pages}): {repr(chunk.text[:100])} ...")
+                count += 1
+                yield chunk
+                buffer = buffer[step:]
+                offset += step
+        if buffer:
+            chunk = self._page_chunk(buffer, offset, page_starts)
+            logger.debug(f"Chunk {count} (pages {chunk.pages}): {repr(chunk.text[:100])} ...")
+            yield chunk
+
+    @staticmethod
+    def _page_chunk(text: str, start: int, page_starts: Sequence[int]) -> Chunk:
+        """Chunk of `text` found at `start` in text joined from pages starting at `page_starts`."""
+        end = start + len(text)
+        first = bisect_right(page_starts, start) - 1
+        last = bisect_right(page_starts, max(end - 1, start)) - 1
+        return Chunk(text, list(range(first, last + 1)))
+
+
+class TokenChunker(Chunker):
+    """Splits text into chunks of a fixed token budget with token overlap.
+
+    The text is encoded once with the model's tiktoken encoding; chunk
+    boundaries are chosen on token offsets and mapped back to character
+    positions with a single ``decode_with_offsets`` call, so no candidate chunk
+    is ever re-encoded. Each chunk is the exact source text of its token range
+    (re-encoding it in isolation may differ by a token at the edges).
+
+    Parameters
+    ----------
+    chunk_size : int
+        Maximum tokens per chunk.
+    overlap : int
+        Overlap in tokens between consecutive chunks.
+    model : str
+        Model whose tiktoken encoding is used.
+    encoding : tiktoken.Encoding, optional
+        Encoding to use instead of looking one up for `model`.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        overlap: int = 100,
+        model: str = "gpt-3.5-turbo",
+        encoding=None,
+    ) -> None:
+        super().__init__(chunk_size, overlap)
+        self.model = model
+        self._encoding = encoding
+
+    @property
+    def encoding(self):
+        if self._encoding is None:
+            self._encoding = get_encoding(self.model)
+        return self._encoding
+
+    def spans(self, text: str) -> List[Span]:
+        if not text:
+            return []
+        # Special-token strings in report text are ordinary text here
+        tokens = self.encoding.encode(text, disallowed_special=())
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        bounds = offsets + [len(text)]
+        step = max(self.chunk_size - self.overlap, 1)
+        spans: List[Span] = []
+        start = 0
+        while start < len(tokens):
+            end = min(start + self.chunk_size, len(tokens))
+            spans.append((bounds[start], bounds[end]))
+            if end == len(tokens):
+                break
+            start += step
+        return spans
+
+    def iter_split(self, pieces: Iterable[str], sep: str = "\n") -> Iterator[str]:
+        """
+        Token boundaries depend on neighbouring text, so the stream is joined
+        and split in one go; chunks are still yielded one at a time.
+        """
+        yield from self.split(sep.join(pieces))
+
+    def iter_split_pages(self, pages: Iterable[str], sep: str = "\n") -> Iterator[Chunk]:
+        """Like iter_split, the stream is collected and split_pages runs in one go."""
+        yield from self.split_pages(list(pages), sep)
+
+
+class BoundaryChunker(Chunker):
+    """Splits text into chunks that end on page, paragraph or sentence edges.
+
+    Each chunk is at most `chunk_size` characters. Within the last
+    ``(1 - min_fill)`` of that window the cut goes to the strongest boundary
+    available (page > paragraph > sentence, latest on ties), falling back to
+    a word boundary and finally a hard cut. Overlap is made of whole trailing
+    sentences of at most `overlap` characters, so a much smaller overlap
+    keeps the same context without re-sending sentence fragments.
+
+    Paragraphs are expected as ``"\\n"``-separated lines, as produced by
+    ``TextCleaner(keep_paragraphs=True)``.
+
+    Parameters
+    ----------
+    chunk_size : int
+        Maximum characters per chunk.
+    overlap : int
+        Maximum characters of whole sentences repeated from the previous chunk.
+    min_fill : float
+        Fraction of `chunk_size` a chunk must reach before a boundary is accepted.
+    """
+
+    paragraph_aware = True
+
+    SENTENCE = 1
+    PARAGRAPH = 2
+    PAGE = 3
+
+    _sentence_end = re.compile(r"[.!?…][\"'”’)\]]*\s+")
+    _paragraph_end = re.compile(r"\n+")
+
+    def __init__(self, chunk_size: int = 4000, overlap: int = 200, min_fill: float = 0.8) -> None:
+        super().__init__(chunk_size, overlap)
+        self.min_fill = min_fill
+
+    def spans(self, text: str) -> List[Span]:
+        return self._page_spans(text, [])
+
+    def _boundaries(self, text: str, page_starts: Sequence[int]) -> Tuple[List[int], List[int]]:
+        strength = {}
+        for m in self._sentence_end.finditer(text):
+            strength[m.end()] = self.SENTENCE
+        for m in self._paragraph_end.finditer(text):
+            strength[m.end()] = self.PARAGRAPH
+        for pos in page_starts[1:]:
+            strength[pos] = self.PAGE
+        positions = sorted(p for p in strength if 0 < p < len(text))
+        return positions, [strength[p] for p in positions]
+
+    def _page_spans(self, text: str, page_starts: Sequence[int]) -> List[Span]:
+        positions, strengths = self._boundaries(text, page_starts)
+        spans: List[Span] = []
+        start = 0
+        n = len(text)
+        while start < n:
+            limit = start + self.chunk_size
+            if limit >= n:
+                cut = n
+            else:
+                lo = bisect_left(positions, start + max(1, int(self.chunk_size * self.min_fill)))
+                hi = bisect_right(positions, limit)
+                cut = 0
+                best = 0
+                for i in range(lo, hi):
+                    if strengths[i] >= best:
+                        best, cut = strengths[i], positions[i]
+                if not cut:
+                    # No sentence edge in reach: cut after the last whitespace, else hard cut
+                    space = max(text.rfind(" ", start + 1, limit), text.rfind("\n", start + 1, limit))
+                    cut = space + 1 if space > start else limit
+            end = cut
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if end > start:
+                spans.append((start, end))
+            if cut >= n:
+                break
+            # Restart at the earliest sentence edge inside the overlap window
+            next_start = cut
+            i = bisect_left(positions, max(cut - self.overlap, start + 1))
+            if i < len(positions) and positions[i] < cut:
+                next_start = positions[i]
+            start = next_start
+        return spans
+
+    def iter_split(self, pieces: Iterable[str], sep: str = "\n") -> Iterator[str]:
+        """
+        Boundary choice needs look-ahead, so the stream is joined and split in
+        one go; chunks are still yielded one at a time.
+        """
+        yield from self.split(sep.join(pieces))
+
+    def iter_split_pages(self, pages: Iterable[str], sep: str = "\n") -> Iterator[Chunk]:
+        """Like iter_split, the stream is collected and split_pages runs in one go."""
+        yield from self.split_pages(list(pages), sep)
+
+
+class ContentDefinedChunker(Chunker):
+    """Splits text at content-defined sentence edges, for incremental re-analysis.
+
+    Whether a sentence (or paragraph, or page) edge becomes a cut depends only
+    on a hash of the text just before it and on the distance to the previous
+    edge, never on absolute offsets. An edit therefore changes only the chunks
+    around it: after the next anchored edge, chunking of an amended document
+    falls back in step with the original, so unchanged regions produce
+    identical chunks and hit the extraction cache.
+
+    An edge at ``gap`` characters from the previous edge is anchored with
+    probability ``gap / avg_gap`` (decided by its hash), which makes the
+    expected chunk length independent of sentence length. A chunk never
+    exceeds `chunk_size`: with no anchor in reach the edge with the lowest
+    hash is used, then a word boundary, then a hard cut. Overlap is made of
+    whole trailing sentences, as in BoundaryChunker.
+
+    Parameters
+    ----------
+    chunk_size : int
+        Maximum characters per chunk.
+    overlap : int
+        Maximum characters of whole sentences repeated from the previous chunk.
+    min_fill : float
+        Fraction of `chunk_size` a chunk must reach before an edge can anchor.
+        The average chunk lands about halfway between that and `chunk_size`.
+    window : int
+        Characters before an edge that are hashed to decide on it.
+    """
+
+    paragraph_aware = True
+
+    _edge = re.compile(r"[.!?…][\"'”’)\]]*\s+|\n+")
+
+    def __init__(self, chunk_size: int = 4000, overlap: int = 200, min_fill: float = 0.5, window: int = 48) -> None:
+        super().__init__(chunk_size, overlap)
+        self.min_fill = min_fill
+        self.window = window
+
+    def spans(self, text: str) -> List[Span]:
+        return self._page_spans(text, [])
+
+    def _edges(self, text: str, page_starts: Sequence[int]) -> Tuple[List[int], List[float]]:
+        """Edge positions and their normalized hashes in [0, 1)."""
+        positions = sorted({m.end() for m in self._edge.finditer(text)} | set(page_starts[1:]))
+        positions = [p for p in positions if 0 < p < len(text)]
+        hashes = [
+            zlib.crc32(text[max(0, p - self.window):p].encode("utf-8")) / 2 ** 32
+            for p in positions
+        ]
+        return positions, hashes
+
+    def _page_spans(self, text: str, page_starts: Sequence[int]) -> List[Span]:
+        positions, hashes = self._edges(text, page_starts)
+        min_size = max(1, int(self.chunk_size * self.min_fill))
+        avg_gap = max(1, (self.chunk_size - min_size) // 2)
+        spans: List[Span] = []
+        start = 0  # start of the chunk text (may reach back into the previous chunk)
+        cut = 0    # end of the previous chunk; sizes are measured from here
+        n = len(text)
+        while start < n:
+            limit = start + self.chunk_size
+            if limit >= n:
+                end_cut = n
+            else:
+                end_cut = 0
+                lo = bisect_left(positions, cut + min_size)
+                hi = bisect_right(positions, limit)
+                for i in range(lo, hi):
+                    gap = positions[i] - (positions[i - 1] if i else 0)
+                    if hashes[i] * avg_gap < gap:
+                        end_cut = positions[i]
+                        break
+                if not end_cut and lo < hi:
+                    end_cut = positions[min(range(lo, hi), key=hashes.__getitem__)]
+                if not end_cut:
+                    space = max(text.rfind(" ", start + 1, limit), text.rfind("\n", start + 1, limit))
+                    end_cut = space + 1 if space > start else limit
+            end = end_cut
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if end > start:
+                spans.append((start, end))
+            if end_cut >= n:
+                break
+            cut = end_cut
+            # Restart at the earliest sentence edge inside the overlap window
+            start = cut
+            i = bisect_left(positions, max(cut - self.overlap, spans[-1][0] + 1 if spans else 1))
+            if self.overlap and i < len(positions) and positions[i] < cut:
+                start = positions[i]
+        return spans
+
+    def iter_split(self, pieces: Iterable[str], sep: str = "\n") -> Iterator[str]:
+        """
+        Anchors depend on look-ahead up to `chunk_size`, so the stream is joined
+        and split in one go; chunks are still yielded one at a time.
+        """
+        yield from self.split(sep.join(pieces))
+
+    def iter_split_pages(self, pages: Iterable[str], sep: str = "\n") -> Iterator[Chunk]:
+        """Like iter_split, the stream is collected and split_pages runs in one go."""
+        yield from self.split_pages(list(pages), sep)
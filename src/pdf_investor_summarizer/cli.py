@@ -0,0 +1,134 @@
+# src/pdf_investor_summarizer/cli.py
+
+import asyncio
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from src.pdf_investor_summarizer.utils.cache import configure_cache, get_document_cache, purge
+
+app = typer.Typer(help="PDF Investor Summarizer command line tools.")
+cache_app = typer.Typer(help="Inspect and invalidate the LLM result cache.")
+app.add_typer(cache_app, name="cache")
+
+
+def _open_cache(backend: str, path: Optional[Path]):
+    # No memory tier: commands operate on the persistent entries only
+    return configure_cache(backend, path=path, memory_items=0)
+
+
+@cache_app.command("stats")
+def cache_stats(
+    backend: str = typer.Option("directory", help="directory or sqlite"),
+    path: Optional[Path] = typer.Option(None, help="Cache directory or database file."),
+) -> None:
+    """Show the number of entries and bytes in the cache."""
+    cache = _open_cache(backend, path)
+    entries = sum(1 for _ in cache.backend.items())
+    typer.echo(f"entries: {entries}")
+    typer.echo(f"bytes: {cache.backend.size_bytes()}")
+
+
+@cache_app.command("purge")
+def cache_purge(
+    errors: bool = typer.Option(True, help="Remove cached failures (results with an 'error' field)."),
+    stale: bool = typer.Option(False, help="Remove entries not keyed with the current versioned scheme."),
+    backend: str = typer.Option("directory", help="directory or sqlite"),
+    path: Optional[Path] = typer.Option(None, help="Cache directory or database file."),
+) -> None:
+    """Invalidate failed and/or stale cache entries."""
+    removed = purge(_open_cache(backend, path), errors=errors, stale=stale)
+    typer.echo(f"removed {removed} entries")
+
+
+@cache_app.command("clear")
+def cache_clear(
+    backend: str = typer.Option("directory", help="directory or sqlite"),
+    path: Optional[Path] = typer.Option(None, help="Cache directory or database file."),
+    documents: bool = typer.Option(False, help="Also remove cached document pages and OCR results."),
+) -> None:
+    """Remove every cache entry."""
+    _open_cache(backend, path).clear()
+    if documents:
+        get_document_cache().clear()
+    typer.echo("cache cleared")
+
+
+@app.command("batch")
+def batch(
+    inputs: List[Path] = typer.Argument(None, help="PDF files and/or directories searched recursively for PDFs."),
+    output_dir: Path = typer.Option(Path("summaries"), "--output-dir", "-o", help="Where JSON outputs and the manifest go."),
+    from_file: Optional[typer.FileText] = typer.Option(None, help="Queue file with one PDF path per line ('-' for stdin)."),
+    workers: int = typer.Option(4, help="Processes for loading, OCR, cleaning and chunking."),
+    max_docs: Optional[int] = typer.Option(None, help="Documents in flight at once (default: 4 x workers)."),
+    clean_workers: int = typer.Option(1, help="Processes per document for cleaning long documents' pages."),
+    max_concurrency: int = typer.Option(8, help="Concurrent LLM requests across all documents."),
+    requests_per_minute: Optional[float] = typer.Option(None, help="LLM request budget."),
+    tokens_per_minute: Optional[float] = typer.Option(None, help="LLM prompt-token budget."),
+    model: str = typer.Option("gpt-3.5-turbo", help="OpenAI chat model."),
+    chunk_size: int = typer.Option(4000, help="Characters per chunk."),
+    overlap: int = typer.Option(400, help="Characters of overlap between chunks."),
+    batch_tokens: Optional[int] = typer.Option(None, help="Pack small chunks, across documents, into requests of up to this many tokens."),
+    document_cache: bool = typer.Option(True, help="Reuse cached page texts and OCR results of already-seen PDFs."),
+    content_defined: bool = typer.Option(
+        False, help="Content-defined chunks: re-analyzing an amended PDF only re-extracts the changed regions."
+    ),
+    strip_boilerplate: bool = typer.Option(
+        False, help="Drop headers, footers and disclaimers repeated on many pages before chunking."
+    ),
+    tables: str = typer.Option("keep", help="Tables in the PDF layout: keep, compact (one line per table) or drop."),
+    relevance_threshold: Optional[float] = typer.Option(
+        None, help="Skip LLM calls for chunks scoring below this relevance (e.g. 1.0): contents, audit reports, glossaries."
+    ),
+) -> None:
+    """
+    Analyze many PDFs into per-document JSON summaries. Re-running with the same
+    output directory resumes from its manifest, skipping completed documents.
+    """
+    from src.pdf_investor_summarizer.batch import BatchRunner, discover_pdfs
+    from src.pdf_investor_summarizer.chunker import ContentDefinedChunker
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    paths = list(inputs or [])
+    if from_file is not None:
+        paths.extend(Path(line.strip()) for line in from_file if line.strip())
+    sources = discover_pdfs(paths)
+    if not sources:
+        raise typer.BadParameter("no PDF files found in the given inputs")
+    root = paths[0] if len(paths) == 1 and paths[0].is_dir() else None
+
+    runner = BatchRunner(
+        output_dir,
+        workers=workers,
+        max_documents=max_docs,
+        analyzer_kwargs={
+            "chunk_size": chunk_size,
+            "overlap": overlap,
+            "batch_tokens": batch_tokens,
+            "strip_boilerplate": strip_boilerplate,
+            "clean_workers": clean_workers,
+            "relevance_threshold": relevance_threshold,
+            "chunker": ContentDefinedChunker(chunk_size, overlap) if content_defined else None,
+            "loader_kwargs": {"use_cache": document_cache, "tables": tables},
+            "extractor_kwargs": {"model": model},
+            "scheduler_kwargs": {
+                "max_concurrency": max_concurrency,
+                "requests_per_minute": requests_per_minute,
+                "tokens_per_minute": tokens_per_minute,
+            },
+        },
+    )
+    try:
+        counts = asyncio.run(runner.run(sources, root=root))
+    except ValueError as e:
+        # Colliding output paths, refused before any document is processed
+        raise typer.BadParameter(str(e))
+    typer.echo(f"done: {counts['done']}, failed: {counts['failed']}, skipped: {counts['skipped']}")
+    if counts["failed"]:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
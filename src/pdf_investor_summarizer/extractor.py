@@ -1,7 +1,9 @@
-from langchain_openai import ChatOpenAI
+from typing import List, Optional
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
-from src.pdf_investor_summarizer.utils.cache import disk_cache
+from src.pdf_investor_summarizer.utils.cache import MISS, disk_cache, get_cache, is_cacheable, make_key
+from src.pdf_investor_summarizer.utils.clients import ClientRegistry, get_clients
+from src.pdf_investor_summarizer.utils.profiler import time_llm_call
 import logging
 logger = logging.getLogger(__name__)
 
@@ -38,6 +40,45 @@ Company report excerpt:
 <<<END>>>
 """
 
+EXTRACTION_FIELDS = (
+    "future_growth_prospects",
+    "key_business_changes",
+    "key_triggers",
+    "material_factors",
+)
+
+BATCH_PROMPT_TEMPLATE = """
+You are a highly accurate and literal financial information extraction agent. 
+Below are several independent company report excerpts, each in a numbered section.
+Process every section separately: extract only what is explicitly present or strongly implied in THAT section.
+Return a SINGLE valid JSON object whose keys are the section numbers (as strings), each mapping to an object with exactly these four fields (do not add or rename fields):
+
+- future_growth_prospects (list of direct facts or forecasts)
+- key_business_changes (list of explicit business structure/process/strategy changes)
+- key_triggers (list of clearly stated or imminent catalysts, risks, or opportunities)
+- material_factors (list of information that may materially affect next year's earnings and growth)
+
+STRICT INSTRUCTIONS:
+- Include every section number, even when all its fields are empty lists.
+- Do not invent or infer information that is not directly supported by the text.
+- If a field is not mentioned or there is not enough information, use an empty list for that field.
+- Output must be ONLY a compact valid JSON object (no comments, no explanations, no markdown, no pre/post text, no trailing commas).
+- All extracted facts must be in the same language as in the excerpt.
+- Do NOT paraphrase, do NOT summarize.
+- If you are unsure, prefer to leave the field empty.
+- Return only the JSON object, nothing else.
+
+Example output for two sections:
+{{
+  "1": {{"future_growth_prospects": [], "key_business_changes": [], "key_triggers": [], "material_factors": []}},
+  "2": {{"future_growth_prospects": [], "key_business_changes": [], "key_triggers": [], "material_factors": []}}
+}}
+
+{sections}
+"""
+
+SECTION_TEMPLATE = "<<<BEGIN SECTION {number}>>>\n{chunk}\n<<<END SECTION {number}>>>"
+
 
 class Extractor:
     """
@@ -53,20 +94,89 @@ class Extractor:
         max_tokens: int = 512,
         openai_api_key: str = None,
         prompt_template: str = PROMPT_TEMPLATE,  
+        batch_prompt_template: str = BATCH_PROMPT_TEMPLATE,
+        base_url: Optional[str] = None,
+        clients: Optional[ClientRegistry] = None,
     ):
-        self.llm = ChatOpenAI(
-            model=model,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            openai_api_key=openai_api_key,
-        )
+        """
+        Parameters
+        ----------
+        base_url : str, optional
+            OpenAI-compatible API endpoint (default: the OpenAI API).
+        clients : ClientRegistry, optional
+            Where the ChatOpenAI client comes from: extractors with the same
+            configuration share one client and its connection pool.
+            Defaults to the process-wide registry.
+        """
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.base_url = base_url
+        self.clients = clients or get_clients()
+        self._llm_config = {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "openai_api_key": openai_api_key,
+            "base_url": base_url,
+        }
+        self._llm_override = None
+        self._llm = self.clients.chat_model(**self._llm_config)
+        self._llm_generation = self.clients.generation
         self.prompt = PromptTemplate.from_template(prompt_template)
+        self.batch_prompt = PromptTemplate.from_template(batch_prompt_template)
         self.parser = JsonOutputParser()
 
+    @property
+    def llm(self):
+        """
+        The chat model. Taken again from the registry once its pools were
+        closed (ClientRegistry.aclose), so the extractor outlives the event
+        loop it was first used on. Assigning a model pins it instead.
+        """
+        if self._llm_override is not None:
+            return self._llm_override
+        if self._llm_generation != self.clients.generation:
+            self._llm = self.clients.chat_model(**self._llm_config)
+            self._llm_generation = self.clients.generation
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm) -> None:
+        self._llm_override = llm
+
+    def cache_key_material(self, chunk: str) -> dict:
+        """
+        Everything that determines the extraction result for `chunk`, used by
+        @disk_cache to build a versioned key. The rendered prompt covers both
+        the prompt template and the chunk text.
+        """
+        return self._endpoint_material({
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "prompt": self.render_prompt(chunk),
+        })
+
+    def _endpoint_material(self, material: dict) -> dict:
+        """
+        Add a custom `base_url` to key material: another endpoint may serve a
+        different model under the same name. Only added when set, so entries
+        cached against the OpenAI API stay valid.
+        """
+        if self.base_url is not None:
+            material["base_url"] = self.base_url
+        return material
+
+    def render_prompt(self, chunk: str) -> str:
+        """Full prompt sent to the LLM for `chunk` (template + chunk)."""
+        return self.prompt.format(chunk=chunk)
+
     @disk_cache
     def extract(self, chunk: str) -> dict:
-        prompt = self.prompt.format(chunk=chunk)
-        response = self.llm.invoke(prompt)
+        prompt = self.render_prompt(chunk)
+        with time_llm_call():
+            response = self.llm.invoke(prompt)
         logger.info(f"Sync LLM raw output: {repr(response.content[:500])}")
         try:
             result = self.parser.invoke(response.content)
@@ -84,9 +194,10 @@ class Extractor:
     @disk_cache
     async def aextract(self, chunk: str) -> dict:
         logger.info(f"LLM prompt for chunk (first 100 chars): {repr(chunk[:100])}")
-        prompt = self.prompt.format(chunk=chunk)
+        prompt = self.render_prompt(chunk)
         logger.debug(f"Prompt sent to LLM: {repr(prompt[:500])}")
-        response = await self.llm.ainvoke(prompt)
+        with time_llm_call():
+            response = await self.llm.ainvoke(prompt)
         logger.info(f"LLM raw output: {repr(response.content[:500])}")
         try:
             result = await self.parser.ainvoke(response.content)
@@ -101,3 +212,87 @@ class Extractor:
             **result,
             "usage": usage
         }
+
+    def render_batch_prompt(self, chunks: List[str]) -> str:
+        """Full prompt for several chunks packed as numbered sections."""
+        sections = "\n\n".join(
+            SECTION_TEMPLATE.format(number=i, chunk=chunk) for i, chunk in enumerate(chunks, start=1)
+        )
+        return self.batch_prompt.format(sections=sections)
+
+    def batch_cache_key_material(self, chunk: str) -> dict:
+        """
+        Cache key material for a chunk extracted inside a batched prompt. The
+        other sections do not change what is asked about this chunk, so the key
+        covers the batch template and the chunk only.
+        """
+        return self._endpoint_material({
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "batch_prompt": self.batch_prompt.template,
+            "chunk": chunk,
+        })
+
+    def cached_batch_results(self, chunks: List[str]) -> List[Optional[dict]]:
+        """
+        Cached batched-extraction result of each chunk (with empty usage: a
+        hit costs no tokens), or None for chunks a batch request would send.
+        """
+        cache = get_cache()
+        results = [cache.get(make_key(self.batch_cache_key_material(chunk))) for chunk in chunks]
+        # Entries cached before usage was left out still carry a request's usage
+        return [None if res is MISS else {**res, "usage": {}} for res in results]
+
+    async def aextract_batch(self, chunks: List[str]) -> List[dict]:
+        """
+        Extract several chunks with one LLM request and demultiplex the answer.
+
+        Chunks already cached are not sent again. The completion budget scales
+        with the number of sections. Token usage of the request is attached to
+        the first result sent in this call only, so totals are not double
+        counted; results are cached, and returned from the cache, without usage,
+        since a cache hit costs no tokens. A section missing from the answer
+        yields an error result for that chunk.
+
+        Returns
+        -------
+        List[dict]
+            One result per chunk, in input order.
+        """
+        cache = get_cache()
+        keys = [make_key(self.batch_cache_key_material(chunk)) for chunk in chunks]
+        results: List[Optional[dict]] = self.cached_batch_results(chunks)
+        missing = [i for i, res in enumerate(results) if res is None]
+        if not missing:
+            return results
+
+        prompt = self.render_batch_prompt([chunks[i] for i in missing])
+        logger.info(f"Batched LLM request with {len(missing)} sections.")
+        logger.debug(f"Prompt sent to LLM: {repr(prompt[:500])}")
+        llm = self.llm.bind(max_tokens=self.max_tokens * len(missing))
+        with time_llm_call():
+            response = await llm.ainvoke(prompt)
+        logger.info(f"LLM raw output: {repr(response.content[:500])}")
+        usage = getattr(response, "response_metadata", {}).get("usage", {})
+        try:
+            parsed = await self.parser.ainvoke(response.content)
+            if not isinstance(parsed, dict):
+                raise ValueError(f"expected a JSON object keyed by section, got {type(parsed).__name__}")
+        except Exception as e:
+            logger.error(f"Failed to parse batched LLM output: {e}\nRaw: {repr(response.content)}")
+            parsed = {}
+            error = str(e)
+        else:
+            error = "section missing from batched response"
+
+        for number, i in enumerate(missing, start=1):
+            section = parsed.get(str(number))
+            if isinstance(section, dict):
+                result = {field: section.get(field, []) for field in EXTRACTION_FIELDS}
+            else:
+                result = {"error": error, "raw": response.content}
+            if is_cacheable(result):
+                cache.set(keys[i], result)
+            results[i] = {**result, "usage": usage if number == 1 else {}}
+        return results
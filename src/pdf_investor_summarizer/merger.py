@@ -1,48 +1,160 @@
 # src/pdf_investor_summarizer/merger.py
 
-from typing import List, Dict, Any
+import hashlib
+import re
+import struct
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 import logging
+from src.pdf_investor_summarizer.extractor import EXTRACTION_FIELDS
 logger = logging.getLogger(__name__)
 
 MIN_FACT_LENGTH = 10
 
+# MinHash signature of NUM_PERM hashes, split into BANDS bands of ROWS for the
+# LSH index. Pairs of Jaccard similarity 0.7 become candidates with
+# probability 1 - (1 - 0.7**2)**8 > 0.99; candidates are then verified on
+# their exact shingle sets.
+NUM_PERM = 16
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+# A 64-byte BLAKE2b digest holds all NUM_PERM 32-bit hash functions at once
+_UNPACK = struct.Struct(f"<{NUM_PERM}I").unpack
+
+_WORD = re.compile(r"\w[\w.,%$€£/-]*\w|\w")
+_FIGURE = re.compile(r"\d")
+
+
+def _shingles(tokens: Sequence[str]) -> Set[str]:
+    """Word bigrams of a fact (its words, for single-word facts)."""
+    if len(tokens) < 2:
+        return set(tokens)
+    return {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def _signature(shingles: Set[str]) -> Tuple[int, ...]:
+    """MinHash signature: one digest per shingle, per-position minimum taken in C."""
+    return tuple(map(min, zip(*[_UNPACK(hashlib.blake2b(shingle.encode("utf-8")).digest()) for shingle in shingles])))
+
+
+class _Fact:
+    __slots__ = ("text", "shingles", "figures", "chunks", "pages")
+
+    def __init__(self, text: str, shingles: Set[str], figures: Tuple[str, ...]):
+        self.text = text
+        self.shingles = shingles
+        self.figures = figures
+        self.chunks: List[int] = []
+        self.pages: Set[int] = set()
+
+
 class Merger:
     """
     Merges a list of extractor outputs into a single summary JSON.
-    Assumes all inputs are dicts with the same set of keys and values are lists.
+
+    Facts are deduplicated per field by near-duplicate detection: two facts
+    merge when the Jaccard similarity of their word bigrams reaches
+    `threshold` and they quote the same figures, so "Revenue grew 5%" never
+    absorbs "Revenue grew 7%". Candidates come from a MinHash LSH index, so
+    merging stays linear in the number of facts. The first wording of a fact
+    is kept. Error payloads, non-list values and non-string items are skipped.
+
+    Parameters
+    ----------
+    threshold : float
+        Minimum Jaccard similarity for two facts to be merged (1.0: only facts
+        equal up to case, punctuation and whitespace).
     """
 
-    def merge(self, extracted_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def __init__(self, threshold: float = 0.7):
+        self.threshold = threshold
+
+    def merge(
+        self,
+        extracted_chunks: List[Dict[str, Any]],
+        pages: Optional[List[List[int]]] = None,
+    ) -> Dict[str, Any]:
         """
-        Combine all extracted chunk outputs by concatenating lists for each key.
+        Combine all extracted chunk outputs by concatenating lists for each key,
+        merging near-duplicate facts.
 
         Parameters
         ----------
         extracted_chunks : List[dict]
-            List of outputs from Extractor.extract()
+            List of outputs from Extractor.extract(), in chunk order.
+        pages : List[List[int]], optional
+            Page indices of each chunk (Chunk.pages), for provenance.
 
         Returns
         -------
         dict
-            Merged summary, with lists from all chunks concatenated for each field.
+            Merged summary: the deduplicated facts of each field, plus
+            "provenance" mapping each field to a parallel list of
+            {"chunks": [...], "pages": [...]} recording where each fact was found.
         """
         logger.info(f"Merging {len(extracted_chunks)} chunk results.")
-        if not extracted_chunks:
-            return {}
-        merged = {key: [] for key in extracted_chunks[0].keys()}
-        for chunk in extracted_chunks:
+        # Every field is present in the summary, even when no chunk reported it
+        facts: Dict[str, List[_Fact]] = {field: [] for field in EXTRACTION_FIELDS}
+        buckets: Dict[str, Dict[Tuple[int, Tuple[int, ...]], List[_Fact]]] = {}
+        skipped = 0
+        for index, chunk in enumerate(extracted_chunks):
+            if not isinstance(chunk, dict) or "error" in chunk:
+                skipped += 1
+                continue
+            chunk_pages = pages[index] if pages is not None and index < len(pages) else ()
             for key, value in chunk.items():
-                if isinstance(value, list):
-                    merged[key].extend(value)
-        for key in merged:
-            seen = set()
-            unique_items = []
-            for item in merged[key]:
-                item_stripped = item.strip()
-                if item_stripped and item_stripped not in seen and len(item_stripped) >= MIN_FACT_LENGTH:
-                    unique_items.append(item_stripped)
-                    seen.add(item_stripped)
-            merged[key] = unique_items
-        logger.info(f"Merged summary (deduplicated): {merged}")
+                if not isinstance(value, list):
+                    continue
+                field_facts = facts.setdefault(key, [])
+                field_buckets = buckets.setdefault(key, defaultdict(list))
+                for item in value:
+                    if not isinstance(item, str):
+                        continue
+                    fact = self._add(" ".join(item.split()), field_facts, field_buckets)
+                    if fact is not None:
+                        if not fact.chunks or fact.chunks[-1] != index:
+                            fact.chunks.append(index)
+                        fact.pages.update(chunk_pages)
+        if skipped:
+            logger.warning(f"Skipped {skipped} failed or malformed chunk results.")
+
+        merged: Dict[str, Any] = {key: [fact.text for fact in field_facts] for key, field_facts in facts.items()}
+        merged["provenance"] = {
+            key: [{"chunks": fact.chunks, "pages": sorted(fact.pages)} for fact in field_facts]
+            for key, field_facts in facts.items()
+        }
+        logger.info(
+            f"Merged summary (deduplicated): "
+            f"{ {key: len(field_facts) for key, field_facts in facts.items()} } facts per field."
+        )
         return merged
-        
+
+    def _add(self, text: str, facts: List[_Fact], buckets: Dict) -> Optional[_Fact]:
+        """Find the fact `text` duplicates, or register it as a new one. None if it is too short."""
+        if len(text) < MIN_FACT_LENGTH:
+            return None
+        tokens = _WORD.findall(text.casefold())
+        if not tokens:
+            return None
+        shingles = _shingles(tokens)
+        figures = tuple(sorted(token for token in tokens if _FIGURE.search(token)))
+        signature = _signature(shingles)
+        bands = [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+        seen: Set[int] = set()
+        for band in bands:
+            for candidate in buckets.get(band, ()):
+                if id(candidate) in seen:
+                    continue
+                seen.add(id(candidate))
+                if candidate.figures != figures:
+                    continue
+                union = len(shingles | candidate.shingles)
+                if len(shingles & candidate.shingles) >= self.threshold * union:
+                    return candidate
+
+        fact = _Fact(text, shingles, figures)
+        facts.append(fact)
+        for band in bands:
+            buckets[band].append(fact)
+        return fact
@@ -1,84 +1,703 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO, StringIO
 from pathlib import Path
-from typing import List, Union
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+import hashlib
+import os
+import re
+import shutil
 import tempfile
 import requests
 import logging
 logger = logging.getLogger(__name__)
 
-from pdfminer.high_level import extract_text
-from pypdf import PdfReader
+from pdfminer.converter import PDFPageAggregator, TextConverter
+from pdfminer.layout import LAParams, LTAnno, LTChar, LTContainer, LTItem, LTPage, LTText, LTTextBox, LTTextLine
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
 from pdf2image import convert_from_path
 import pytesseract
 
-SourceType = Union[Path, str, bytes]
+from src.pdf_investor_summarizer.utils.cache import MISS, get_document_cache, make_key
+from src.pdf_investor_summarizer.utils.clients import get_clients
+from src.pdf_investor_summarizer.utils.profiler import Profiler
+
+SourceType = Union[Path, str, bytes, bytearray, memoryview]
+PdfDocument = Union[Path, BinaryIO]
+
+# Bump when extraction changes what the loader returns for the same PDF,
+# so document cache entries written by older code are not reused
+PAGES_FORMAT_VERSION = 2
+
+# What PdfLoader does with tables found in the page layout: leave pdfminer's
+# text as is, replace each table with one compact "cell | cell; ..." line, or
+# drop tables from the text sent on to the LLM
+TABLE_MODES = ("keep", "compact", "drop")
+# A table is at least this many consecutive rows of 2+ cells with a figure
+TABLE_MIN_ROWS = 3
+# Characters on one text line separated by more than this many line heights
+# belong to different cells
+CELL_GAP = 1.0
+_NUMERIC_CELL = re.compile(r"[(\-–—]?[$€£]?\s?(?:\d[\d,.\s]*|[-–—])%?\)?|n/?a", re.I)
+
+# pdfminer's placeholders for glyphs without a Unicode mapping, replacement,
+# control and private-use characters: signs of a broken text layer. The
+# separators \x1c-\x1f are whitespace to str.split, which sizes the page in
+# _text_quality, so they are left out.
+_NOISE = re.compile(r"\(cid:\d+\)|[\ufffd\x00-\x08\x0e-\x1b\x7f\ue000-\uf8ff]")
+
+# Downloads are kept in memory up to this size, then spill to an anonymous temp file
+SPOOL_MAX_MEMORY = 32 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _http_session() -> requests.Session:
+    """Process-wide HTTP session, so repeated downloads reuse pooled connections."""
+    return get_clients().http_session()
+
+
+def _download(url: str, timeout: float, max_bytes: int) -> BinaryIO:
+    """
+    Stream a remote PDF into a spooled buffer.
+
+    The body is read in chunks into a SpooledTemporaryFile that stays in
+    memory up to SPOOL_MAX_MEMORY and otherwise rolls over to an unlinked temp
+    file, which disappears when the buffer is closed. Downloads larger than
+    `max_bytes` and responses that are not PDFs are rejected.
+
+    Returns
+    -------
+    BinaryIO
+        The buffer, positioned at the start.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        with _http_session().get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            length = response.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > max_bytes:
+                raise ValueError(f"Remote file is {int(length)} bytes, above the {max_bytes} byte limit: {url}")
+            size = 0
+            checked = False
+            for block in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                spool.write(block)
+                size += len(block)
+                if size > max_bytes:
+                    raise ValueError(f"Download exceeded the {max_bytes} byte limit: {url}")
+                if not checked and size >= 4:
+                    spool.seek(0)
+                    head = spool.read(4)
+                    spool.seek(size)
+                    if head != b"%PDF":
+                        content_type = response.headers.get("Content-Type", "unknown")
+                        raise ValueError(
+                            f"Downloaded file is not a valid PDF (Content-Type: {content_type}, "
+                            f"starts with {head!r}): {url}"
+                        )
+                    checked = True
+            if not checked:
+                raise ValueError(f"Downloaded file is not a valid PDF ({size} bytes): {url}")
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    logger.info(f"Downloaded {size} bytes from {url}")
+    return spool
+
+
+@contextmanager
+def _open_pdf(pdf: PdfDocument) -> Iterator[BinaryIO]:
+    """Binary file object for a path (opened and closed here) or an in-memory buffer (rewound)."""
+    if isinstance(pdf, (str, Path)):
+        with open(pdf, "rb") as fp:
+            yield fp
+    else:
+        pdf.seek(0)
+        yield pdf
+
+
+def _content_digest(pdf: PdfDocument) -> str:
+    """SHA-256 of the PDF bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with _open_pdf(pdf) as fp:
+        for block in iter(lambda: fp.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_page_texts(pdf: PdfDocument) -> Iterator[str]:
+    """
+    Yield the text of every page of a PDF in a single pass.
+
+    `pdf` is a path or a seekable binary buffer. The document is opened and
+    parsed once, and one PDFResourceManager is shared across pages so fonts
+    and other resources are decoded only once. The text yielded for each page
+    is identical to ``pdfminer.high_level.extract_text(pdf_path, page_numbers=[i])``.
+    """
+    rsrcmgr = PDFResourceManager(caching=True)
+    with _open_pdf(pdf) as fp, StringIO() as output:
+        device = TextConverter(rsrcmgr, output, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page in PDFPage.get_pages(fp, caching=True):
+            interpreter.process_page(page)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+
+def _extract_page_layouts(pdf: PdfDocument) -> Iterator[LTPage]:
+    """Yield the analyzed layout of every page, parsed in a single pass like _extract_page_texts."""
+    rsrcmgr = PDFResourceManager(caching=True)
+    with _open_pdf(pdf) as fp:
+        device = PDFPageAggregator(rsrcmgr, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page in PDFPage.get_pages(fp, caching=True):
+            interpreter.process_page(page)
+            yield device.get_result()
+
+
+def _line_cells(line: LTTextLine) -> List[Tuple[float, str]]:
+    """Split a text line at wide horizontal gaps into (x0, text) cells."""
+    cells: List[Tuple[float, List[str]]] = []
+    last_x1: Optional[float] = None
+    for item in line:
+        if isinstance(item, LTChar):
+            if last_x1 is None or item.x0 - last_x1 > CELL_GAP * line.height:
+                cells.append((item.x0, []))
+            last_x1 = item.x1
+        if cells and isinstance(item, (LTChar, LTAnno)):
+            cells[-1][1].append(item.get_text())
+    return [(x0, " ".join("".join(chars).split())) for x0, chars in cells if "".join(chars).strip()]
+
+
+def _find_tables(ltpage: LTPage) -> List[List[Tuple[List[str], List[LTTextLine]]]]:
+    """
+    Tabular regions of a page, from text line coordinates: lines are grouped
+    into rows by vertical position, and TABLE_MIN_ROWS or more consecutive
+    rows of at least two cells, one of them a figure, form a table.
+
+    Returns
+    -------
+    list
+        Per table, its rows top to bottom as (cell texts left to right, text lines).
+    """
+    lines = [
+        line
+        for box in ltpage if isinstance(box, LTTextBox)
+        for line in box if isinstance(line, LTTextLine) and line.get_text().strip()
+    ]
+    rows: List[List[LTTextLine]] = []
+    for line in sorted(lines, key=lambda line: -(line.y0 + line.y1) / 2):
+        center = (line.y0 + line.y1) / 2
+        if rows:
+            previous = rows[-1][0]
+            if abs((previous.y0 + previous.y1) / 2 - center) <= min(previous.height, line.height) / 2:
+                rows[-1].append(line)
+                continue
+        rows.append([line])
+
+    tables: List[List[Tuple[List[str], List[LTTextLine]]]] = []
+    run: List[Tuple[List[str], List[LTTextLine]]] = []
+    for row in rows + [[]]:
+        cells = sorted(cell for line in row for cell in _line_cells(line))
+        texts = [text for _, text in cells]
+        if len(texts) >= 2 and any(_NUMERIC_CELL.fullmatch(text) for text in texts):
+            run.append((texts, row))
+            continue
+        if len(run) >= TABLE_MIN_ROWS:
+            tables.append(run)
+        run = []
+    return tables
+
+
+def _render_layout(ltpage: LTPage, tables: List[List[Tuple[List[str], List[LTTextLine]]]], mode: str) -> str:
+    """
+    Page text as TextConverter writes it, with the lines of `tables` dropped
+    or, in "compact" mode, replaced by one line per table where the first of
+    its lines was.
+    """
+    table_of = {id(line): index for index, table in enumerate(tables) for _, row in table for line in row}
+    pieces: List[str] = []
+    written: Set[int] = set()
+
+    def render(item: LTItem) -> bool:
+        """Write `item`; return whether it wrote anything."""
+        if id(item) in table_of:
+            index = table_of[id(item)]
+            if mode != "compact" or index in written:
+                return False
+            written.add(index)
+            pieces.append("; ".join(" | ".join(cells) for cells, _ in tables[index]) + "\n")
+            return True
+        wrote = False
+        if isinstance(item, LTContainer):
+            for child in item:
+                wrote = render(child) or wrote
+        elif isinstance(item, LTText):
+            pieces.append(item.get_text())
+            wrote = True
+        if isinstance(item, LTTextBox) and wrote:
+            pieces.append("\n")
+        return wrote
+
+    render(ltpage)
+    pieces.append("\f")
+    return "".join(pieces)
+
+
+def _text_quality(text: str) -> float:
+    """
+    Share of the non-whitespace characters of a page's text layer that are
+    real text, from 0 (empty or all noise, see _NOISE) to 1.
+    """
+    size = sum(map(len, text.split()))
+    if not size:
+        return 0.0
+    noise = sum(len(match) for match in _NOISE.findall(text))
+    return max(0.0, 1 - noise / size)
+
+
+def _ocr_image(image, lang: str, timeout: float) -> Tuple[str, float]:
+    """
+    Run Tesseract on one rasterized page. Module-level so it can run in a process pool.
+
+    Returns
+    -------
+    Tuple[str, float]
+        The text, with lines and paragraphs as Tesseract laid them out, and
+        the mean word confidence (0-100, weighted by word length).
+    """
+    data = pytesseract.image_to_data(image, lang=lang, timeout=timeout, output_type=pytesseract.Output.DICT)
+    paragraphs: Dict[Tuple[int, int], Dict[int, List[str]]] = {}
+    weighted = characters = 0.0
+    for block, par, line, word, conf in zip(
+        data["block_num"], data["par_num"], data["line_num"], data["text"], data["conf"]
+    ):
+        word = word.strip()
+        if not word:
+            continue
+        paragraphs.setdefault((block, par), {}).setdefault(line, []).append(word)
+        if float(conf) >= 0:
+            weighted += float(conf) * len(word)
+            characters += len(word)
+    text = "\n\n".join(
+        "\n".join(" ".join(words) for words in lines.values()) for lines in paragraphs.values()
+    )
+    return text, weighted / characters if characters else 0.0
+
+
+def _page_ranges(page_numbers: List[int], batch_size: int) -> List[Tuple[int, int]]:
+    """
+    Group sorted 1-based page numbers into contiguous (first, last) ranges
+    of at most `batch_size` pages, so each range is rasterized with one call.
+    """
+    ranges: List[Tuple[int, int]] = []
+    for page in sorted(page_numbers):
+        if ranges:
+            first, last = ranges[-1]
+            if page == last + 1 and page - first < batch_size:
+                ranges[-1] = (first, page)
+                continue
+        ranges.append((page, page))
+    return ranges
 
 class PdfLoader:
     """
     Loads text from a PDF, page by page, with optional OCR fallback.
     Supports:
       - Local Path objects
-      - HTTP/HTTPS URLs (as str)
-      - Raw PDF bytes from a database
+      - HTTP/HTTPS URLs (as str), streamed into a spooled buffer
+      - Raw PDF bytes from a database, parsed in memory
+
+    Text extraction creates no named temporary files. OCR of a buffered
+    source writes the PDF once to a temporary file for pdftoppm, removed when
+    OCR is done. Loaders holding a downloaded buffer should be closed, either
+    with close() or by using the loader as a context manager.
     """
 
+    # Exactly one of these is set: a local file, or an in-memory/spooled buffer
+    pdf_path: Optional[Path] = None
+    buffer: Optional[BinaryIO] = None
+    # Temporary copy of `buffer` that pdftoppm rasterizes during OCR
+    _raster_file: Optional[str] = None
+
     def __init__(
         self,
         source: SourceType,
         ocr_lang: str = "eng",
         ocr_dpi: int = 300,
+        ocr_workers: int = 1,
+        ocr_batch_size: int = 8,
+        ocr_timeout: float = 120,
+        ocr_min_dpi: int = 150,
+        ocr_min_confidence: float = 70,
+        ocr_min_quality: float = 0.8,
+        http_timeout: float = 60,
+        max_download_bytes: int = 512 * 1024 * 1024,
+        use_cache: bool = False,
+        profiler: Optional[Profiler] = None,
+        tables: str = "keep",
     ):
+        """
+        Parameters
+        ----------
+        ocr_workers : int
+            Number of Tesseract worker processes. With 1 (default) pages are OCR'd
+            serially; with more, every page needing OCR is collected first,
+            rasterized in batched page ranges and recognised in a process pool.
+            Capped at the number of CPUs.
+        ocr_batch_size : int
+            Maximum number of consecutive pages rasterized per pdf2image call.
+        ocr_timeout : float
+            Per-page Tesseract timeout in seconds (0 disables it). A page that
+            times out keeps its text layer (usually empty) instead of stalling the job.
+        ocr_min_dpi : int
+            Pages are first rasterized (in grayscale) at this resolution; only
+            pages whose Tesseract confidence stays below `ocr_min_confidence`
+            are re-OCR'd at twice the resolution, up to `ocr_dpi`. Set it to
+            `ocr_dpi` for a single full-resolution pass.
+        ocr_min_confidence : float
+            Mean word confidence (0-100) accepted without a higher-DPI retry.
+        ocr_min_quality : float
+            Pages whose text layer scores below this in _text_quality (empty,
+            or mostly "(cid:NN)" glyph noise and broken characters) are OCR'd.
+        http_timeout : float
+            Connect and read timeout in seconds for URL sources.
+        max_download_bytes : int
+            URL sources larger than this are rejected.
+        use_cache : bool
+            Look up and store page texts, and per-page OCR results, in the
+            document cache, keyed by the PDF's content hash and the OCR
+            settings. A warm load skips parsing and OCR entirely.
+        profiler : Profiler, optional
+            Receives the "ocr" stage time and page, OCR, table and cache counters.
+        tables : str
+            Tables detected in the page layout (see _find_tables) are left as
+            pdfminer flattens them ("keep": label and figure columns one after
+            the other, mostly lost to TextCleaner's short-line filter),
+            rewritten as one "cell | cell; ..." line each that keeps figures
+            next to their labels ("compact"), or removed, saving their prompt
+            tokens on statement-heavy reports ("drop").
+        """
+        if tables not in TABLE_MODES:
+            raise ValueError(f"tables must be one of {TABLE_MODES}, got {tables!r}")
         self.ocr_lang = ocr_lang
         self.ocr_dpi = ocr_dpi
+        self.ocr_workers = max(1, min(ocr_workers, os.cpu_count() or 1))
+        self.ocr_batch_size = max(1, ocr_batch_size)
+        self.ocr_timeout = ocr_timeout
+        self.ocr_min_dpi = min(ocr_min_dpi, ocr_dpi)
+        self.ocr_min_confidence = ocr_min_confidence
+        self.ocr_min_quality = ocr_min_quality
+        self.use_cache = use_cache
+        self.tables = tables
+        self.profiler = profiler or Profiler()
+        # 1-based pages whose OCR failed or timed out in the last load; never cached
+        self.ocr_failed: Set[int] = set()
+        self._digest: Optional[str] = None
 
-        # Determine the source type and prepare a local file path
+        # Determine the source type: a local file path or an in-memory buffer
         if isinstance(source, Path):
             self.pdf_path = source
-        elif isinstance(source, bytes):
-            tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
-            tmp.write(source)
-            tmp.flush()
-            self.pdf_path = Path(tmp.name)
+            self.name = str(source)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            self.buffer = BytesIO(source)
+            self.name = f"<{memoryview(source).nbytes} bytes>"
         elif isinstance(source, str) and source.lower().startswith(("http://", "https://")):
-            response = requests.get(source)
-            response.raise_for_status()
-            
-            if not response.content.startswith(b"%PDF"):
-                with open("downloaded_gdrive_response.html", "wb") as f:
-                    f.write(response.content)
-                raise ValueError("Downloaded file is not a valid PDF. Saved as downloaded_gdrive_response.html for inspection.")
-            tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
-            tmp.write(response.content)
-            tmp.flush()
-            self.pdf_path = Path(tmp.name)
-            
+            self.buffer = _download(source, timeout=http_timeout, max_bytes=max_download_bytes)
+            self.name = source
         elif isinstance(source, str) and Path(source).exists():
             self.pdf_path = Path(source)
+            self.name = source
         else:
             raise ValueError(f"Unsupported source type: {type(source)}")
 
+    @property
+    def document(self) -> PdfDocument:
+        """The path or buffer the PDF is parsed from."""
+        return self.pdf_path if self.pdf_path is not None else self.buffer
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the PDF content, computed once."""
+        if self._digest is None:
+            self._digest = _content_digest(self.document)
+        return self._digest
+
+    def cache_key_material(self, page: Optional[int] = None) -> dict:
+        """
+        Everything that determines the loader output for this document, or for
+        the OCR of one 1-based `page`, used to build document cache keys.
+        """
+        material = {
+            "document": self.digest,
+            "format": PAGES_FORMAT_VERSION,
+            "ocr_lang": self.ocr_lang,
+            "ocr_dpi": self.ocr_dpi,
+            "ocr_min_dpi": self.ocr_min_dpi,
+            "ocr_min_confidence": self.ocr_min_confidence,
+            "ocr_min_quality": self.ocr_min_quality,
+        }
+        if self.tables != "keep":
+            # Only added when set, so entries written before table handling stay valid
+            material["tables"] = self.tables
+        if page is not None:
+            material["ocr_page"] = page
+        return material
+
+    def _cache_get(self, page: Optional[int] = None) -> Any:
+        if not self.use_cache:
+            return MISS
+        return get_document_cache().get(make_key(self.cache_key_material(page)))
+
+    def _cache_set(self, value: Any, page: Optional[int] = None) -> None:
+        if self.use_cache:
+            get_document_cache().set(make_key(self.cache_key_material(page)), value)
+
+    def close(self) -> None:
+        """Release the in-memory or spooled buffer and the OCR temporary file, if any."""
+        self._release_raster_file()
+        if self.buffer is not None:
+            self.buffer.close()
+
+    def __enter__(self) -> "PdfLoader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _page_texts(self) -> Iterator[str]:
+        """Text layer of every page, with tables handled according to `tables`."""
+        if self.tables == "keep":
+            yield from _extract_page_texts(self.document)
+            return
+        for ltpage in _extract_page_layouts(self.document):
+            tables = _find_tables(ltpage)
+            if tables:
+                self.profiler.incr("tables", len(tables))
+                self.profiler.incr("table_rows", sum(len(table) for table in tables))
+            yield _render_layout(ltpage, tables, self.tables)
 
     def load(self) -> List[str]:
-        logger.info(f"Extracting text from: {self.pdf_path}")
-        reader = PdfReader(str(self.pdf_path))
-        num_pages = len(reader.pages)
-        logger.info(f"PDF has {num_pages} pages.")
+        cached = self._cache_get()
+        if cached is not MISS:
+            logger.info(f"Loaded {len(cached)} cached pages for: {self.name}")
+            self.profiler.incr("document_cache_hits")
+            self.profiler.incr("pages", len(cached))
+            return cached
+
+        logger.info(f"Extracting text from: {self.name}")
+        self.ocr_failed = set()
         texts: List[str] = []
+        ocr_pages: List[int] = []
 
-        for i in range(num_pages):
-            page_text = extract_text(str(self.pdf_path), page_numbers=[i])
-            if page_text and page_text.strip():
-                logger.debug(f"Page {i} extracted with text (length={len(page_text)}).")
-                texts.append(page_text)
+        for i, page_text in enumerate(self._page_texts()):
+            # Keep the text layer, if any, in case OCR fails
+            texts.append(page_text if page_text.strip() else "")
+            if self._needs_ocr(i, page_text):
+                ocr_pages.append(i + 1)
+        logger.info(f"PDF has {len(texts)} pages, {len(ocr_pages)} need OCR.")
+        self.profiler.incr("pages", len(texts))
+
+        todo: List[int] = []
+        for page_number in ocr_pages:
+            page_text = self._cache_get(page_number)
+            if page_text is MISS:
+                todo.append(page_number)
             else:
-                logger.warning(f"Page {i} is empty, fallback to OCR.")
-                texts.append(self._ocr_page(i + 1))
+                texts[page_number - 1] = page_text
+        with self.profiler.stage("ocr"):
+            try:
+                ocr_texts = self._ocr_pages(todo)
+            finally:
+                self._release_raster_file()
+        self.profiler.incr("ocr_pages", len(todo))
+        self.profiler.incr("ocr_failed_pages", len(self.ocr_failed))
+        for page_number, page_text in ocr_texts.items():
+            if page_number not in self.ocr_failed:
+                texts[page_number - 1] = page_text
+                self._cache_set(page_text, page_number)
+        if not self.ocr_failed:
+            self._cache_set(texts)
+        return texts
+
+    def iter_pages(self) -> Iterator[str]:
+        """
+        Yield page texts one at a time, in page order.
+
+        Unlike load(), pages without a text layer are OCR'd inline as they are
+        reached, so downstream stages can start on the first page immediately.
+        """
+        cached = self._cache_get()
+        if cached is not MISS:
+            logger.info(f"Streaming {len(cached)} cached pages for: {self.name}")
+            self.profiler.incr("document_cache_hits")
+            self.profiler.incr("pages", len(cached))
+            yield from cached
+            return
+
+        logger.info(f"Streaming text from: {self.name}")
+        self.ocr_failed = set()
+        try:
+            texts = yield from self._stream_pages()
+        finally:
+            self._release_raster_file()
+        if not self.ocr_failed:
+            self._cache_set(texts)
+
+    def _stream_pages(self) -> Iterator[str]:
+        """Body of iter_pages on a cache miss; returns the page texts to cache."""
+        texts: List[str] = []
+        for i, page_text in enumerate(self._page_texts()):
+            self.profiler.incr("pages")
+            if self._needs_ocr(i, page_text):
+                ocr_text = self._cache_get(i + 1)
+                if ocr_text is MISS:
+                    with self.profiler.stage("ocr"):
+                        ocr_text = self._ocr_page(i + 1)
+                    self.profiler.incr("ocr_pages")
+                    if i + 1 in self.ocr_failed:
+                        self.profiler.incr("ocr_failed_pages")
+                        ocr_text = page_text if page_text.strip() else ""
+                    else:
+                        self._cache_set(ocr_text, i + 1)
+                page_text = ocr_text
+            if self.use_cache:
+                texts.append(page_text)
+            yield page_text
         return texts
 
+    def _needs_ocr(self, index: int, page_text: str) -> bool:
+        """Whether the text layer of 0-based page `index` is missing or too broken to use."""
+        if not page_text.strip():
+            logger.warning(f"Page {index} is empty, fallback to OCR.")
+            return True
+        quality = _text_quality(page_text)
+        if quality < self.ocr_min_quality:
+            logger.warning(f"Page {index} text layer quality {quality:.2f} is below {self.ocr_min_quality}, fallback to OCR.")
+            self.profiler.incr("ocr_low_quality_pages")
+            return True
+        logger.debug(f"Page {index} extracted with text (length={len(page_text)}).")
+        return False
+
+    def _dpi_ladder(self) -> List[int]:
+        """Resolutions to try in turn: ocr_min_dpi, doubling up to ocr_dpi."""
+        ladder: List[int] = []
+        dpi = self.ocr_min_dpi
+        while dpi < self.ocr_dpi:
+            ladder.append(dpi)
+            dpi *= 2
+        return ladder + [self.ocr_dpi]
+
+    def _ocr_pages(self, page_numbers: List[int]) -> Dict[int, str]:
+        """
+        OCR several pages, serially or across a process pool. Each pass
+        rasterizes at the next step of the DPI ladder only the pages still
+        below `ocr_min_confidence`.
+
+        Parameters
+        ----------
+        page_numbers : List[int]
+            1-based page numbers that need OCR.
+
+        Returns
+        -------
+        Dict[int, str]
+            OCR text for each requested page number.
+        """
+        if not page_numbers:
+            return {}
+        if self.ocr_workers == 1 or len(page_numbers) == 1:
+            return {page: self._ocr_page(page) for page in page_numbers}
+
+        logger.info(f"OCR of {len(page_numbers)} pages with {self.ocr_workers} workers.")
+        best: Dict[int, Tuple[str, float]] = {}
+        todo = list(page_numbers)
+        with ProcessPoolExecutor(max_workers=self.ocr_workers) as pool:
+            for step, dpi in enumerate(self._dpi_ladder()):
+                if step:
+                    logger.info(f"Re-OCR of {len(todo)} low-confidence pages at {dpi} DPI.")
+                    self.profiler.incr("ocr_retries", len(todo))
+                for page, result in self._ocr_pass(pool, todo, dpi).items():
+                    if page not in best or result[1] > best[page][1]:
+                        best[page] = result
+                # Failed pages are not retried: a timeout would only recur at a higher resolution
+                todo = [page for page in todo if page in best and best[page][1] < self.ocr_min_confidence]
+                if not todo:
+                    break
+
+        self.ocr_failed.update(page for page in page_numbers if page not in best)
+        return {page: best[page][0] if page in best else "" for page in page_numbers}
+
+    def _ocr_pass(self, pool: ProcessPoolExecutor, page_numbers: List[int], dpi: int) -> Dict[int, Tuple[str, float]]:
+        """OCR pages rasterized at `dpi` in `pool`; failed pages are left out."""
+        results: Dict[int, Tuple[str, float]] = {}
+        # Bound the rasterized pages waiting in the pool to keep memory flat
+        max_pending = self.ocr_workers * 2
+        pending: Deque[Tuple[int, Future]] = deque()
+
+        def collect() -> None:
+            page, future = pending.popleft()
+            result = self._ocr_result(page, future)
+            if result is not None:
+                results[page] = result
+
+        for first, last in _page_ranges(page_numbers, self.ocr_batch_size):
+            images = self._rasterize(first, last, dpi)
+            for offset, image in enumerate(images):
+                future = pool.submit(_ocr_image, image, self.ocr_lang, self.ocr_timeout)
+                pending.append((first + offset, future))
+            while len(pending) > max_pending:
+                collect()
+        while pending:
+            collect()
+        return results
+
+    def _rasterize(self, first: int, last: int, dpi: Optional[int] = None) -> list:
+        """
+        Render 1-based pages first..last to grayscale images for OCR. Raw PGM
+        keeps pdftoppm's output lossless and skips encoding it at all.
+        """
+        kwargs = dict(dpi=dpi or self.ocr_dpi, first_page=first, last_page=last, fmt="ppm", grayscale=True)
+        return convert_from_path(self._raster_source(), **kwargs)
+
+    def _raster_source(self) -> str:
+        """
+        File for pdftoppm: the PDF itself, or the buffer written once to a
+        temporary file reused by every rasterization until released.
+        """
+        if self.pdf_path is not None:
+            return str(self.pdf_path)
+        if self._raster_file is None:
+            fd, name = tempfile.mkstemp(suffix=".pdf")
+            with os.fdopen(fd, "wb") as f:
+                self.buffer.seek(0)
+                shutil.copyfileobj(self.buffer, f)
+            self._raster_file = name
+        return self._raster_file
+
+    def _release_raster_file(self) -> None:
+        if self._raster_file is not None:
+            try:
+                os.remove(self._raster_file)
+            except OSError as e:
+                logger.warning(f"Could not remove OCR temporary file {self._raster_file}: {e}")
+            self._raster_file = None
 
+    def _ocr_result(self, page_number: int, future: Future) -> Optional[Tuple[str, float]]:
+        try:
+            return future.result()
+        except RuntimeError as e:
+            # pytesseract raises RuntimeError on timeout and TesseractError (a subclass) on failure
+            logger.error(f"OCR failed on page {page_number}: {e}")
+            return None
 
     def _ocr_page(self, page_number: int) -> str:
         """
-        Convert one page to image and run Tesseract OCR.
+        Convert one page to image and run Tesseract OCR, climbing the DPI
+        ladder while confidence stays low.
 
         Parameters
         ----------
@@ -90,13 +709,23 @@ class PdfLoader:
         str
             Text extracted via OCR.
         """
-        images = convert_from_path(
-            str(self.pdf_path),
-            dpi=self.ocr_dpi,
-            first_page=page_number,
-            last_page=page_number,
-            fmt="jpeg",
-        )
-        if not images:
+        best: Optional[Tuple[str, float]] = None
+        for step, dpi in enumerate(self._dpi_ladder()):
+            if step:
+                self.profiler.incr("ocr_retries")
+            images = self._rasterize(page_number, page_number, dpi)
+            if not images:
+                break
+            try:
+                result = _ocr_image(images[0], self.ocr_lang, self.ocr_timeout)
+            except RuntimeError as e:
+                logger.error(f"OCR failed on page {page_number}: {e}")
+                break
+            if best is None or result[1] > best[1]:
+                best = result
+            if best[1] >= self.ocr_min_confidence:
+                break
+        if best is None:
+            self.ocr_failed.add(page_number)
             return ""
-        return pytesseract.image_to_string(images[0], lang=self.ocr_lang)
+        return best[0]
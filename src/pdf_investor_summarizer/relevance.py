@@ -0,0 +1,116 @@
+# src/pdf_investor_summarizer/relevance.py
+
+import re
+import threading
+from typing import Dict, List
+import logging
+logger = logging.getLogger(__name__)
+
+# Stems of the vocabulary the extraction fields are about: growth prospects,
+# business changes, triggers and material factors. Matched at word starts.
+INVESTOR_TERMS = [
+    "growth", "grow", "expan", "outlook", "guidance", "forecast", "expect", "anticipat", "target", "pipeline",
+    "order book", "backlog", "revenue", "sales", "earnings", "profit", "margin", "ebitda", "cash flow",
+    "dividend", "buyback", "share repurchase", "capex", "capital expenditure", "invest", "acqui", "merger",
+    "divest", "disposal", "spin-off", "joint venture", "partnership", "contract", "launch", "new product",
+    "restructur", "reorgani", "cost saving", "efficienc", "appoint", "chief executive", "ceo", "cfo",
+    "headwind", "tailwind", "demand", "market share", "pricing", "inflation", "impairment", "write-down",
+    "litigation", "regulat", "tariff", "sanction", "refinanc", "debt", "leverage", "covenant", "liquidity",
+    "strategy", "strategic", "opportunit", "risk factor", "uncertaint", "decline", "increase", "decrease",
+]
+
+# Phrases typical of pages with nothing to extract: tables of contents,
+# auditor reports, glossaries, signatures and legal notices.
+BOILERPLATE_TERMS = [
+    "table of contents", "contents", "glossary", "definitions", "abbreviations", "independent auditor",
+    "in our opinion", "true and fair view", "basis for opinion", "key audit matter",
+    "we conducted our audit", "reasonable assurance", "responsibilities of the directors",
+    "signed on behalf of the board", "by order of the board", "company secretary", "registered office",
+    "registered in england", "forward-looking statements", "this page intentionally left blank",
+]
+
+_INVESTOR = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in INVESTOR_TERMS) + ")")
+_BOILERPLATE = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in BOILERPLATE_TERMS) + r")\b")
+# Quantities worth reporting: percentages, amounts in currency or millions
+_FIGURE = re.compile(r"\d[\d,.]*\s?(?:%|percent\b|per cent\b|bn\b|billion\b|m\b|mn\b|million\b)|[$€£]\s?\d")
+# Table of contents entries: dot leaders or a title with its page number at a
+# line end. TextCleaner joins a contents page into one line, so titles followed
+# by a page number and the next capitalized title also count, but only in runs
+# of MIN_TOC_RUN such entries with no digits or sentence punctuation in their
+# titles: prose has the odd "Segment 3 Revenue", not lists of them. A date such
+# as "14 March" is not an entry.
+_MONTHS = "January|February|March|April|May|June|July|August|September|October|November|December"
+_TOC_ANCHORED = re.compile(r"(?m)\.{3,}\s*\d+|[A-Za-z]\s+\d{1,3}\s*$")
+_TOC_ITEM = r"[A-Z][^\d.,;:!?]{0,80}?[A-Za-z]\s+\d{1,3}(?:\s+(?=[A-Z])(?!(?:" + _MONTHS + r")\b)|\s*$)"
+_TOC_INLINE = re.compile(r"(?m)" + _TOC_ITEM)
+MIN_TOC_RUN = 3
+_TOC_RUN = re.compile(r"(?m)(?:" + _TOC_ITEM + r"){" + str(MIN_TOC_RUN) + ",}")
+_WORD = re.compile(r"[a-z][a-z'-]*")
+
+BOILERPLATE_WEIGHT = 3.0
+FIGURE_WEIGHT = 0.5
+
+
+def _toc_entries(text: str) -> int:
+    """Number of table-of-contents entries in `text`."""
+    in_runs = sum(len(_TOC_INLINE.findall(run.group())) for run in _TOC_RUN.finditer(text))
+    return in_runs + len(_TOC_ANCHORED.findall(_TOC_RUN.sub(" ", text)))
+
+
+class RelevanceFilter:
+    """
+    Cheap local scoring of chunks before the LLM: investor vocabulary and
+    figures per 100 words, minus a penalty for table-of-contents entries and
+    audit, glossary and signature boilerplate. Chunks scoring below
+    `threshold` are not worth an LLM call.
+
+    Parameters
+    ----------
+    threshold : float
+        Minimum score of a chunk sent to the LLM (0: keep everything that is
+        not clearly boilerplate).
+    min_words : int
+        Texts shorter than this are scored as if this long, so a lone keyword
+        does not make a snippet relevant.
+    """
+
+    def __init__(self, threshold: float = 1.0, min_words: int = 50):
+        self.threshold = threshold
+        self.min_words = min_words
+        self.stats = {"chunks": 0, "skipped": 0, "tokens_avoided": 0}
+        # Concurrent analyses record from worker threads
+        self._lock = threading.Lock()
+
+    def score(self, text: str) -> float:
+        """Relevance score of `text`: signal hits per 100 words, net of boilerplate."""
+        lowered = text.lower()
+        words = max(len(_WORD.findall(lowered)), self.min_words)
+        signal = len(_INVESTOR.findall(lowered)) + FIGURE_WEIGHT * len(_FIGURE.findall(lowered))
+        noise = BOILERPLATE_WEIGHT * len(_BOILERPLATE.findall(lowered)) + _toc_entries(text)
+        return 100 * (signal - noise) / words
+
+    def is_relevant(self, text: str) -> bool:
+        return self.score(text) >= self.threshold
+
+    def select(self, chunks: List[str]) -> List[bool]:
+        """Whether each chunk should be sent to the LLM."""
+        return [self.is_relevant(chunk) for chunk in chunks]
+
+    def record(self, kept: List[bool], tokens: List[int]) -> Dict[str, int]:
+        """
+        Add one document's decisions and per-chunk prompt tokens to `stats`.
+
+        Returns
+        -------
+        dict
+            Chunks skipped and prompt tokens avoided in this document.
+        """
+        skipped = kept.count(False)
+        avoided = sum(t for keep, t in zip(kept, tokens) if not keep)
+        with self._lock:
+            self.stats["chunks"] += len(kept)
+            self.stats["skipped"] += skipped
+            self.stats["tokens_avoided"] += avoided
+        if skipped:
+            logger.info(f"Relevance filter skipped {skipped}/{len(kept)} chunks, avoiding ~{avoided} prompt tokens.")
+        return {"skipped": skipped, "tokens_avoided": avoided}
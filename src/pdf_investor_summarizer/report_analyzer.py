@@ -1,8 +1,10 @@
 # src/pdf_investor_summarizer/report_analyzer.py
 
 import os
+from concurrent.futures import Executor
+from functools import partial
 from pathlib import Path
-from typing import Union, List, Dict, Any
+from typing import Union, List, Dict, Any, Optional, Tuple
 import asyncio
 import logging
 
@@ -10,10 +12,15 @@ logger = logging.getLogger(__name__)
 
 from src.pdf_investor_summarizer.pdf_loader import PdfLoader
 from src.pdf_investor_summarizer.text_cleaner import TextCleaner
-from src.pdf_investor_summarizer.chunker import Chunker
+from src.pdf_investor_summarizer.chunker import Chunk, Chunker
 from src.pdf_investor_summarizer.extractor import Extractor
 from src.pdf_investor_summarizer.merger import Merger
-from src.pdf_investor_summarizer.utils.cost import count_tokens
+from src.pdf_investor_summarizer.relevance import RelevanceFilter
+from src.pdf_investor_summarizer.scheduler import ChunkBatcher, LLMScheduler
+from src.pdf_investor_summarizer.utils.cache import get_cache, get_document_cache
+from src.pdf_investor_summarizer.utils.clients import ClientRegistry, get_clients
+from src.pdf_investor_summarizer.utils.cost import count_tokens_batch
+from src.pdf_investor_summarizer.utils.profiler import Profiler
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -29,6 +36,60 @@ def estimate_total_cost(prompt_tokens: int, completion_tokens: int, prompt_per_1
     return (prompt_tokens / 1000) * prompt_per_1k + (completion_tokens / 1000) * completion_per_1k
 
 
+def prepare_chunks(
+    source: Union[str, Path, bytes],
+    cleaner: TextCleaner,
+    chunker: Chunker,
+    loader_kwargs: Optional[dict] = None,
+    profiler: Optional[Profiler] = None,
+) -> List[Chunk]:
+    """
+    CPU-bound half of the pipeline: load, clean and chunk one document.
+
+    A module-level function over picklable parts, so it can also run in a
+    process pool (see the batch runner). With a `profiler`, the "load"
+    (including "ocr"), "clean" and "chunk" stages are timed.
+    """
+    profiler = profiler or Profiler()
+    with profiler.stage("load"), PdfLoader(source, profiler=profiler, **(loader_kwargs or {})) as loader:
+        pages = loader.load()
+    logger.info(f"Loaded {len(pages)} pages from PDF.")
+
+    with profiler.stage("clean"):
+        cleaned_pages = cleaner.clean_pages(pages, profiler=profiler)
+    logger.info(f"Cleaned pages. Example [0]: {cleaned_pages[0][:200] if cleaned_pages else '<EMPTY>'}")
+
+    logger.info(f"Full text length after cleaning: {sum(len(page) for page in cleaned_pages)}")
+
+    with profiler.stage("chunk"):
+        chunks = chunker.split_pages(cleaned_pages)
+    profiler.incr("chunks", len(chunks))
+    logger.info(f"Chunking complete: {len(chunks)} chunks.")
+    for i, chunk in enumerate(chunks):
+        logger.debug(f"Chunk[{i}] pages {chunk.pages} ({len(chunk.text)} chars): {repr(chunk.text[:250])}")
+    return chunks
+
+
+def prepare_chunks_report(
+    source: Union[str, Path, bytes],
+    cleaner: TextCleaner,
+    chunker: Chunker,
+    loader_kwargs: Optional[dict] = None,
+) -> Tuple[List[Chunk], Dict[str, Any]]:
+    """
+    prepare_chunks with its own Profiler, for executors (process pools
+    included) that a caller's profiler cannot be sent to.
+
+    Returns
+    -------
+    Tuple[List[Chunk], dict]
+        The chunks and the profiler's report(), to merge with Profiler.absorb().
+    """
+    profiler = Profiler()
+    chunks = prepare_chunks(source, cleaner, chunker, loader_kwargs, profiler=profiler)
+    return chunks, profiler.report()
+
+
 class ReportAnalyzer:
     """
     Full pipeline for extracting investment-relevant info from a company report PDF.
@@ -40,50 +101,338 @@ class ReportAnalyzer:
         overlap: int = 400,
         min_line_length: int = 10,
         extractor_kwargs: dict = None,
+        streaming: bool = False,
+        scheduler_kwargs: dict = None,
+        chunker: Chunker = None,
+        loader_kwargs: dict = None,
+        batch_tokens: Optional[int] = None,
+        strip_boilerplate: bool = False,
+        relevance_threshold: Optional[float] = None,
+        shared_clients: bool = True,
+        prepare_executor: Optional[Executor] = None,
+        clean_workers: int = 1,
     ):
+        """
+        Parameters
+        ----------
+        clean_workers : int
+            Processes TextCleaner.clean_pages uses on long documents (1: in-process).
+        prepare_executor : Executor, optional
+            Where analyze_async loads, OCRs, cleans and chunks documents, off the
+            event loop. Defaults to the loop's thread pool, which keeps the loop
+            responsive; a ProcessPoolExecutor (shareable by many analyzers) also
+            parses concurrent documents in parallel. OCR additionally fans out
+            to processes with loader_kwargs={"ocr_workers": n}. The executor is
+            not shut down by the analyzer. Streaming mode always uses threads.
+        shared_clients : bool
+            Take the LLM client from the process-wide ClientRegistry, reusing
+            its client and keep-alive connections across analyzers (default).
+            With False the analyzer gets its own registry, closed by aclose().
+        relevance_threshold : float, optional
+            If set, chunks scoring below it in RelevanceFilter (tables of
+            contents, audit reports, glossaries...) are not sent to the LLM;
+            the calls and prompt tokens avoided are counted in the metrics.
+        strip_boilerplate : bool
+            Drop running headers, footers and disclaimers repeated across pages
+            before chunking (see TextCleaner.find_boilerplate). Needs the whole
+            document, so streaming mode does not apply it.
+        batch_tokens : int, optional
+            If set, analyze_async packs small chunks (possibly from concurrently
+            analyzed documents) into shared LLM requests of up to this many chunk
+            tokens, saving the per-request prompt template overhead.
+        loader_kwargs : dict, optional
+            Options for PdfLoader (ocr_lang, ocr_dpi, ocr_workers...).
+        chunker : Chunker, optional
+            Chunking strategy, e.g. TokenChunker for token-budget chunks.
+            Defaults to Chunker(chunk_size, overlap) (characters).
+        scheduler_kwargs : dict, optional
+            Options for the LLMScheduler wrapping Extractor.aextract
+            (max_concurrency, requests_per_minute, tokens_per_minute, retries...).
+        streaming : bool
+            If True, analyze_async streams pages through cleaning and chunking and
+            dispatches each chunk to the LLM as soon as it is ready, overlapping
+            PDF parsing/OCR with network latency instead of loading everything first.
+        """
         self.chunk_size = chunk_size
         self.overlap = overlap
-        self.cleaner = TextCleaner(min_line_length=min_line_length)
-        self.extractor = Extractor(**(extractor_kwargs or {}))
+        self.streaming = streaming
+        self.loader_kwargs = loader_kwargs or {}
+        self.chunker = chunker or Chunker(chunk_size, overlap)
+        self.cleaner = TextCleaner(
+            min_line_length=min_line_length,
+            keep_paragraphs=self.chunker.paragraph_aware,
+            strip_boilerplate=strip_boilerplate,
+            workers=clean_workers,
+        )
+        self.shared_clients = shared_clients
+        self.clients = get_clients() if shared_clients else ClientRegistry()
+        self.extractor = Extractor(**{"clients": self.clients, **(extractor_kwargs or {})})
+        self.scheduler = LLMScheduler(**(scheduler_kwargs or {}))
+        self.batcher = ChunkBatcher(self.extractor, self.scheduler, max_tokens=batch_tokens) if batch_tokens else None
+        self.relevance = RelevanceFilter(relevance_threshold) if relevance_threshold is not None else None
         self.merger = Merger()
+        self.prepare_executor = prepare_executor
 
-    def analyze(self, source: Union[str, Path, bytes]) -> Dict[str, Any]:
+    async def aclose(self) -> None:
         """
-        Synchronous version for backward compatibility.
+        Wait for batched requests still in flight and close the analyzer's own
+        clients (shared_clients=False). Shared clients stay open for other
+        analyzers; close them with get_clients().aclose() at shutdown.
         """
-        pages = PdfLoader(source).load()
-        cleaned_pages = self.cleaner.clean_pages(pages)
-        full_text = "\n".join(cleaned_pages)
-        chunks = Chunker(self.chunk_size, self.overlap).split(full_text)
-        results: List[dict] = [self.extractor.extract(chunk) for chunk in chunks]
-        summary = self.merger.merge(results)
+        if self.batcher is not None:
+            await self.batcher.aclose()
+        if not self.shared_clients:
+            await self.clients.aclose()
+
+    def close(self) -> None:
+        """Synchronous counterpart of aclose() for analyzers used with analyze()."""
+        if not self.shared_clients:
+            self.clients.close()
+
+    async def __aenter__(self) -> "ReportAnalyzer":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    def __enter__(self) -> "ReportAnalyzer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def analyze(self, source: Union[str, Path, bytes], profiler: Optional[Profiler] = None) -> Dict[str, Any]:
+        """
+        Synchronous version for backward compatibility. Returns the merged
+        fields only; pass a `profiler` to collect metrics.
+        """
+        profiler = profiler or Profiler()
+        chunks = prepare_chunks(source, self.cleaner, self.chunker, self.loader_kwargs, profiler=profiler)
+        kept = self._prefilter([chunk.text for chunk in chunks], profiler)
+        with profiler.activate(), profiler.stage("extract"):
+            results: List[dict] = [
+                self.extractor.extract(chunk.text) if keep else {} for chunk, keep in zip(chunks, kept)
+            ]
+        with profiler.stage("merge"):
+            summary = self.merger.merge(results, pages=[chunk.pages for chunk in chunks])
         return summary
 
     async def analyze_async(self, source: Union[str, Path, bytes]) -> Dict[str, Any]:
+        """
+        Analyze one report. The result holds the merged fields, their
+        "provenance", "usage" and "metrics" (stage timings, LLM latency
+        percentiles, cache hit ratios and counters; see utils.profiler for
+        JSON/Prometheus export).
+
+        CPU-bound work (parsing, OCR, cleaning, chunking, token counting,
+        merging) runs in executors, so many documents can be analyzed
+        concurrently on one event loop.
+        """
         logger.info(f"PDF loading: {source} (type: {type(source)})")
-        pages = PdfLoader(source).load()
-        logger.info(f"Loaded {len(pages)} pages from PDF.")
+        profiler = self.new_profiler()
+        if self.streaming:
+            with profiler.activate(), profiler.stage("extract"):
+                chunk_tokens, results, pages = await self._extract_streaming(source, profiler)
+            logger.info(f"Streaming complete: {len(chunk_tokens)} chunks.")
+            return await self._summarize_async(chunk_tokens, results, profiler, pages=pages)
 
-        cleaned_pages = self.cleaner.clean_pages(pages)
-        logger.info(f"Cleaned pages. Example [0]: {cleaned_pages[0][:200] if cleaned_pages else '<EMPTY>'}")
+        chunks = await self.prepare_async(source, profiler)
+        return await self.analyze_chunks_async(
+            [chunk.text for chunk in chunks], profiler=profiler, pages=[chunk.pages for chunk in chunks]
+        )
 
-        full_text = "\n".join(cleaned_pages)
-        logger.info(f"Full text length after cleaning: {len(full_text)}")
+    async def prepare_async(self, source: Union[str, Path, bytes], profiler: Optional[Profiler] = None) -> List[Chunk]:
+        """
+        prepare_chunks in `prepare_executor`, without blocking the event loop.
+        The worker's stage timings and counters are added to `profiler`.
+        """
+        loop = asyncio.get_running_loop()
+        chunks, report = await loop.run_in_executor(
+            self.prepare_executor,
+            prepare_chunks_report,
+            source,
+            self.cleaner,
+            self.chunker,
+            self.loader_kwargs,
+        )
+        if profiler is not None:
+            profiler.absorb(report)
+        return chunks
+
+    @staticmethod
+    def new_profiler() -> Profiler:
+        """Profiler for one analysis, watching the LLM result and document caches."""
+        llm_cache = get_cache()
+        document_cache = get_document_cache()
+        profiler = Profiler()
+        profiler.watch_cache("llm", lambda: {
+            "hits": llm_cache.stats["memory_hits"] + llm_cache.stats["backend_hits"],
+            "misses": llm_cache.stats["misses"],
+        })
+        profiler.watch_cache("documents", lambda: document_cache.stats)
+        return profiler
+
+    async def analyze_chunks_async(
+        self,
+        chunks: List[str],
+        profiler: Optional[Profiler] = None,
+        pages: Optional[List[List[int]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        I/O-bound half of the pipeline: extract every chunk through the
+        scheduler, then merge and attach usage and metrics. `pages` (the page
+        indices of each chunk) is recorded in the merged facts' provenance.
+        """
+        profiler = profiler or self.new_profiler()
+        loop = asyncio.get_running_loop()
+        with profiler.activate(), profiler.stage("extract"):
+            if self.batcher is not None:
+                # The batcher packs by chunk tokens and reports the prompt tokens attributed to each chunk
+                chunk_tokens, kept = await loop.run_in_executor(
+                    None, self._count_and_filter, chunks, profiler, False
+                )
+                extracted = iter(await asyncio.gather(*(
+                    self.batcher.extract(c, t) for c, t, keep in zip(chunks, chunk_tokens, kept) if keep
+                )))
+                extracted = [next(extracted) if keep else ({}, 0) for keep in kept]
+                results = [result for result, _ in extracted]
+                prompt_tokens = [tokens for _, tokens in extracted]
+            else:
+                # Pre-flight: count the full rendered prompts in one batched pass
+                prompt_tokens, kept = await loop.run_in_executor(None, self._count_and_filter, chunks, profiler)
+                sent = iter(await self.scheduler.map(
+                    self.extractor.aextract,
+                    [chunk for chunk, keep in zip(chunks, kept) if keep],
+                    tokens=[tokens for tokens, keep in zip(prompt_tokens, kept) if keep],
+                ))
+                results = [next(sent) if keep else {} for keep in kept]
+                prompt_tokens = [tokens if keep else 0 for tokens, keep in zip(prompt_tokens, kept)]
+        return await self._summarize_async(prompt_tokens, results, profiler, pages=pages)
+
+    def _count_and_filter(
+        self, chunks: List[str], profiler: Profiler, prompts: bool = True
+    ) -> Tuple[List[int], List[bool]]:
+        """
+        Tokens of each chunk (of its full rendered prompt with `prompts`) and
+        whether to send it to the LLM. CPU-bound for long documents, so the
+        async paths run it in a worker thread.
+        """
+        texts = [self.extractor.render_prompt(chunk) for chunk in chunks] if prompts else chunks
+        tokens = count_tokens_batch(texts, model=self.extractor.model)
+        return tokens, self._prefilter(chunks, profiler, tokens=tokens)
+
+    def _prefilter(self, chunks: List[str], profiler: Profiler, tokens: Optional[List[int]] = None) -> List[bool]:
+        """
+        Which chunks to send to the LLM (all of them without a relevance
+        filter). Skipped chunks and their prompt tokens (`tokens`, or counted
+        here) are recorded on the filter stats and the profiler.
+        """
+        if self.relevance is None:
+            return [True] * len(chunks)
+        with profiler.stage("relevance"):
+            kept = self.relevance.select(chunks)
+        if tokens is None:
+            skipped = iter(count_tokens_batch(
+                [self.extractor.render_prompt(chunk) for chunk, keep in zip(chunks, kept) if not keep],
+                model=self.extractor.model,
+            ))
+            tokens = [0 if keep else next(skipped) for keep in kept]
+        report = self.relevance.record(kept, tokens)
+        profiler.incr("relevance_skipped_chunks", report["skipped"])
+        profiler.incr("relevance_tokens_avoided", report["tokens_avoided"])
+        return kept
+
+    async def _extract_chunk(self, chunk: str, tokens: int) -> Tuple[dict, int]:
+        """
+        Extract one chunk through the batcher or the scheduler. `tokens` are
+        the chunk's own tokens with a batcher, else those of its prompt.
+
+        Returns
+        -------
+        Tuple[dict, int]
+            The result and the prompt tokens attributed to the chunk.
+        """
+        if self.batcher is not None:
+            return await self.batcher.extract(chunk, tokens)
+        return await self.scheduler.submit(self.extractor.aextract, chunk, tokens=tokens), tokens
+
+    async def _extract_streaming(
+        self, source: Union[str, Path, bytes], profiler: Profiler
+    ) -> Tuple[List[int], List[dict], List[List[int]]]:
+        """
+        Stream pages -> cleaned pages -> chunks, submitting an LLM request per chunk
+        to the scheduler as soon as it is emitted.
+
+        Returns
+        -------
+        Tuple[List[int], List[dict], List[List[int]]]
+            Prompt tokens per chunk, extraction results and the page indices
+            of each chunk, all in chunk order.
+        """
+        loop = asyncio.get_running_loop()
+        # Loading, OCR, cleaning and chunking run in a worker thread so that
+        # requests already in flight make progress on the event loop meanwhile.
+        loader = await loop.run_in_executor(None, partial(PdfLoader, source, profiler=profiler, **self.loader_kwargs))
+        cleaned_pages = self.cleaner.iter_clean_pages(loader.iter_pages())
+        chunk_stream = self.chunker.iter_split_pages(cleaned_pages)
 
-        chunks = Chunker(self.chunk_size, self.overlap).split(full_text)
-        logger.info(f"Chunking complete: {len(chunks)} chunks.")
-        for i, chunk in enumerate(chunks):
-            logger.debug(f"Chunk[{i}] ({len(chunk)} chars): {repr(chunk[:250])}")
+        tasks: List[asyncio.Future] = []
+        pages: List[List[int]] = []
+        try:
+            while True:
+                with profiler.stage("prepare"):
+                    chunk = await loop.run_in_executor(None, next, chunk_stream, None)
+                if chunk is None:
+                    break
+                profiler.incr("chunks")
+                pages.append(chunk.pages)
+                chunk = chunk.text
+                # Scoring and token counting are CPU work too: keep them off the event loop
+                tokens, kept = await loop.run_in_executor(
+                    None, self._count_and_filter, [chunk], profiler, self.batcher is None
+                )
+                if not kept[0]:
+                    skipped = loop.create_future()
+                    skipped.set_result(({}, 0))
+                    tasks.append(skipped)
+                    continue
+                logger.debug(f"Chunk[{len(tasks)}] ({len(chunk)} chars) dispatched: {repr(chunk[:250])}")
+                tasks.append(asyncio.ensure_future(self._extract_chunk(chunk, tokens[0])))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            loader.close()
+        extracted = await asyncio.gather(*tasks)
+        return [tokens for _, tokens in extracted], [result for result, _ in extracted], pages
 
+    async def _summarize_async(
+        self,
+        chunk_tokens: List[int],
+        results: List[dict],
+        profiler: Profiler,
+        pages: Optional[List[List[int]]] = None,
+    ) -> Dict[str, Any]:
+        """_summarize in a worker thread: merging thousands of facts takes a while."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self._summarize, chunk_tokens, results, profiler, pages=pages))
+
+    def _summarize(
+        self,
+        chunk_tokens: List[int],
+        results: List[dict],
+        profiler: Profiler,
+        pages: Optional[List[List[int]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Log token usage and estimated costs, merge chunk results and attach usage and metrics.
+        """
         # ---- TOKEN LOGGING ----
-        total_prompt_tokens = sum(count_tokens(chunk) for chunk in chunks)
+        total_prompt_tokens = sum(chunk_tokens)
         total_completion_tokens = 0
         logger.info(f"Total prompt tokens sent: {total_prompt_tokens}")
 
-        tasks = [self.extractor.aextract(chunk) for chunk in chunks]
-        results: List[dict] = await asyncio.gather(*tasks)
-
-        
         for i, res in enumerate(results):
             logger.info(f"LLM result[{i}]: {res}")
             if "usage" in res:
@@ -101,8 +450,11 @@ class ReportAnalyzer:
         logger.info(f"Estimated cost (gpt-4): ${estimate_total_cost(total_prompt_tokens, total_completion_tokens, gpt4_prompt_per_1k, gpt4_completion_per_1k):.4f}")
         logger.info(f"Estimated cost (gpt-4o): ${estimate_total_cost(total_prompt_tokens, total_completion_tokens, gpt4o_prompt_per_1k, gpt4o_completion_per_1k):.4f}")
 
-        summary = self.merger.merge(results)
+        with profiler.stage("merge"):
+            summary = self.merger.merge(results, pages=pages)
         logger.info(f"Final summary: {summary}")
+        profiler.incr("prompt_tokens", total_prompt_tokens)
+        profiler.incr("completion_tokens", total_completion_tokens)
 
         usage = {
             "total_prompt_tokens": total_prompt_tokens,
@@ -120,6 +472,7 @@ class ReportAnalyzer:
 
         return {
             **summary,
-            "usage": usage
+            "usage": usage,
+            "metrics": profiler.report(),
         }
 
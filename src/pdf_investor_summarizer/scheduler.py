@@ -0,0 +1,324 @@
+# src/pdf_investor_summarizer/scheduler.py
+
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sequence, Set, Tuple, Type
+import logging
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+from src.pdf_investor_summarizer.utils.cost import count_tokens
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for a budget expressed per time period (e.g. per minute).
+
+    The bucket holds at most `limit` units and refills continuously at
+    `limit / period` units per second. Waiters are served in FIFO order.
+    """
+
+    def __init__(self, limit: float, period: float = 60.0):
+        """
+        Parameters
+        ----------
+        limit : float
+            Units (requests or tokens) allowed per period.
+        period : float
+            Length of the budget period in seconds.
+        """
+        self.limit = limit
+        self.period = period
+        self._available = float(limit)
+        self._updated: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            rate = self.limit / self.period
+            self._available = min(self.limit, self._available + (now - self._updated) * rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """
+        Wait until `amount` units are available and consume them.
+        Requests larger than the whole budget are capped to it.
+
+        Returns
+        -------
+        float
+            Seconds spent waiting.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._lock = loop, asyncio.Lock()
+        amount = min(amount, self.limit)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill(loop.time())
+                if self._available >= amount:
+                    self._available -= amount
+                    return waited
+                delay = (amount - self._available) * self.period / self.limit
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+# Transient API failures worth retrying: rate limits, timeouts, dropped
+# connections and 5xx. Authentication errors, bad requests (context length)
+# and bugs fail at once.
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+class LLMScheduler:
+    """
+    Runs LLM calls with a concurrency cap, request/token-per-minute budgets
+    and retries with exponential backoff and full jitter.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        retry_on: Tuple[Type[BaseException], ...] = RETRYABLE_ERRORS,
+    ):
+        """
+        Parameters
+        ----------
+        max_concurrency : int
+            Maximum number of calls in flight at once.
+        requests_per_minute : float, optional
+            Request budget; None disables request throttling.
+        tokens_per_minute : float, optional
+            Prompt-token budget, charged with the token count given per call;
+            None disables token throttling.
+        max_retries : int
+            Retries per call after the first attempt fails.
+        base_delay, max_delay : float
+            Backoff before retry n is drawn uniformly from
+            [0, min(max_delay, base_delay * 2**n)].
+        retry_on : tuple of exception types
+            Exceptions that trigger a retry (default: RETRYABLE_ERRORS);
+            anything else propagates at once. The scheduler is the only retry
+            layer: shared ChatOpenAI clients are built with max_retries=0.
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.request_limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+        self.token_limiter = RateLimiter(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to one loop; recreate them for a new loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._semaphore = loop, asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given 0-based retry attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def submit(self, func: Callable[..., Awaitable[Any]], *args: Any, tokens: int = 0) -> Any:
+        """
+        Run one call under the concurrency cap and rate budgets, retrying failures.
+
+        Parameters
+        ----------
+        func : async callable
+            The call to make, e.g. Extractor.aextract.
+        *args
+            Positional arguments for `func`.
+        tokens : int
+            Estimated tokens charged against the token budget per attempt.
+        """
+        semaphore = self._get_semaphore()
+        attempt = 0
+        while True:
+            if self.request_limiter:
+                self.stats["throttled_seconds"] += await self.request_limiter.acquire(1)
+            if self.token_limiter:
+                self.stats["throttled_seconds"] += await self.token_limiter.acquire(tokens)
+            async with semaphore:
+                self.stats["calls"] += 1
+                try:
+                    return await func(*args)
+                except self.retry_on as e:
+                    if attempt >= self.max_retries:
+                        self.stats["failures"] += 1
+                        logger.error(f"LLM call failed after {attempt + 1} attempts: {e}")
+                        raise
+                    error = e
+            delay = self.backoff(attempt)
+            attempt += 1
+            self.stats["retries"] += 1
+            logger.warning(f"LLM call failed ({error}); retry {attempt}/{self.max_retries} in {delay:.2f}s.")
+            await asyncio.sleep(delay)
+
+    async def map(
+        self,
+        func: Callable[[Any], Awaitable[Any]],
+        items: Iterable[Any],
+        tokens: Optional[Sequence[int]] = None,
+    ) -> List[Any]:
+        """
+        Apply `func` to every item through submit() and return results in input order.
+        """
+        items = list(items)
+        tokens = tokens if tokens is not None else [0] * len(items)
+        return await asyncio.gather(*(self.submit(func, item, tokens=t) for item, t in zip(items, tokens)))
+
+
+class ChunkBatcher:
+    """
+    Packs small chunks into shared LLM requests (Extractor.aextract_batch) to
+    save the fixed prompt-template overhead paid by every request.
+
+    Chunks submitted concurrently, from one document or several, are
+    collected until their tokens reach `max_tokens`, `max_sections` chunks are
+    waiting or `max_wait` seconds pass, then sent as one scheduled request.
+    Chunks larger than `max_tokens` / 2 go alone through Extractor.aextract.
+    Sections the batched answer fails to cover are retried individually.
+
+    Parameters
+    ----------
+    extractor : Extractor
+        Provides aextract, aextract_batch and the prompt renderers.
+    scheduler : LLMScheduler
+        Every request, batched or not, goes through it.
+    max_tokens : int
+        Budget of chunk tokens packed into one request.
+    max_sections : int
+        Maximum number of chunks per request.
+    max_wait : float
+        Seconds a partial batch waits for more chunks before being sent.
+    """
+
+    def __init__(self, extractor, scheduler: LLMScheduler, max_tokens: int = 3000,
+                 max_sections: int = 8, max_wait: float = 0.05):
+        self.extractor = extractor
+        self.scheduler = scheduler
+        self.max_tokens = max_tokens
+        self.max_sections = max(1, max_sections)
+        self.max_wait = max_wait
+        self.stats = {"requests": 0, "batched_requests": 0, "batched_chunks": 0}
+        self._pending: List[Tuple[str, int, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Set[asyncio.Task] = set()
+
+    async def extract(self, chunk: str, tokens: int) -> Tuple[dict, int]:
+        """
+        Extract one chunk, possibly inside a batched request.
+
+        Parameters
+        ----------
+        chunk : str
+            Chunk text.
+        tokens : int
+            Token count of the chunk text alone.
+
+        Returns
+        -------
+        Tuple[dict, int]
+            The extraction result and the prompt tokens attributed to this chunk
+            (its own tokens plus an even share of the request's template overhead).
+        """
+        if tokens > self.max_tokens // 2 or self.max_sections == 1:
+            prompt_tokens = self._prompt_tokens(chunk)
+            self.stats["requests"] += 1
+            result = await self.scheduler.submit(self.extractor.aextract, chunk, tokens=prompt_tokens)
+            return result, prompt_tokens
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self._pending and self._pending_tokens + tokens > self.max_tokens:
+            self._flush()
+        self._pending.append((chunk, tokens, future))
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.max_sections:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    async def aclose(self) -> None:
+        """Send any partial batch and wait for the requests in flight."""
+        self._flush()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        group, self._pending, self._pending_tokens = self._pending, [], 0
+        if group:
+            task = asyncio.ensure_future(self._send(group))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    def _prompt_tokens(self, chunk: str) -> int:
+        return count_tokens(self.extractor.render_prompt(chunk), model=self.extractor.model)
+
+    async def _send(self, group: List[Tuple[str, int, asyncio.Future]]) -> None:
+        """
+        Resolve the futures of `group`, sending only the chunks whose batched
+        result is not cached. Each chunk is attributed its share of the prompt
+        tokens actually sent (0 for a cache hit), plus the prompt of its
+        retry when its section failed.
+        """
+        chunks = [chunk for chunk, _, _ in group]
+        attributed = [0] * len(group)
+        try:
+            results = self.extractor.cached_batch_results(chunks)
+            sent = [i for i, res in enumerate(results) if res is None]
+            if len(sent) == 1:
+                i = sent[0]
+                attributed[i] = self._prompt_tokens(chunks[i])
+                results[i] = await self.scheduler.submit(self.extractor.aextract, chunks[i], tokens=attributed[i])
+                self.stats["requests"] += 1
+            elif sent:
+                batch = [chunks[i] for i in sent]
+                prompt_tokens = count_tokens(self.extractor.render_batch_prompt(batch), model=self.extractor.model)
+                batch_results = await self.scheduler.submit(self.extractor.aextract_batch, batch, tokens=prompt_tokens)
+                self.stats["requests"] += 1
+                self.stats["batched_requests"] += 1
+                self.stats["batched_chunks"] += len(batch)
+                overhead = (prompt_tokens - sum(group[i][1] for i in sent)) / len(sent)
+                for section, (i, res) in enumerate(zip(sent, batch_results), start=1):
+                    attributed[i] = round(group[i][1] + overhead)
+                    if "error" in res:
+                        # Sections the batched answer did not cover get a request of their own
+                        logger.warning(f"Batched section {section} failed ({res['error']}); retrying alone.")
+                        retry_tokens = self._prompt_tokens(chunks[i])
+                        res = await self.scheduler.submit(self.extractor.aextract, chunks[i], tokens=retry_tokens)
+                        attributed[i] += retry_tokens
+                        self.stats["requests"] += 1
+                    results[i] = res
+        except Exception as e:
+            for _, _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result, tokens in zip(group, results, attributed):
+            if not future.done():
+                future.set_result((result, tokens))
@@ -1,56 +1,630 @@
 import asyncio
 import functools
+import gzip
 import hashlib
 import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
 from pathlib import Path
-from typing import Callable, TypeVar, Any, Awaitable
+from typing import Callable, TypeVar, Any, Awaitable, Dict, Iterator, Optional, Tuple, Union
 
 F = TypeVar("F", bound=Callable[..., Any])
 
 CACHE_DIR = Path(".cache")
-CACHE_DIR.mkdir(exist_ok=True)
+
+# Bump when the key material or the cached result format changes; entries
+# written under another version are never read and can be purged.
+CACHE_KEY_VERSION = 1
+
+# Sentinel returned by TieredCache.get on a miss (None is a valid cached value)
+MISS = object()
+
 
 def _hash(text: str) -> str:
     """Compute SHA-256 hash of the input text."""
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
-def disk_cache(func: F) -> F:
+
+def make_key(material: Dict[str, Any]) -> str:
+    """
+    Build a versioned cache key from everything that determines a result
+    (model, generation parameters, rendered prompt...).
+    """
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return f"v{CACHE_KEY_VERSION}-{_hash(encoded)}"
+
+
+def is_current_key(key: str) -> bool:
+    return key.startswith(f"v{CACHE_KEY_VERSION}-")
+
+
+def is_cacheable(result: Any) -> bool:
+    """Default persistence policy: never cache failed extractions (dicts carrying an "error")."""
+    return not (isinstance(result, dict) and "error" in result)
+
+
+class CacheBackend:
+    """
+    Interface of a persistent cache tier.
+
+    Backends store JSON payload strings by key together with their write time,
+    and know how to shrink themselves to a byte budget.
+    """
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (payload, created_at) for `key`, or None if absent."""
+        raise NotImplementedError
+
+    def set(self, key: str, payload: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size_bytes(self) -> int:
+        raise NotImplementedError
+
+    def evict(self, max_bytes: int) -> int:
+        """Drop least recently written/used entries until the tier fits in `max_bytes`. Returns entries removed."""
+        raise NotImplementedError
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over all (key, payload) pairs."""
+        raise NotImplementedError
+
+
+class DirectoryBackend(CacheBackend):
+    """
+    One JSON file per key in a directory (the original `.cache/` layout).
+
+    Parameters
+    ----------
+    path : Path, optional
+        Cache directory. Defaults to the module-level CACHE_DIR, resolved on
+        every call so it can be redirected at runtime.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = Path(path) if path is not None else None
+        self._approx_bytes: Optional[int] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path if self._path is not None else CACHE_DIR
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        # A single open() replaces the exists() + read_text() pair
+        try:
+            with open(self._file(key), "r", encoding="utf-8") as f:
+                created = os.fstat(f.fileno()).st_mtime
+                return f.read(), created
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, payload: str) -> None:
+        path = self.path
+        path.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_name = tempfile.mkstemp(dir=path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_name, self._file(key))
+        if self._approx_bytes is not None:
+            self._approx_bytes += len(payload.encode("utf-8"))
+
+    def delete(self, key: str) -> None:
+        try:
+            self._file(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for entry in self._scan():
+            self.delete(Path(entry.name).stem)
+        self._approx_bytes = 0
+
+    def _scan(self):
+        try:
+            return [e for e in os.scandir(self.path) if e.is_file() and e.name.endswith(".json")]
+        except FileNotFoundError:
+            return []
+
+    def size_bytes(self) -> int:
+        if self._approx_bytes is None:
+            self._approx_bytes = sum(e.stat().st_size for e in self._scan())
+        return self._approx_bytes
+
+    def evict(self, max_bytes: int) -> int:
+        # Cheap running estimate first: only scan the directory when over budget
+        if self.size_bytes() <= max_bytes:
+            return 0
+        entries = sorted(((e.stat(), e) for e in self._scan()), key=lambda se: se[0].st_mtime)
+        total = sum(st.st_size for st, _ in entries)
+        removed = 0
+        for st, entry in entries:
+            if total <= max_bytes:
+                break
+            self.delete(Path(entry.name).stem)
+            total -= st.st_size
+            removed += 1
+        self._approx_bytes = total
+        return removed
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        for entry in self._scan():
+            try:
+                yield Path(entry.name).stem, Path(entry.path).read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    All entries in a single SQLite file, evicted in least-recently-used order.
+
+    Parameters
+    ----------
+    path : Path, optional
+        Database file. Defaults to CACHE_DIR / "cache.sqlite3".
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else CACHE_DIR / "cache.sqlite3"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, "
+            "accessed REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache(accessed)")
+        # Running total of entry sizes, loaded on first use; other processes
+        # writing the same file make it drift, evict() resyncs when over budget
+        self._approx_bytes: Optional[int] = None
+
+    def _entry_size(self, key: str) -> int:
+        row = self._conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else 0
+
+    def _sum_sizes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key))
+        return (row[0], row[1]) if row is not None else None
+
+    def set(self, key: str, payload: str) -> None:
+        now = time.time()
+        size = len(payload.encode("utf-8"))
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes += size - self._entry_size(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, now, now, size),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if self._approx_bytes is not None:
+                self._approx_bytes -= self._entry_size(key)
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._approx_bytes = 0
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._sum_sizes()
+            return self._approx_bytes
+
+    def evict(self, max_bytes: int) -> int:
+        # Cheap running total first: only sum and scan the table when over budget
+        if self.size_bytes() <= max_bytes:
+            return 0
+        with self._lock:
+            total = self._sum_sizes()
+            if total <= max_bytes:
+                self._approx_bytes = total
+                return 0
+            removed = []
+            for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed"):
+                if total <= max_bytes:
+                    break
+                removed.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM cache WHERE key = ?", removed)
+            self._approx_bytes = total
+        return len(removed)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM cache").fetchall()
+        yield from rows
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class MemoryLRU:
+    """
+    Process-local LRU front tier holding payload strings, bounded by entry count.
+    """
+
+    def __init__(self, max_items: int = 1024):
+        self.max_items = max_items
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, payload: str, created: float) -> None:
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            self._data[key] = (payload, created)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache:
+    """
+    Two-tier cache: an in-memory LRU in front of a persistent CacheBackend,
+    with optional TTL, a byte budget for the persistent tier and hit/miss counters.
+
+    Parameters
+    ----------
+    backend : CacheBackend
+        Persistent tier (DirectoryBackend or SQLiteBackend).
+    memory_items : int
+        Capacity of the in-memory LRU tier (0 disables it).
+    ttl : float, optional
+        Seconds an entry stays valid after being written. None means forever.
+    max_bytes : int, optional
+        Size budget of the persistent tier; oldest entries are evicted beyond it.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        memory_items: int = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.backend = backend
+        self.memory = MemoryLRU(memory_items)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats: Dict[str, int] = {"memory_hits": 0, "backend_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for `key`, or MISS."""
+        entry = self.memory.get(key)
+        if entry is not None and not self._expired(entry[1]):
+            self.stats["memory_hits"] += 1
+            return json.loads(entry[0])
+        entry = self.backend.get(key)
+        if entry is not None:
+            if self._expired(entry[1]):
+                self.delete(key)
+            else:
+                self.stats["backend_hits"] += 1
+                self.memory.set(key, entry[0], entry[1])
+                return json.loads(entry[0])
+        self.stats["misses"] += 1
+        return MISS
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value)
+        self.memory.set(key, payload, time.time())
+        self.backend.set(key, payload)
+        self.stats["writes"] += 1
+        if self.max_bytes is not None:
+            self.stats["evictions"] += self.backend.evict(self.max_bytes)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        self.backend.clear()
+
+    @property
+    def hit_ratio(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["backend_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+_cache: Optional[TieredCache] = None
+
+
+def get_cache() -> TieredCache:
+    """Return the process-wide cache used by @disk_cache (directory layout by default)."""
+    global _cache
+    if _cache is None:
+        _cache = TieredCache(DirectoryBackend())
+    return _cache
+
+
+def configure_cache(
+    backend: Union[str, CacheBackend] = "directory",
+    path: Optional[Path] = None,
+    memory_items: int = 1024,
+    ttl: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+) -> TieredCache:
+    """
+    Replace the process-wide cache used by @disk_cache.
+
+    Parameters
+    ----------
+    backend : str or CacheBackend
+        "directory" (one JSON file per entry), "sqlite" (single file) or a backend instance.
+    path : Path, optional
+        Directory or database file for the built-in backends.
+    memory_items, ttl, max_bytes
+        See TieredCache.
+    """
+    global _cache
+    if backend == "directory":
+        backend = DirectoryBackend(path)
+    elif backend == "sqlite":
+        backend = SQLiteBackend(path)
+    elif not isinstance(backend, CacheBackend):
+        raise ValueError(f"Unknown cache backend: {backend!r}")
+    _cache = TieredCache(backend, memory_items=memory_items, ttl=ttl, max_bytes=max_bytes)
+    return _cache
+
+
+class DocumentCache:
+    """
+    Store for per-document loader output (page texts, per-page OCR results),
+    kept apart from the LLM result cache: one gzip-compressed JSON file per
+    key, so page texts of large reports take a fraction of their raw size.
+
+    Parameters
+    ----------
+    path : Path, optional
+        Directory for the entries. Defaults to ``CACHE_DIR / "documents"``,
+        resolved on every call so it can be redirected at runtime.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = Path(path) if path is not None else None
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "writes": 0}
+
+    @property
+    def path(self) -> Path:
+        return self._path if self._path is not None else CACHE_DIR / "documents"
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.json.gz"
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for `key`, or MISS (also for unreadable entries)."""
+        try:
+            with gzip.open(self._file(key), "rt", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, EOFError, ValueError):
+            # Missing, truncated or corrupt entries are all treated as misses
+            self.stats["misses"] += 1
+            return MISS
+        self.stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        path = self.path
+        path.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(gzip.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), compresslevel=6))
+        os.replace(tmp_name, self._file(key))
+        self.stats["writes"] += 1
+
+    def clear(self) -> None:
+        try:
+            entries = [e for e in os.scandir(self.path) if e.is_file() and e.name.endswith(".json.gz")]
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+_document_cache: Optional[DocumentCache] = None
+
+
+def get_document_cache() -> DocumentCache:
+    """Return the process-wide DocumentCache used by PdfLoader(use_cache=True)."""
+    global _document_cache
+    if _document_cache is None:
+        _document_cache = DocumentCache()
+    return _document_cache
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls that share a key: the first caller runs the
+    call, later callers on the same event loop await its result instead of
+    issuing a duplicate request.
+    """
+
+    def __init__(self):
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.stats: Dict[str, int] = {"leaders": 0, "coalesced": 0}
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.setdefault(loop, {})
+        while key in calls:
+            future = calls[key]
+            try:
+                # shield: a cancelled follower must not cancel the shared call
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue  # the leader was cancelled, not us: take over
+                raise
+            self.stats["coalesced"] += 1
+            return result
+
+        future = loop.create_future()
+        calls[key] = future
+        self.stats["leaders"] += 1
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved: there may be no followers
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del calls[key]
+
+
+single_flight = SingleFlight()
+
+
+def _cache_key(args: tuple) -> str:
+    # Support both methods (self, chunk, ...) and functions (chunk, ...)
+    if len(args) == 0:
+        raise ValueError("No arguments provided to the cached function.")
+    if hasattr(args[0], "__class__") and len(args) > 1:
+        owner, text_arg = args[0], args[1]
+        key_material = getattr(owner, "cache_key_material", None)
+        if callable(key_material):
+            return make_key(key_material(text_arg))
+    else:
+        text_arg = args[0]
+    # Plain functions keep the original text-only key
+    return _hash(text_arg)
+
+
+def disk_cache(func: Optional[F] = None, *, should_cache: Callable[[Any], bool] = is_cacheable) -> F:
     """
     Decorator that caches sync or async method/function output based on its first string argument.
+
+    If the method's owner defines ``cache_key_material(text) -> dict``, the key is
+    a versioned hash of that material (see make_key) instead of the text alone.
+    Results for which `should_cache(result)` is False are returned but not stored.
+    Concurrent async calls with the same key are coalesced (see SingleFlight).
+    Usable as ``@disk_cache`` or ``@disk_cache(should_cache=...)``.
     """
+    if func is None:
+        return functools.partial(disk_cache, should_cache=should_cache)  # type: ignore
+
     @functools.wraps(func)
     def sync_wrapper(*args, **kwargs):
-        # Support both methods (self, chunk, ...) and functions (chunk, ...)
-        if len(args) == 0:
-            raise ValueError("No arguments provided to the cached function.")
-        if hasattr(args[0], "__class__") and len(args) > 1:
-            text_arg = args[1]
-        else:
-            text_arg = args[0]
-        cache_file = CACHE_DIR / f"{_hash(text_arg)}.json"
-        if cache_file.exists():
-            return json.loads(cache_file.read_text(encoding="utf-8"))
+        cache = get_cache()
+        key = _cache_key(args)
+        cached = cache.get(key)
+        if cached is not MISS:
+            return cached
         result = func(*args, **kwargs)
-        cache_file.write_text(json.dumps(result), encoding="utf-8")
+        if should_cache(result):
+            cache.set(key, result)
         return result
 
     @functools.wraps(func)
     async def async_wrapper(*args, **kwargs):
-        # Support async methods/functions
-        if len(args) == 0:
-            raise ValueError("No arguments provided to the cached function.")
-        if hasattr(args[0], "__class__") and len(args) > 1:
-            text_arg = args[1]
-        else:
-            text_arg = args[0]
-        cache_file = CACHE_DIR / f"{_hash(text_arg)}.json"
-        if cache_file.exists():
-            return json.loads(cache_file.read_text(encoding="utf-8"))
-        result = await func(*args, **kwargs)
-        cache_file.write_text(json.dumps(result), encoding="utf-8")
-        return result
+        cache = get_cache()
+        key = _cache_key(args)
+        cached = cache.get(key)
+        if cached is not MISS:
+            return cached
+
+        async def call():
+            result = await func(*args, **kwargs)
+            if should_cache(result):
+                cache.set(key, result)
+            return result
+
+        # Identical in-flight calls share one request
+        return await single_flight.run(key, call)
 
     if asyncio.iscoroutinefunction(func):
         return async_wrapper  # type: ignore
     else:
         return sync_wrapper  # type: ignore
+
+
+def purge(cache: TieredCache, errors: bool = True, stale: bool = False) -> int:
+    """
+    Remove invalid entries from the persistent tier.
+
+    Parameters
+    ----------
+    errors : bool
+        Remove cached failures (results carrying an "error" field).
+    stale : bool
+        Remove entries whose key is not in the current versioned scheme
+        (text-only keys from before versioning, or older versions).
+
+    Returns
+    -------
+    int
+        Number of entries removed.
+    """
+    doomed = []
+    for key, payload in cache.backend.items():
+        if stale and not is_current_key(key):
+            doomed.append(key)
+        elif errors:
+            try:
+                value = json.loads(payload)
+            except ValueError:
+                doomed.append(key)
+                continue
+            if not is_cacheable(value):
+                doomed.append(key)
+    for key in doomed:
+        cache.delete(key)
+    return len(doomed)
@@ -0,0 +1,138 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+import logging
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """
+    Network clients shared by every analyzer in the process: one ChatOpenAI
+    per model configuration, all on the same keep-alive httpx connection
+    pools, and one pooled requests.Session for PDF downloads. Building
+    analyzers per request then costs neither client construction nor new
+    TLS handshakes.
+
+    The async httpx pool belongs to the event loop that first uses it: call
+    aclose() before the loop ends (e.g. at service shutdown, or at the end of
+    each asyncio.run()). Closing bumps `generation`; clients are recreated on
+    next use, and existing Extractors switch to the new ones by themselves.
+
+    Parameters
+    ----------
+    max_connections : int
+        Upper bound of open connections per pool.
+    max_keepalive_connections : int
+        Idle connections kept open for reuse.
+    keepalive_expiry : float
+        Seconds an idle connection is kept.
+    timeout : float
+        Request timeout in seconds for LLM calls.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 60.0,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.stats = {"chat_models": 0, "chat_model_hits": 0}
+        # Incremented by close(): chat models handed out before are unusable
+        self.generation = 0
+        self._chat_models: Dict[Tuple, Any] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._async_http_client: Optional[httpx.AsyncClient] = None
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.RLock()
+
+    def http_client(self) -> httpx.Client:
+        """Pooled client for synchronous LLM calls."""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=self.limits, timeout=self.timeout)
+            return self._http_client
+
+    def async_http_client(self) -> httpx.AsyncClient:
+        """Pooled client for asynchronous LLM calls."""
+        with self._lock:
+            if self._async_http_client is None:
+                self._async_http_client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            return self._async_http_client
+
+    def http_session(self) -> requests.Session:
+        """Pooled session for PDF downloads."""
+        with self._lock:
+            if self._session is None:
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2)
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    def chat_model(self, **config: Any):
+        """
+        The shared ChatOpenAI for `config` (model, temperature, max_tokens,
+        openai_api_key, base_url...), created on first request. The client
+        does not retry by itself (max_retries=0 unless given): LLMScheduler
+        owns retries, so they do not multiply.
+        """
+        from langchain_openai import ChatOpenAI
+
+        key = tuple(sorted(config.items()))
+        with self._lock:
+            llm = self._chat_models.get(key)
+            if llm is not None:
+                self.stats["chat_model_hits"] += 1
+                return llm
+            llm = ChatOpenAI(
+                **{"max_retries": 0, **{name: value for name, value in config.items() if value is not None}},
+                http_client=self.http_client(),
+                http_async_client=self.async_http_client(),
+            )
+            self._chat_models[key] = llm
+            self.stats["chat_models"] += 1
+            logger.debug(f"Created ChatOpenAI client for model {config.get('model')}.")
+            return llm
+
+    def close(self) -> None:
+        """Close the synchronous pools and forget the chat models (async pool: see aclose)."""
+        with self._lock:
+            self._chat_models.clear()
+            self.generation += 1
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    async def aclose(self) -> None:
+        """Close every pool, including the async one, and forget the chat models."""
+        with self._lock:
+            async_client, self._async_http_client = self._async_http_client, None
+        self.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+
+_clients: Optional[ClientRegistry] = None
+_clients_lock = threading.Lock()
+
+
+def get_clients() -> ClientRegistry:
+    """Return the process-wide client registry."""
+    global _clients
+    with _clients_lock:
+        if _clients is None:
+            _clients = ClientRegistry()
+        return _clients
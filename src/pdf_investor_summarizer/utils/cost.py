@@ -1,8 +1,43 @@
+import logging
+from typing import Dict, List, Sequence
+
 import tiktoken
 
+logger = logging.getLogger(__name__)
+
+_encodings: Dict[str, tiktoken.Encoding] = {}
+
+
+def get_encoding(model: str = "gpt-3.5-turbo") -> tiktoken.Encoding:
+    """
+    Return the tiktoken encoding for `model`, built once per model and process.
+    Models unknown to tiktoken fall back to cl100k_base.
+    """
+    encoding = _encodings.get(model)
+    if encoding is None:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            logger.warning(f"No tiktoken encoding registered for {model!r}, using cl100k_base.")
+            encoding = tiktoken.get_encoding("cl100k_base")
+        _encodings[model] = encoding
+    return encoding
+
+
 def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
-    enc = tiktoken.encoding_for_model(model)
-    return len(enc.encode(text))
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+
+def count_tokens_batch(texts: Sequence[str], model: str = "gpt-3.5-turbo", num_threads: int = 8) -> List[int]:
+    """
+    Count tokens for many texts at once; tiktoken encodes the batch across
+    `num_threads` threads (the encoder releases the GIL).
+    """
+    if not texts:
+        return []
+    encoded = get_encoding(model).encode_batch(list(texts), num_threads=num_threads, disallowed_special=())
+    return [len(tokens) for tokens in encoded]
+
 
 def estimate_cost(total_tokens: int, price_per_1k: float) -> float:
-    return (total_tokens / 1000) * price_per_1k
\ No newline at end of file
+    return (total_tokens / 1000) * price_per_1k
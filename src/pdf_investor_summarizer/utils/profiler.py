@@ -0,0 +1,200 @@
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Profiler of the analysis running in the current context. Deep call sites
+# (LLM calls inside cached Extractor methods) report to it without every
+# signature in between having to carry it; asyncio tasks inherit it.
+_active: ContextVar[Optional["Profiler"]] = ContextVar("active_profiler", default=None)
+
+LATENCY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Profiler:
+    """
+    Collects timings and counters for one analysis: accumulated wall time per
+    pipeline stage, latency of every LLM request, named counters (pages, OCR
+    pages, tokens...) and hit ratios of watched caches over the analysis.
+    Safe to update from worker threads.
+
+    Stage times add up over repeated blocks and may nest or overlap (OCR runs
+    inside "load"; in streaming mode preparation overlaps extraction), so
+    "wall_seconds" is reported separately.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.counters: Dict[str, float] = {}
+        self._caches: Dict[str, Tuple[Callable[[], Mapping[str, int]], Dict[str, int]]] = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block; repeated blocks with the same name add up."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    @contextmanager
+    def llm_call(self) -> Iterator[None]:
+        """Time one LLM request."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.latencies.append(elapsed)
+
+    def incr(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def absorb(self, report: Mapping[str, Any]) -> None:
+        """
+        Add the stage times and counters of another profiler's report(), e.g.
+        one filled in a worker process, where this profiler cannot go.
+        """
+        with self._lock:
+            for name, seconds in report.get("stages", {}).items():
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+            for name, amount in report.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def watch_cache(self, name: str, stats: Callable[[], Mapping[str, int]]) -> None:
+        """
+        Report the "hits" and "misses" returned by `stats` as the change since now.
+        Caches shared by concurrent analyses are attributed to each of them.
+        """
+        self._caches[name] = (stats, dict(stats()))
+
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        """Make this the profiler that LLM calls in the current context report to."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def report(self) -> Dict[str, Any]:
+        """Snapshot as a JSON-serializable dict."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            stages = {name: round(seconds, 6) for name, seconds in self.stages.items()}
+            counters = dict(self.counters)
+        latency = {
+            "count": len(latencies),
+            "mean": round(sum(latencies) / len(latencies), 6) if latencies else 0.0,
+            "max": round(latencies[-1], 6) if latencies else 0.0,
+        }
+        for q in LATENCY_QUANTILES:
+            latency[f"p{round(q * 100)}"] = round(_percentile(latencies, q), 6)
+        caches = {}
+        for name, (stats, baseline) in self._caches.items():
+            current = stats()
+            hits = current.get("hits", 0) - baseline.get("hits", 0)
+            misses = current.get("misses", 0) - baseline.get("misses", 0)
+            total = hits + misses
+            caches[name] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else 0.0}
+        return {
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": stages,
+            "llm_latency": latency,
+            "cache": caches,
+            "counters": counters,
+        }
+
+
+def current_profiler() -> Optional[Profiler]:
+    return _active.get()
+
+
+def time_llm_call() -> ContextManager:
+    """Time an LLM request against the active profiler, if any."""
+    profiler = _active.get()
+    return profiler.llm_call() if profiler is not None else nullcontext()
+
+
+def metrics_to_json(metrics: Mapping[str, Any]) -> str:
+    """Serialize a Profiler.report() snapshot as JSON."""
+    return json.dumps(metrics, indent=2, sort_keys=True)
+
+
+def _labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def metrics_to_prometheus(
+    metrics: Mapping[str, Any],
+    prefix: str = "pdf_summarizer",
+    labels: Optional[Mapping[str, str]] = None,
+) -> str:
+    """
+    Render a Profiler.report() snapshot in the Prometheus text exposition format.
+
+    Parameters
+    ----------
+    metrics : mapping
+        The "metrics" entry of an analysis result.
+    prefix : str
+        Metric name prefix.
+    labels : mapping, optional
+        Extra labels put on every sample (e.g. {"document": "report.pdf"}).
+    """
+    labels = dict(labels or {})
+    lines: List[str] = []
+
+    def family(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+        if not samples:
+            return
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for suffix, extra, value in samples:
+            lines.append(f"{prefix}_{name}{suffix}{_labels({**labels, **extra})} {value}")
+
+    if "wall_seconds" in metrics:
+        family("wall_seconds", "gauge", "Wall time of the analysis.", [("", {}, metrics["wall_seconds"])])
+    family("stage_seconds", "gauge", "Wall time spent per pipeline stage.", [
+        ("", {"stage": stage}, seconds) for stage, seconds in sorted(metrics.get("stages", {}).items())
+    ])
+    latency = metrics.get("llm_latency", {})
+    if latency.get("count"):
+        quantiles = [
+            ("", {"quantile": str(q)}, latency[f"p{round(q * 100)}"])
+            for q in LATENCY_QUANTILES if f"p{round(q * 100)}" in latency
+        ]
+        family("llm_latency_seconds", "summary", "Latency of LLM requests.", quantiles + [
+            ("_sum", {}, round(latency["mean"] * latency["count"], 6)),
+            ("_count", {}, latency["count"]),
+        ])
+    family("cache_hit_ratio", "gauge", "Hit ratio per cache.", [
+        ("", {"cache": name}, stats["hit_ratio"]) for name, stats in sorted(metrics.get("cache", {}).items())
+    ])
+    for name, value in sorted(metrics.get("counters", {}).items()):
+        family(f"{name}_total", "counter", f"Total {name.replace('_', ' ')}.", [("", {}, value)])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.pdf_investor_summarizer.batch import BatchRunner, discover_pdfs
+from src.pdf_investor_summarizer.chunker import Chunk
+
+
+@pytest.fixture
+def runner_factory(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    # Threads stand in for processes so the stubs below apply to the workers
+    monkeypatch.setattr("src.pdf_investor_summarizer.batch.ProcessPoolExecutor", ThreadPoolExecutor)
+    prepared = []
+
+    def fake_prepare(source, cleaner, chunker, loader_kwargs):
+        prepared.append(source.name)
+        if source.name == "broken.pdf":
+            raise ValueError("not a PDF")
+        report = {"stages": {"load": 0.5}, "counters": {"pages": 2, "chunks": 2}}
+        return [Chunk(f"{source.stem} chunk {i}", [i]) for i in range(2)], report
+
+    monkeypatch.setattr("src.pdf_investor_summarizer.batch.prepare_chunks_report", fake_prepare)
+
+    def make():
+        runner = BatchRunner(tmp_path / "out", workers=2)
+
+        async def fake_analyze_chunks(chunks, profiler=None, pages=None):
+            return {"key_triggers": chunks, "usage": {}, "metrics": profiler.report()}
+
+        runner.analyzer.analyze_chunks_async = fake_analyze_chunks
+        return runner
+
+    return make, prepared
+
+
+def test_batch_writes_outputs_and_resumes_from_manifest(runner_factory, tmp_path):
+    make, prepared = runner_factory
+    inbox = tmp_path / "inbox"
+    (inbox / "2024").mkdir(parents=True)
+    for name in ["2024/alpha.pdf", "beta.pdf", "broken.pdf"]:
+        (inbox / name).write_bytes(b"%PDF-1.4")
+    (inbox / "notes.txt").write_text("ignored")
+
+    sources = discover_pdfs([inbox])
+    assert [s.name for s in sources] == ["alpha.pdf", "beta.pdf", "broken.pdf"]
+
+    counts = asyncio.run(make().run(sources, root=inbox))
+    assert counts == {"done": 2, "failed": 1, "skipped": 0}
+    alpha = json.loads((tmp_path / "out" / "2024" / "alpha.json").read_text())
+    assert alpha["key_triggers"] == ["alpha chunk 0", "alpha chunk 1"]
+    # Worker-side preparation metrics reach the per-document output
+    assert alpha["metrics"]["stages"]["load"] == 0.5
+    assert alpha["metrics"]["counters"] == {"pages": 2, "chunks": 2}
+    manifest = json.loads((tmp_path / "out" / "manifest.json").read_text())["documents"]
+    assert manifest[str(inbox / "broken.pdf")]["status"] == "failed"
+    assert "not a PDF" in manifest[str(inbox / "broken.pdf")]["error"]
+
+    # Resume: only the failed document and modified documents are processed again
+    prepared.clear()
+    (inbox / "beta.pdf").write_bytes(b"%PDF-1.4 revised")
+    counts = asyncio.run(make().run(sources, root=inbox))
+    assert counts == {"done": 1, "failed": 1, "skipped": 1}
+    assert sorted(prepared) == ["beta.pdf", "broken.pdf"]
+
+
+def test_same_named_pdfs_without_common_root_get_distinct_outputs(runner_factory, tmp_path):
+    make, _ = runner_factory
+    sources = []
+    for folder in ["a", "b"]:
+        (tmp_path / folder).mkdir()
+        source = tmp_path / folder / "report.pdf"
+        source.write_bytes(b"%PDF-1.4")
+        sources.append(source)
+
+    runner = make()
+    counts = asyncio.run(runner.run(sources))
+    assert counts == {"done": 2, "failed": 0, "skipped": 0}
+    outputs = [runner.output_path(source) for source in sources]
+    assert outputs[0] != outputs[1]
+    assert all(output.name.startswith("report-") for output in outputs)
+    assert json.loads(outputs[1].read_text())["key_triggers"] == ["report chunk 0", "report chunk 1"]
+
+    # Colliding outputs (here: case-only suffix difference under a root) are refused before any work
+    (tmp_path / "a" / "report.PDF").write_bytes(b"%PDF-1.4")
+    with pytest.raises(ValueError, match="would both be written"):
+        asyncio.run(runner.run([tmp_path / "a" / "report.pdf", tmp_path / "a" / "report.PDF"], root=tmp_path))
+
+
+def test_missing_source_is_recorded_as_failed(runner_factory, monkeypatch, tmp_path):
+    make, _ = runner_factory
+    present = tmp_path / "present.pdf"
+    present.write_bytes(b"%PDF-1.4")
+    missing = tmp_path / "missing.pdf"
+
+    def prepare_or_fail(source, cleaner, chunker, loader_kwargs):
+        if not source.exists():
+            raise FileNotFoundError(source)
+        return [Chunk("present chunk", [0])], {}
+
+    monkeypatch.setattr("src.pdf_investor_summarizer.batch.prepare_chunks_report", prepare_or_fail)
+    runner = make()
+    counts = asyncio.run(runner.run([present, missing]))
+    assert counts == {"done": 1, "failed": 1, "skipped": 0}
+    entry = runner.manifest.documents[str(missing)]
+    assert entry["status"] == "failed" and entry["fingerprint"] is None
+    assert not runner.manifest.is_done(missing)
+
+
+def test_documents_in_flight_are_bounded(runner_factory, tmp_path):
+    make, _ = runner_factory
+    sources = []
+    for i in range(6):
+        sources.append(tmp_path / f"doc{i}.pdf")
+        sources[-1].write_bytes(b"%PDF-1.4")
+    in_flight = [0, 0]
+
+    async def slow_analyze_chunks(chunks, profiler=None, pages=None):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        return {"usage": {}}
+
+    runner = make()
+    runner.max_documents = 2
+    runner.analyzer.analyze_chunks_async = slow_analyze_chunks
+    assert asyncio.run(runner.run(sources))["done"] == 6
+    assert in_flight[1] == 2
+
+
+def test_run_closes_the_analyzer_clients(runner_factory, monkeypatch, tmp_path):
+    make, _ = runner_factory
+    source = tmp_path / "doc.pdf"
+    source.write_bytes(b"%PDF-1.4")
+    runner = make()
+    closed = []
+
+    async def aclose():
+        closed.append("analyzer")
+
+    async def clients_aclose():
+        closed.append("clients")
+
+    runner.analyzer.aclose = aclose
+    monkeypatch.setattr(runner.analyzer.clients, "aclose", clients_aclose)
+    asyncio.run(runner.run([source]))
+    assert closed == ["analyzer", "clients"]
+
+    # Also when the run is refused
+    closed.clear()
+    with pytest.raises(ValueError):
+        asyncio.run(runner.run([source, tmp_path / "doc.PDF"], root=tmp_path))
+    assert closed == ["analyzer", "clients"]
@@ -1,6 +1,9 @@
 # tests/test_cache.py
 
+import os
 import shutil
+import time
+
 import pytest
 
 from src.pdf_investor_summarizer.utils.cache import disk_cache, _hash, CACHE_DIR
@@ -50,3 +53,156 @@ def test_disk_cache_loads_from_file(tmp_path):
 
     # Restore the original
     fake_heavy_compute.__wrapped__ = original
+
+
+def test_memory_tier_serves_repeat_lookups(tmp_path):
+    from src.pdf_investor_summarizer.utils.cache import TieredCache, DirectoryBackend
+
+    cache = TieredCache(DirectoryBackend(tmp_path), memory_items=2)
+    cache.set("k1", {"v": 1})
+    (tmp_path / "k1.json").unlink()  # only the memory tier still has it
+
+    assert cache.get("k1") == {"v": 1}
+    assert cache.stats["memory_hits"] == 1
+
+    cache.set("k2", {"v": 2})
+    cache.set("k3", {"v": 3})  # evicts k1 from the 2-entry LRU
+    from src.pdf_investor_summarizer.utils.cache import MISS
+    assert cache.get("k1") is MISS
+    assert cache.get("k2") == {"v": 2}
+    assert cache.hit_ratio == 2 / 3
+
+
+@pytest.mark.parametrize("backend_name", ["directory", "sqlite"])
+def test_backends_ttl_and_size_eviction(tmp_path, monkeypatch, backend_name):
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+
+    path = tmp_path / ("entries" if backend_name == "directory" else "cache.sqlite3")
+    cache = cache_mod.configure_cache(backend_name, path=path, memory_items=0, max_bytes=250)
+
+    for i in range(10):
+        cache.set(f"key{i}", {"payload": "x" * 40, "i": i})
+        # Distinct write times so eviction order is deterministic
+        if backend_name == "directory":
+            os.utime(path / f"key{i}.json", (1000 + i, 1000 + i))
+    assert cache.backend.size_bytes() <= 250
+    assert cache.stats["evictions"] > 0
+    assert cache.get("key0") is cache_mod.MISS
+    assert cache.get("key9") == {"payload": "x" * 40, "i": 9}
+
+    cache.ttl = 60
+    real_time = time.time
+    monkeypatch.setattr(cache_mod.time, "time", lambda: real_time() + 3600)
+    assert cache.get("key9") is cache_mod.MISS
+    assert cache.backend.get("key9") is None
+    cache_mod._cache = None
+
+
+def test_disk_cache_uses_configured_sqlite_backend(tmp_path):
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+
+    cache_mod.configure_cache("sqlite", path=tmp_path / "c.sqlite3")
+    try:
+        assert fake_heavy_compute("sqlite") == {"echo": "etilqs"}
+        assert cache_mod.get_cache().backend.get(_hash("sqlite")) is not None
+        assert not (tmp_path / f"{_hash('sqlite')}.json").exists()
+    finally:
+        cache_mod._cache = None
+
+
+def test_failures_are_not_persisted(tmp_path):
+    calls = []
+
+    @disk_cache
+    def flaky(text: str) -> dict:
+        calls.append(text)
+        return {"error": "bad json", "raw": text}
+
+    assert flaky("boom")["error"] == "bad json"
+    assert flaky("boom")["error"] == "bad json"
+    assert calls == ["boom", "boom"]
+    assert not (tmp_path / f"{_hash('boom')}.json").exists()
+
+
+def test_purge_removes_errors_and_stale_keys(tmp_path):
+    from src.pdf_investor_summarizer.utils.cache import (
+        DirectoryBackend, TieredCache, make_key, purge, MISS
+    )
+
+    cache = TieredCache(DirectoryBackend(tmp_path), memory_items=0)
+    current = make_key({"model": "m", "prompt": "p"})
+    cache.set(current, {"key_triggers": []})
+    cache.set(make_key({"model": "m", "prompt": "q"}), {"error": "x", "raw": ""})
+    cache.set(_hash("legacy chunk"), {"key_triggers": []})
+
+    assert purge(cache, errors=True, stale=False) == 1
+    assert purge(cache, errors=False, stale=True) == 1
+    assert [key for key, _ in cache.backend.items()] == [current]
+    assert cache.get(current) is not MISS
+
+
+def test_concurrent_identical_async_calls_are_coalesced():
+    import asyncio
+    from src.pdf_investor_summarizer.utils.cache import single_flight
+
+    calls = []
+
+    @disk_cache
+    async def slow_llm(text: str) -> dict:
+        calls.append(text)
+        await asyncio.sleep(0.01)
+        return {"echo": text}
+
+    async def run():
+        return await asyncio.gather(
+            slow_llm("disclaimer"), slow_llm("disclaimer"), slow_llm("other"), slow_llm("disclaimer")
+        )
+
+    before = single_flight.stats["coalesced"]
+    results = asyncio.run(run())
+
+    assert [r["echo"] for r in results] == ["disclaimer", "disclaimer", "other", "disclaimer"]
+    assert sorted(calls) == ["disclaimer", "other"]
+    assert single_flight.stats["coalesced"] - before == 2
+
+
+def test_coalesced_callers_share_failures():
+    import asyncio
+
+    calls = []
+
+    @disk_cache
+    async def failing_llm(text: str) -> dict:
+        calls.append(text)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("429")
+
+    async def run():
+        return await asyncio.gather(failing_llm("x"), failing_llm("x"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert calls == ["x"]
+
+
+def test_sqlite_backend_tracks_size_without_summing_on_every_write(tmp_path):
+    from src.pdf_investor_summarizer.utils.cache import SQLiteBackend
+
+    backend = SQLiteBackend(tmp_path / "cache.sqlite3")
+    backend.set("a", "x" * 100)
+    assert backend.size_bytes() == 100
+    statements = []
+    backend._conn.set_trace_callback(statements.append)
+    backend.set("b", "y" * 50)
+    backend.set("a", "z" * 30)  # replacing an entry counts its new size only
+    backend.delete("b")
+    assert backend.evict(max_bytes=1000) == 0
+    assert not any("SUM(size)" in statement for statement in statements)
+    backend._conn.set_trace_callback(None)
+    assert backend.size_bytes() == backend._sum_sizes() == 30
+
+    # Over budget: the table is rescanned and least recently used entries go
+    backend.set("c", "w" * 40)
+    assert backend.evict(max_bytes=50) == 1
+    assert backend.size_bytes() == 40 and backend.get("a") is None
+    backend.close()
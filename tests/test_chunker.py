@@ -26,3 +26,137 @@ def test_huge_overlap_no_infinite_loop():
     assert len(chunks) < 1000
     # No infinite loop, but lots of overlapping chunks
     assert all(len(chunk) <= 400 for chunk in chunks)
+
+
+def test_iter_split_matches_split_on_joined_pages():
+    pages = ["alpha " * 37, "", "beta " * 120, "gamma" * 3, "delta " * 61]
+    for chunk_size, overlap in [(50, 10), (100, 0), (64, 63), (5000, 100)]:
+        ch = Chunker(chunk_size=chunk_size, overlap=overlap)
+        assert list(ch.iter_split(iter(pages))) == ch.split("\n".join(pages))
+    assert list(Chunker().iter_split([])) == Chunker().split("")
+
+
+def test_iter_split_pages_matches_split_pages():
+    from src.pdf_investor_summarizer.chunker import BoundaryChunker, ContentDefinedChunker
+
+    pages = ["Alpha grew. " * 30, "", "Beta fell. " * 90, "gamma" * 3, "Delta rose. " * 50]
+    chunkers = [Chunker(50, 10), Chunker(100, 0), Chunker(64, 63), Chunker(5000, 100),
+                BoundaryChunker(300, 50), ContentDefinedChunker(300, 50)]
+    for ch in chunkers:
+        streamed = list(ch.iter_split_pages(iter(pages)))
+        assert streamed == ch.split_pages(pages)
+        assert [chunk.text for chunk in streamed] == list(ch.iter_split(iter(pages)))
+    assert list(Chunker().iter_split_pages([])) == []
+
+
+class FakeEncoding:
+    """Offline stand-in for a tiktoken Encoding: one token per word (with its leading space)."""
+
+    def __init__(self):
+        import re
+        self.pattern = re.compile(r"\s*\S+|\s+")
+        self.vocab = {}
+        self.encode_calls = 0
+
+    def encode(self, text, disallowed_special=()):
+        self.encode_calls += 1
+        pieces = self.pattern.findall(text)
+        return [self.vocab.setdefault(p, len(self.vocab)) for p in pieces]
+
+    def decode_with_offsets(self, tokens):
+        inverse = {v: k for k, v in self.vocab.items()}
+        offsets, pos = [], 0
+        for t in tokens:
+            offsets.append(pos)
+            pos += len(inverse[t])
+        return "".join(inverse[t] for t in tokens), offsets
+
+
+def test_token_chunker_packs_token_budget_with_overlap():
+    from src.pdf_investor_summarizer.chunker import TokenChunker
+
+    words = [f"w{i}" for i in range(25)]
+    text = " ".join(words)
+    enc = FakeEncoding()
+    chunks = TokenChunker(chunk_size=10, overlap=2, encoding=enc).split(text)
+
+    assert enc.encode_calls == 1
+    assert [len(c.split()) for c in chunks] == [10, 10, 9]
+    assert chunks[0].split()[-2:] == chunks[1].split()[:2]
+    # Chunks are exact slices of the source text
+    assert all(c in text for c in chunks)
+    assert TokenChunker(encoding=enc).split("") == []
+
+
+def test_split_pages_records_page_provenance():
+    pages = ["a" * 30, "b" * 30, "c" * 30]
+    chunks = Chunker(chunk_size=40, overlap=0).split_pages(pages)
+    assert "\n".join(pages) == "".join(c.text for c in chunks)
+    assert [c.pages for c in chunks] == [[0, 1], [1, 2], [2]]
+
+
+def test_boundary_chunker_cuts_on_sentences_and_prefers_pages():
+    from src.pdf_investor_summarizer.chunker import BoundaryChunker
+
+    sentence = "Revenue grew strongly in the period. "
+    text = (sentence * 10).strip()
+    chunks = BoundaryChunker(chunk_size=200, overlap=0, min_fill=0.5).split(text)
+    assert all(len(c) <= 200 for c in chunks)
+    assert all(c.endswith(".") for c in chunks)
+    assert " ".join(chunks) == text
+
+    # A page edge inside the acceptance window wins over later sentence edges
+    pages = [(sentence * 3).strip(), (sentence * 3).strip()]
+    page_chunks = BoundaryChunker(chunk_size=150, overlap=0, min_fill=0.5).split_pages(pages)
+    assert page_chunks[0].text == pages[0]
+    assert page_chunks[0].pages == [0]
+    assert page_chunks[1].pages == [1]
+
+
+def test_boundary_chunker_overlaps_whole_sentences():
+    from src.pdf_investor_summarizer.chunker import BoundaryChunker
+
+    text = " ".join(f"Sentence number {i} is here." for i in range(20))
+    chunks = BoundaryChunker(chunk_size=120, overlap=60, min_fill=0.5).split(text)
+    for prev, nxt in zip(chunks, chunks[1:]):
+        head = nxt.split(".")[0] + "."
+        assert head in prev  # the next chunk starts with a sentence repeated from the previous one
+        assert nxt.startswith("Sentence")
+
+
+def test_boundary_chunker_falls_back_to_words_and_hard_cuts():
+    from src.pdf_investor_summarizer.chunker import BoundaryChunker
+
+    words = "word " * 50
+    assert all(not c.endswith("wo") for c in BoundaryChunker(chunk_size=33, overlap=0).split(words))
+    assert BoundaryChunker(chunk_size=10, overlap=0).split("x" * 25) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_content_defined_chunker_localizes_edits():
+    import random
+
+    from src.pdf_investor_summarizer.chunker import ContentDefinedChunker
+
+    rng = random.Random(7)
+    words = "revenue growth margin guidance capex outlook segment demand pricing".split()
+    sentences = [" ".join(rng.choice(words) for _ in range(rng.randint(4, 20))).capitalize() + "." for _ in range(600)]
+    original = " ".join(sentences)
+    amended = " ".join(sentences[:300] + ["A new paragraph was inserted here."] + sentences[300:])
+
+    chunker = ContentDefinedChunker(chunk_size=1000, overlap=0)
+    before, after = chunker.split(original), chunker.split(amended)
+    assert all(len(c) <= 1000 for c in before + after)
+    assert " ".join(before) == original
+    # Only the chunk around the insertion differs; fixed offsets would shift everything after it
+    assert len(set(after) - set(before)) == 1
+    assert len(set(Chunker(1000, 0).split(amended)) - set(Chunker(1000, 0).split(original))) > 10
+
+
+def test_content_defined_chunker_overlap_and_fallbacks():
+    from src.pdf_investor_summarizer.chunker import ContentDefinedChunker
+
+    text = " ".join(f"Sentence number {i} is here." for i in range(40))
+    chunks = ContentDefinedChunker(chunk_size=150, overlap=60).split(text)
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert nxt.startswith("Sentence") and nxt.split(".")[0] + "." in prev
+    assert ContentDefinedChunker(chunk_size=10, overlap=0).split("x" * 25) == ["x" * 10, "x" * 10, "x" * 5]
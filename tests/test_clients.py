@@ -0,0 +1,152 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ANSWER = {"future_growth_prospects": ["Revenue growth of 8% is expected"], "key_business_changes": [],
+          "key_triggers": [], "material_factors": []}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """OpenAI-style chat completions and PDF downloads over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, body: bytes, content_type: str):
+        self.server.requests += 1
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.reply(json.dumps({
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": "gpt-3.5-turbo",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": json.dumps(ANSWER)}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+        }).encode(), "application/json")
+
+    def do_GET(self):
+        self.reply(b"%PDF-1.4 stub", "application/pdf")
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.connections = 0
+        self.requests = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+@pytest.fixture
+def stub_server():
+    server = CountingServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_analyzers_share_clients_and_connections(monkeypatch, tmp_path, stub_server):
+    from src.pdf_investor_summarizer.report_analyzer import ReportAnalyzer
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+    from src.pdf_investor_summarizer.utils import clients as clients_mod
+
+    registry = clients_mod.ClientRegistry()
+    monkeypatch.setattr(clients_mod, "_clients", registry)
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.count_tokens_batch",
+        lambda texts, model=None: [len(t.split()) for t in texts]
+    )
+    kwargs = dict(
+        extractor_kwargs={"base_url": f"http://127.0.0.1:{stub_server.server_port}/v1", "openai_api_key": "test"},
+        scheduler_kwargs={"max_concurrency": 1},
+    )
+
+    async def run_requests(shared: bool) -> list:
+        results = []
+        for request in range(3):
+            # One analyzer per incoming request, as in a web service
+            async with ReportAnalyzer(shared_clients=shared, **kwargs) as analyzer:
+                chunks = [f"{'shared' if shared else 'own'} request {request} chunk {i}" for i in range(2)]
+                results.append((analyzer.extractor.llm, await analyzer.analyze_chunks_async(chunks)))
+        if shared:
+            await registry.aclose()
+        return results
+
+    cache_mod.configure_cache(path=tmp_path)
+    try:
+        shared = asyncio.run(run_requests(shared=True))
+        assert (stub_server.connections, stub_server.requests) == (1, 6)
+        assert shared[0][0] is shared[2][0]
+        assert shared[0][0].max_retries == 0  # retries belong to LLMScheduler
+        assert registry.stats == {"chat_models": 1, "chat_model_hits": 2}
+        assert shared[0][1]["future_growth_prospects"] == ANSWER["future_growth_prospects"]
+
+        # Without sharing, every analyzer opens (and closes) its own connection
+        asyncio.run(run_requests(shared=False))
+        assert (stub_server.connections, stub_server.requests) == (4, 12)
+    finally:
+        cache_mod._cache = None
+
+
+def test_pdf_downloads_reuse_pooled_connection(monkeypatch, stub_server):
+    from src.pdf_investor_summarizer.pdf_loader import PdfLoader
+    from src.pdf_investor_summarizer.utils import clients as clients_mod
+
+    registry = clients_mod.ClientRegistry()
+    monkeypatch.setattr(clients_mod, "_clients", registry)
+    url = f"http://127.0.0.1:{stub_server.server_port}/report.pdf"
+    for _ in range(3):
+        with PdfLoader(url) as loader:
+            assert loader.buffer.read() == b"%PDF-1.4 stub"
+    registry.close()
+    assert (stub_server.connections, stub_server.requests) == (1, 3)
+
+
+def test_analyzer_survives_registry_close_between_event_loops(monkeypatch, tmp_path, stub_server):
+    from src.pdf_investor_summarizer.report_analyzer import ReportAnalyzer
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+    from src.pdf_investor_summarizer.utils import clients as clients_mod
+
+    registry = clients_mod.ClientRegistry()
+    monkeypatch.setattr(clients_mod, "_clients", registry)
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.count_tokens_batch",
+        lambda texts, model=None: [len(t.split()) for t in texts]
+    )
+    analyzer = ReportAnalyzer(extractor_kwargs={
+        "base_url": f"http://127.0.0.1:{stub_server.server_port}/v1", "openai_api_key": "test",
+    })
+
+    async def run_once(run: int) -> dict:
+        try:
+            return await analyzer.analyze_chunks_async([f"run {run} chunk"])
+        finally:
+            # As at the end of every asyncio.run() in a script or test suite
+            await registry.aclose()
+
+    cache_mod.configure_cache(path=tmp_path)
+    try:
+        first_llm = analyzer.extractor.llm
+        for run in range(2):
+            result = asyncio.run(run_once(run))
+            assert result["future_growth_prospects"] == ANSWER["future_growth_prospects"]
+        assert analyzer.extractor.llm is not first_llm
+        assert stub_server.requests == 2
+    finally:
+        cache_mod._cache = None
@@ -0,0 +1,32 @@
+from src.pdf_investor_summarizer.utils import cost
+
+
+class FakeEncoding:
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+    def encode_batch(self, texts, num_threads=8, disallowed_special=()):
+        self.batch_sizes.append(len(texts))
+        return [self.encode(t) for t in texts]
+
+
+def test_encoding_is_built_once_per_model(monkeypatch):
+    built = []
+
+    def fake_encoding_for_model(model):
+        built.append(model)
+        enc = FakeEncoding()
+        enc.batch_sizes = []
+        return enc
+
+    monkeypatch.setattr(cost.tiktoken, "encoding_for_model", fake_encoding_for_model)
+    monkeypatch.setattr(cost, "_encodings", {})
+
+    assert cost.count_tokens("one two three") == 3
+    assert cost.count_tokens("four five") == 2
+    assert cost.count_tokens("six", model="gpt-4o") == 1
+    assert built == ["gpt-3.5-turbo", "gpt-4o"]
+
+    assert cost.count_tokens_batch(["a b", "c", ""]) == [2, 1, 0]
+    assert cost.get_encoding().batch_sizes == [3]
+    assert cost.count_tokens_batch([]) == []
@@ -8,14 +8,102 @@ class DummyLLM:
         return DummyResponse()
 
 @pytest.fixture
-def dummy_extractor(monkeypatch):
+def dummy_extractor(monkeypatch, tmp_path):
     from src.pdf_investor_summarizer.extractor import Extractor
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+
+    # Keep cached results out of the working directory's .cache
+    cache_mod.configure_cache(path=tmp_path)
     ext = Extractor()
-    ext.llm = DummyLLM()  
-    return ext
+    ext.llm = DummyLLM()
+    yield ext
+    cache_mod._cache = None
 
 def test_extractor_returns_usage(dummy_extractor):
     res = dummy_extractor.extract("Test chunk")
     assert "usage" in res
     assert isinstance(res["usage"]["prompt_tokens"], int)
     assert res["future_growth_prospects"] == ["A"]
+
+
+def test_cache_key_covers_model_params_and_prompt(monkeypatch):
+    from src.pdf_investor_summarizer.extractor import Extractor
+    from src.pdf_investor_summarizer.utils.cache import make_key
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    base = Extractor()
+    variants = [
+        Extractor(model="gpt-4o"),
+        Extractor(temperature=0.7),
+        Extractor(max_tokens=1024),
+        Extractor(prompt_template="Summarize: {chunk}"),
+        Extractor(base_url="http://localhost:8000/v1"),
+    ]
+    base_key = make_key(base.cache_key_material("Test chunk"))
+    assert base_key == make_key(Extractor().cache_key_material("Test chunk"))
+    assert base_key.startswith("v1-")
+    for other in variants:
+        assert make_key(other.cache_key_material("Test chunk")) != base_key
+    base_batch_key = make_key(base.batch_cache_key_material("Test chunk"))
+    assert make_key(variants[-1].batch_cache_key_material("Test chunk")) != base_batch_key
+
+
+class BatchLLM:
+    """Answers a batched prompt with one section per <<<BEGIN SECTION n>>> marker, optionally dropping some."""
+
+    def __init__(self, drop=()):
+        self.drop = set(drop)
+        self.prompts = []
+        self.max_tokens = []
+
+    def bind(self, max_tokens):
+        self.max_tokens.append(max_tokens)
+        return self
+
+    async def ainvoke(self, prompt):
+        import json
+        import re
+
+        self.prompts.append(prompt)
+        sections = re.findall(r"<<<BEGIN SECTION (\d+)>>>\n(.*?)\n<<<END SECTION", prompt, re.S)
+        answer = {
+            n: {"future_growth_prospects": [text], "key_business_changes": [], "key_triggers": [], "material_factors": []}
+            for n, text in sections
+            if int(n) not in self.drop
+        }
+
+        class DummyResponse:
+            content = json.dumps(answer)
+            response_metadata = {"usage": {"prompt_tokens": 50, "completion_tokens": 20}}
+        return DummyResponse()
+
+
+def test_aextract_batch_demuxes_sections_and_caches(tmp_path, monkeypatch):
+    import asyncio
+    from src.pdf_investor_summarizer.extractor import Extractor
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+    from src.pdf_investor_summarizer.utils.cache import make_key
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    cache_mod.configure_cache(path=tmp_path)
+    try:
+        ext = Extractor(max_tokens=100)
+        ext.llm = BatchLLM(drop={2})
+        results = asyncio.run(ext.aextract_batch(["alpha", "beta", "gamma"]))
+
+        assert [r.get("future_growth_prospects") for r in results] == [["alpha"], None, ["gamma"]]
+        assert "error" in results[1]
+        assert results[0]["usage"]["completion_tokens"] == 20
+        assert results[2]["usage"] == {}
+        assert ext.llm.max_tokens == [300]
+
+        # Cached sections are not sent again; only the failed one is
+        ext.llm = BatchLLM()
+        results = asyncio.run(ext.aextract_batch(["alpha", "beta", "gamma"]))
+        assert [r["future_growth_prospects"] for r in results] == [["alpha"], ["beta"], ["gamma"]]
+        assert len(ext.llm.prompts) == 1 and "alpha" not in ext.llm.prompts[0]
+        # The request's usage goes to the section sent now, never to cache hits
+        assert results[0]["usage"] == {} and results[1]["usage"]["completion_tokens"] == 20
+        assert "usage" not in cache_mod.get_cache().get(make_key(ext.batch_cache_key_material("alpha")))
+    finally:
+        cache_mod._cache = None
@@ -22,3 +22,77 @@ def test_merger_deduplicates_and_filters_short():
     assert merged["future_growth_prospects"].count("Growth 20%") == 1  
     assert "Acquisition of X" in merged["key_business_changes"]
     assert len(merged["material_factors"]) == 1  
+
+
+def test_merger_clusters_near_duplicates_with_provenance():
+    results = [
+        {
+            "key_triggers": [
+                "The company expects revenue growth of 12% in 2024 driven by new contracts.",
+                "Margin pressure from rising input costs.",
+            ],
+            "usage": {"completion_tokens": 10},
+        },
+        {"error": "Invalid json output", "raw": "not json"},
+        {
+            "key_triggers": [
+                "The company expects revenue growth of 12% in 2024, driven by new contracts",
+                "The company expects revenue growth of 15% in 2024 driven by new contracts.",
+                {"nested": "ignored"},
+                None,
+            ],
+            "material_factors": "not a list",
+            "usage": {"completion_tokens": 12},
+        },
+    ]
+    merged = Merger().merge(results, pages=[[0, 1], [1], [1, 2]])
+
+    # Rewordings merge into the first wording; a different figure stays separate
+    assert merged["key_triggers"] == [
+        "The company expects revenue growth of 12% in 2024 driven by new contracts.",
+        "Margin pressure from rising input costs.",
+        "The company expects revenue growth of 15% in 2024 driven by new contracts.",
+    ]
+    assert merged["provenance"]["key_triggers"] == [
+        {"chunks": [0, 2], "pages": [0, 1, 2]},
+        {"chunks": [0], "pages": [0, 1]},
+        {"chunks": [2], "pages": [1, 2]},
+    ]
+    assert "usage" not in merged and merged["material_factors"] == []
+
+
+def test_merger_scales_to_many_facts():
+    import random
+
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    facts = [" ".join(rng.choice(vocabulary) for _ in range(12)) for _ in range(5000)]
+    results = [{"key_triggers": facts[i:i + 10]} for i in range(0, len(facts), 10)]
+    # Every fact appears twice, once reworded with a trailing filler word
+    results += [{"key_triggers": [fact + " overall" for fact in facts[i:i + 10]]} for i in range(0, len(facts), 10)]
+
+    merged = Merger().merge(results)
+    assert merged["key_triggers"] == facts
+    assert all(len(p["chunks"]) == 2 for p in merged["provenance"]["key_triggers"])
+
+
+def test_merger_reports_every_field():
+    merged = Merger().merge([{"key_triggers": ["Contract award in Q3"]}, {"error": "timeout"}])
+    assert merged["future_growth_prospects"] == []
+    assert merged["material_factors"] == []
+    assert merged["key_triggers"] == ["Contract award in Q3"]
+    assert merged["provenance"]["key_business_changes"] == []
+
+    empty = Merger().merge([])
+    assert empty == {
+        "future_growth_prospects": [],
+        "key_business_changes": [],
+        "key_triggers": [],
+        "material_factors": [],
+        "provenance": {
+            "future_growth_prospects": [],
+            "key_business_changes": [],
+            "key_triggers": [],
+            "material_factors": [],
+        },
+    }
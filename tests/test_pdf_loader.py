@@ -1,40 +1,30 @@
 import pytest
+from itertools import islice
 from pathlib import Path
 
-from src.pdf_investor_summarizer.pdf_loader import PdfLoader
+from pdfminer.high_level import extract_text
 
+from src.pdf_investor_summarizer.pdf_loader import PdfLoader, _extract_page_texts
 
-class FakePage:
-    pass
+ASSET_PDF = Path(__file__).parent / "assets" / "company_report.pdf"
 
 
-class FakeReader:
-    def __init__(self, path):
-        # Simulate a PDF with 2 pages
-        self.pages = [FakePage(), FakePage()]
-
-
-@pytest.fixture(autouse=True)
-def patch_pdf_reader(monkeypatch):
+def fake_pages(page_text):
     """
-    Stub out PdfReader so every PDF has 2 pages.
+    Build a stub for _extract_page_texts that simulates a PDF with 2 pages.
     """
-    monkeypatch.setattr(
-        'src.pdf_investor_summarizer.pdf_loader.PdfReader',
-        FakeReader
-    )
-    return monkeypatch
+    return lambda path: (page_text(i) for i in range(2))
 
 
 def test_loader_from_path(monkeypatch, tmp_path):
-    # Create a dummy PDF file (contents ignored by stubbed PdfReader)
+    # Create a dummy PDF file (contents ignored: page text extraction is stubbed below)
     pdf_file = tmp_path / 'test.pdf'
     pdf_file.write_bytes(b'%PDF-1.4 dummy')
 
     # Stub native text extraction to return page-specific text
     monkeypatch.setattr(
-        'src.pdf_investor_summarizer.pdf_loader.extract_text',
-        lambda path, page_numbers=None: f"text{page_numbers[0]}"
+        'src.pdf_investor_summarizer.pdf_loader._extract_page_texts',
+        fake_pages(lambda i: f"text{i}")
     )
 
     loader = PdfLoader(pdf_file)
@@ -43,49 +33,323 @@ def test_loader_from_path(monkeypatch, tmp_path):
     assert pages == ['text0', 'text1']
 
 
+class FakeStreamResponse:
+    """Streamed HTTP response yielding `body` in small blocks."""
+
+    def __init__(self, body, headers=None):
+        self.body = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), 3):
+            yield self.body[i:i + 3]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get(self, url, stream, timeout):
+        self.calls.append((url, stream, timeout))
+        return self.response
+
+
 def test_loader_from_url(monkeypatch):
-    # Prepare fake HTTP response with PDF bytes
-    fake_pdf = b'%PDF-1.4 dummy'
-    class FakeResponse:
-        def __init__(self):
-            self.content = fake_pdf
-        def raise_for_status(self):
-            pass
-
-    # Stub requests.get to return our fake response
-    monkeypatch.setattr(
-        'src.pdf_investor_summarizer.pdf_loader.requests.get',
-        lambda url: FakeResponse()
-    )
+    # Stream fake PDF bytes through a stubbed pooled session
+    session = FakeSession(FakeStreamResponse(b'%PDF-1.4 dummy'))
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader._http_session', lambda: session)
 
-    # Stub extract_text to return empty, forcing OCR fallback
-    monkeypatch.setattr(
-        'src.pdf_investor_summarizer.pdf_loader.extract_text',
-        lambda path, page_numbers=None: ""
-    )
+    # Stub text extraction to return empty, forcing OCR fallback
+    seen = []
+    def fake_extract(pdf):
+        seen.append(pdf.read())
+        return ("" for _ in range(2))
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader._extract_page_texts', fake_extract)
     # Stub OCR method to return predictable text
     monkeypatch.setattr(
         'src.pdf_investor_summarizer.pdf_loader.PdfLoader._ocr_page',
         lambda self, pg: f"ocr{pg}"
     )
 
-    loader = PdfLoader('http://example.com/report.pdf')
-    pages = loader.load()
+    with PdfLoader('http://example.com/report.pdf', http_timeout=5) as loader:
+        pages = loader.load()
 
     assert pages == ['ocr1', 'ocr2']
+    assert seen == [b'%PDF-1.4 dummy']
+    assert session.calls == [('http://example.com/report.pdf', True, 5)]
+    assert loader.pdf_path is None and loader.buffer.closed
+
+
+def test_loader_rejects_non_pdf_and_oversized_downloads(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    html = FakeStreamResponse(b'<html>sign in</html>', {"Content-Type": "text/html"})
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader._http_session', lambda: FakeSession(html))
+    with pytest.raises(ValueError, match="not a valid PDF.*text/html"):
+        PdfLoader('https://example.com/file')
+    # Nothing is dumped to the working directory
+    assert list(tmp_path.iterdir()) == []
+
+    big = FakeStreamResponse(b'%PDF' + b'x' * 100)
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader._http_session', lambda: FakeSession(big))
+    with pytest.raises(ValueError, match="byte limit"):
+        PdfLoader('https://example.com/big.pdf', max_download_bytes=50)
 
 
 def test_loader_from_bytes(monkeypatch):
     # Raw PDF bytes input
     data = b'%PDF-1.4 dummy'
 
-    # Stub extract_text to always return non-empty
+    # Stub text extraction to always return non-empty
     monkeypatch.setattr(
-        'src.pdf_investor_summarizer.pdf_loader.extract_text',
-        lambda path, page_numbers=None: 'hello'
+        'src.pdf_investor_summarizer.pdf_loader._extract_page_texts',
+        fake_pages(lambda i: 'hello')
+    )
+
+    # Bytes are parsed from memory, never written to a temp file
+    monkeypatch.setattr(
+        'src.pdf_investor_summarizer.pdf_loader.tempfile.NamedTemporaryFile',
+        lambda *a, **k: pytest.fail("temp file created")
     )
 
     loader = PdfLoader(data)
     pages = loader.load()
 
     assert pages == ['hello', 'hello']
+    assert loader.pdf_path is None
+
+
+def test_single_pass_matches_per_page_extract_text():
+    # The single-pass engine must return exactly what per-page extract_text did
+    pages = list(islice(_extract_page_texts(ASSET_PDF), 3))
+    expected = [extract_text(str(ASSET_PDF), page_numbers=[i]) for i in range(3)]
+    assert pages == expected
+
+
+def test_single_pass_reads_in_memory_buffers():
+    from io import BytesIO
+
+    from_buffer = list(islice(_extract_page_texts(BytesIO(ASSET_PDF.read_bytes())), 2))
+    assert from_buffer == list(islice(_extract_page_texts(ASSET_PDF), 2))
+
+
+def tesseract_data(words, conf):
+    """Minimal pytesseract.image_to_data dict: `words` on one line, then an empty block entry."""
+    n = len(words)
+    return {
+        "block_num": [1] * n + [2], "par_num": [1] * n + [1], "line_num": [1] * n + [0],
+        "text": list(words) + [""], "conf": [conf] * n + [-1],
+    }
+
+
+def test_page_ranges_batches_contiguous_pages():
+    from src.pdf_investor_summarizer.pdf_loader import _page_ranges
+
+    assert _page_ranges([5, 1, 2, 3, 7, 8], batch_size=2) == [(1, 2), (3, 3), (5, 5), (7, 8)]
+
+
+def test_parallel_ocr_keeps_page_order_and_survives_timeouts(monkeypatch, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    pdf_file = tmp_path / 'scan.pdf'
+    pdf_file.write_bytes(b'%PDF-1.4 dummy')
+    monkeypatch.setattr(
+        'src.pdf_investor_summarizer.pdf_loader._extract_page_texts',
+        lambda path: iter(["text1", "", "", "text4", "", ""])
+    )
+    rasterized = []
+
+    def fake_convert(path, dpi, first_page, last_page, **kwargs):
+        rasterized.append((first_page, last_page))
+        return [f"img{p}" for p in range(first_page, last_page + 1)]
+
+    def fake_ocr(image, lang, timeout, output_type):
+        if image == "img5":
+            raise RuntimeError("Tesseract process timeout")
+        return tesseract_data([f"ocr-{image}"], 95)
+
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.convert_from_path', fake_convert)
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.pytesseract.image_to_data', fake_ocr)
+    # Threads stand in for processes so the stubs above apply to the workers
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.os.cpu_count', lambda: 4)
+
+    pages = PdfLoader(pdf_file, ocr_workers=2, ocr_batch_size=4).load()
+
+    assert rasterized == [(2, 3), (5, 6)]
+    assert pages == ["text1", "ocr-img2", "ocr-img3", "text4", "", "ocr-img6"]
+
+
+def test_document_cache_skips_parsing_and_reuses_ocr(monkeypatch, tmp_path):
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+
+    store = cache_mod.DocumentCache(tmp_path / "documents")
+    monkeypatch.setattr(cache_mod, "_document_cache", store)
+    parsed = []
+    ocr_calls = []
+
+    def fake_extract(pdf):
+        parsed.append(1)
+        return iter(["text1", "", ""])
+
+    def fake_ocr(self, pg):
+        ocr_calls.append(pg)
+        if pg == 3 and ocr_calls.count(3) == 1:
+            self.ocr_failed.add(pg)  # first attempt times out
+            return ""
+        return f"ocr{pg}"
+
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader._extract_page_texts', fake_extract)
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.PdfLoader._ocr_page', fake_ocr)
+    data = b'%PDF-1.4 cached'
+
+    # A failed page is not cached, so neither is the document; page 2's OCR is
+    assert PdfLoader(data, use_cache=True).load() == ["text1", "ocr2", ""]
+    assert PdfLoader(data, use_cache=True).load() == ["text1", "ocr2", "ocr3"]
+    assert ocr_calls == [2, 3, 3]
+    assert parsed == [1, 1]
+
+    # Warm: no parsing, no OCR, for both load() and iter_pages()
+    assert PdfLoader(data, use_cache=True).load() == ["text1", "ocr2", "ocr3"]
+    assert list(PdfLoader(data, use_cache=True).iter_pages()) == ["text1", "ocr2", "ocr3"]
+    assert parsed == [1, 1]
+    assert all(p.name.endswith(".json.gz") for p in store.path.iterdir())
+
+    # Other OCR settings or content are different keys
+    PdfLoader(data, use_cache=True, ocr_dpi=150).load()
+    PdfLoader(b'%PDF-1.4 other', use_cache=True).load()
+    assert parsed == [1, 1, 1, 1]
+
+
+def test_layout_rendering_matches_text_converter_without_tables():
+    from src.pdf_investor_summarizer.pdf_loader import _extract_page_layouts, _find_tables, _render_layout
+
+    layouts = list(islice(_extract_page_layouts(ASSET_PDF), 5))
+    assert not any(_find_tables(ltpage) for ltpage in layouts)
+    assert [_render_layout(ltpage, [], "drop") for ltpage in layouts] == list(islice(_extract_page_texts(ASSET_PDF), 5))
+
+
+def test_tables_are_compacted_or_dropped():
+    from benchmarks.synthetic import build_pdf
+    from src.pdf_investor_summarizer.utils.profiler import Profiler
+
+    pdf = build_pdf(2, lines_per_page=3, table_every=2)
+    with PdfLoader(pdf) as loader:
+        kept = loader.load()
+    profiler = Profiler()
+    with PdfLoader(pdf, tables="compact", profiler=profiler) as loader:
+        compact = loader.load()
+    with PdfLoader(pdf, tables="drop") as loader:
+        dropped = loader.load()
+
+    # Text pages are untouched; the statement's label and figure columns are
+    # no longer flattened one after the other
+    assert compact[0] == dropped[0] == kept[0]
+    assert "Revenue\nCost of sales\n" in kept[1]
+    assert "2023 | 2022; Revenue | 12,345 | 11,020; Cost of sales | (7,210) | (6,540);" in compact[1]
+    assert "12,345" not in dropped[1] and "Revenue" not in dropped[1]
+    assert "Management expects operating margin" in dropped[1]
+    assert len(dropped[1]) < len(kept[1]) / 2
+    assert profiler.report()["counters"]["tables"] == 1
+    assert profiler.report()["counters"]["table_rows"] == 11
+
+    with pytest.raises(ValueError):
+        PdfLoader(pdf, tables="html")
+
+
+def test_text_quality_flags_glyph_noise():
+    from src.pdf_investor_summarizer.pdf_loader import _text_quality
+
+    assert _text_quality("Revenue grew 12% to EUR 4.2bn.\n\f") == 1.0
+    assert _text_quality("  \n\f") == 0.0
+    assert _text_quality("(cid:36)(cid:81)(cid:81)(cid:88)(cid:68)(cid:79) Report") < 0.2
+    assert _text_quality("Annual report \ufffd\ufffd 2023") > 0.8
+    # Separators that str.split treats as whitespace are not counted as noise
+    assert _text_quality("Revenue\x1cgrew\x1d12%\x1e\x1f") == 1.0
+
+
+def test_ocr_retries_low_confidence_pages_at_higher_dpi(monkeypatch, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.pdf_investor_summarizer.utils.profiler import Profiler
+
+    pdf_file = tmp_path / 'scan.pdf'
+    pdf_file.write_bytes(b'%PDF-1.4 dummy')
+    garbage = "(cid:3)(cid:4)(cid:5)(cid:6)(cid:7) x"
+    monkeypatch.setattr(
+        'src.pdf_investor_summarizer.pdf_loader._extract_page_texts',
+        lambda path: iter(["clean text layer", "", garbage, ""])
+    )
+    rasterized = []
+
+    def fake_convert(path, dpi, first_page, last_page, fmt, grayscale):
+        assert fmt == "ppm" and grayscale
+        rasterized.append((dpi, first_page, last_page))
+        return [(p, dpi) for p in range(first_page, last_page + 1)]
+
+    def fake_ocr(image, lang, timeout, output_type):
+        page, dpi = image
+        if page == 4:
+            raise RuntimeError("Tesseract process timeout")
+        # Page 2 is a faint scan: only legible at full resolution
+        conf = 40 if page == 2 and dpi < 300 else 92
+        return tesseract_data([f"page{page}", f"{dpi}dpi"], conf)
+
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.convert_from_path', fake_convert)
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.pytesseract.image_to_data', fake_ocr)
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.os.cpu_count', lambda: 4)
+
+    for workers in (1, 2):
+        rasterized.clear()
+        profiler = Profiler()
+        pages = PdfLoader(pdf_file, ocr_workers=workers, profiler=profiler).load()
+        # The garbage text layer is replaced, the failed page keeps its (empty) text layer
+        assert pages == ["clean text layer", "page2 300dpi", "page3 150dpi", ""]
+        assert sorted(rasterized) == (
+            [(150, 2, 2), (150, 3, 3), (150, 4, 4), (300, 2, 2)] if workers == 1 else [(150, 2, 4), (300, 2, 2)]
+        )
+        counters = profiler.report()["counters"]
+        assert counters["ocr_low_quality_pages"] == 1 and counters["ocr_retries"] == 1
+
+
+def test_buffered_sources_are_written_once_for_ocr(monkeypatch):
+    import os
+
+    monkeypatch.setattr(
+        'src.pdf_investor_summarizer.pdf_loader._extract_page_texts',
+        lambda pdf: iter(["", "text layer", ""])
+    )
+    rasterized = []
+
+    def fake_convert(path, dpi, first_page, last_page, fmt, grayscale):
+        with open(path, "rb") as f:
+            assert f.read() == b'%PDF-1.4 scanned'
+        rasterized.append((path, dpi))
+        return [f"img{p}" for p in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr('src.pdf_investor_summarizer.pdf_loader.convert_from_path', fake_convert)
+    # Low confidence: every page climbs the whole DPI ladder
+    monkeypatch.setattr(
+        'src.pdf_investor_summarizer.pdf_loader.pytesseract.image_to_data',
+        lambda image, lang, timeout, output_type: tesseract_data([image], 50)
+    )
+
+    for stream in (False, True):
+        rasterized.clear()
+        with PdfLoader(b'%PDF-1.4 scanned') as loader:
+            pages = list(loader.iter_pages()) if stream else loader.load()
+            assert pages == ["img1", "text layer", "img3"]
+            assert [dpi for _, dpi in rasterized] == [150, 300, 150, 300]
+            # One temporary copy for all rasterizations, gone once OCR is done
+            assert len({path for path, _ in rasterized}) == 1
+            assert not os.path.exists(rasterized[0][0])
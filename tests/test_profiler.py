@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from src.pdf_investor_summarizer.utils.profiler import Profiler, metrics_to_json, metrics_to_prometheus, time_llm_call
+
+
+def test_profiler_stages_latency_percentiles_and_caches():
+    profiler = Profiler()
+    with profiler.stage("clean"):
+        pass
+    with profiler.stage("clean"):
+        pass
+    profiler.latencies.extend(i / 100 for i in range(1, 101))
+    profiler.incr("pages", 3)
+    stats = {"hits": 2, "misses": 5}
+    profiler.watch_cache("llm", lambda: stats)
+    stats = {"hits": 5, "misses": 6}
+
+    report = profiler.report()
+
+    assert set(report["stages"]) == {"clean"}
+    assert report["llm_latency"]["count"] == 100
+    assert report["llm_latency"]["p50"] == 0.5 and report["llm_latency"]["p99"] == 0.99
+    assert report["cache"]["llm"] == {"hits": 3, "misses": 1, "hit_ratio": 0.75}
+    assert report["counters"] == {"pages": 3}
+    assert json.loads(metrics_to_json(report)) == report
+
+
+def test_llm_calls_report_to_the_active_profiler_only():
+    profiler = Profiler()
+
+    async def call():
+        with time_llm_call():
+            await asyncio.sleep(0)
+
+    async def run():
+        with profiler.activate():
+            await asyncio.gather(call(), call())
+        await call()
+
+    asyncio.run(run())
+    assert len(profiler.latencies) == 2
+
+
+def test_prometheus_export():
+    profiler = Profiler()
+    profiler.stages["ocr"] = 1.5
+    profiler.latencies.append(0.25)
+    profiler.incr("prompt_tokens", 120)
+
+    text = metrics_to_prometheus(profiler.report(), labels={"document": 'a "b".pdf'})
+
+    assert '# TYPE pdf_summarizer_stage_seconds gauge' in text
+    assert 'pdf_summarizer_stage_seconds{document="a \\"b\\".pdf",stage="ocr"} 1.5' in text
+    assert 'pdf_summarizer_llm_latency_seconds{document="a \\"b\\".pdf",quantile="0.5"} 0.25' in text
+    assert 'pdf_summarizer_llm_latency_seconds_count{document="a \\"b\\".pdf"} 1' in text
+    assert 'pdf_summarizer_prompt_tokens_total{document="a \\"b\\".pdf"} 120' in text
+
+
+def test_analysis_result_carries_metrics(monkeypatch, tmp_path):
+    from src.pdf_investor_summarizer.report_analyzer import ReportAnalyzer
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+
+    class SlowLLM:
+        async def ainvoke(self, prompt):
+            await asyncio.sleep(0.01)
+
+            class DummyResponse:
+                content = '{"future_growth_prospects": ["x"], "key_business_changes": [], "key_triggers": [], "material_factors": []}'
+                response_metadata = {"usage": {"completion_tokens": 4}}
+            return DummyResponse()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.count_tokens_batch",
+        lambda texts, model=None: [len(t.split()) for t in texts]
+    )
+    cache_mod.configure_cache(path=tmp_path)
+    try:
+        analyzer = ReportAnalyzer()
+        analyzer.extractor.llm = SlowLLM()
+        chunks = ["first chunk", "second chunk", "first chunk"]
+        metrics = asyncio.run(analyzer.analyze_chunks_async(chunks))["metrics"]
+    finally:
+        cache_mod._cache = None
+
+    # The repeated chunk is coalesced or served from cache, so two real requests
+    assert metrics["llm_latency"]["count"] == 2
+    assert metrics["llm_latency"]["p50"] >= 0.01
+    assert metrics["counters"]["completion_tokens"] == 12
+    assert {"extract", "merge"} <= set(metrics["stages"])
+    assert metrics["cache"]["llm"]["misses"] >= 2
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from pathlib import Path
+
+from src.pdf_investor_summarizer.relevance import RelevanceFilter
+
+FIXTURES = json.loads((Path(__file__).parent / "assets" / "relevance_fixtures.json").read_text(encoding="utf-8"))
+
+
+def test_relevance_filter_separates_labeled_fixtures():
+    relevance = RelevanceFilter()
+    for fixture in FIXTURES:
+        assert relevance.is_relevant(fixture["text"]) == fixture["relevant"], fixture["kind"]
+
+    kept = relevance.select([fixture["text"] for fixture in FIXTURES])
+    assert relevance.record(kept, [100] * len(kept)) == {"skipped": 7, "tokens_avoided": 700}
+    assert relevance.stats == {"chunks": 14, "skipped": 7, "tokens_avoided": 700}
+
+
+def test_contents_entries_are_found_in_cleaned_text():
+    from src.pdf_investor_summarizer.relevance import _toc_entries
+    from src.pdf_investor_summarizer.text_cleaner import TextCleaner
+
+    page = "Strategic report\nChair's statement        4\nFinancial review        22\nRisk management        28"
+    cleaned = TextCleaner().clean_pages([page])[0]
+    assert "  " not in cleaned
+    assert _toc_entries(cleaned) == 3
+    # Dates, figures and the odd numbered name in prose are not contents entries
+    assert _toc_entries("On 14 March the Group sold its plant in Turin for EUR 40m, up 12% from 2022.") == 0
+    assert _toc_entries("Segment 3 Revenue was flat at EUR 212m, while Phase 2 Expansion of the Porto site began in May.") == 0
+
+
+def test_analyzer_skips_llm_calls_for_irrelevant_chunks(monkeypatch, tmp_path):
+    from src.pdf_investor_summarizer.report_analyzer import ReportAnalyzer
+    from src.pdf_investor_summarizer.utils import cache as cache_mod
+
+    prompts = []
+
+    class RecordingLLM:
+        async def ainvoke(self, prompt):
+            prompts.append(prompt)
+
+            class DummyResponse:
+                content = '{"future_growth_prospects": ["Revenue growth of 6-8% expected"], "key_business_changes": [], "key_triggers": [], "material_factors": []}'
+                response_metadata = {"usage": {"completion_tokens": 4}}
+            return DummyResponse()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.count_tokens_batch",
+        lambda texts, model=None: [len(t.split()) for t in texts]
+    )
+    chunks = [fixture["text"] for fixture in FIXTURES]
+    relevant = [fixture["text"] for fixture in FIXTURES if fixture["relevant"]]
+    cache_mod.configure_cache(path=tmp_path)
+    try:
+        analyzer = ReportAnalyzer(relevance_threshold=1.0)
+        analyzer.extractor.llm = RecordingLLM()
+        result = asyncio.run(analyzer.analyze_chunks_async(chunks, pages=[[i] for i in range(len(chunks))]))
+    finally:
+        cache_mod._cache = None
+
+    assert len(prompts) == len(relevant)
+    assert all(any(text in prompt for text in relevant) for prompt in prompts)
+    counters = result["metrics"]["counters"]
+    assert counters["relevance_skipped_chunks"] == len(chunks) - len(relevant)
+    skipped_prompts = [analyzer.extractor.render_prompt(fixture["text"]) for fixture in FIXTURES if not fixture["relevant"]]
+    assert counters["relevance_tokens_avoided"] == sum(len(p.split()) for p in skipped_prompts)
+    assert result["usage"]["total_prompt_tokens"] == sum(len(analyzer.extractor.render_prompt(t).split()) for t in relevant)
+    # Provenance still refers to positions in the full chunk list
+    assert result["provenance"]["future_growth_prospects"] == [{"chunks": [0, 1, 2, 3, 4, 5, 6], "pages": [0, 1, 2, 3, 4, 5, 6]}]
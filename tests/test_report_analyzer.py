@@ -7,7 +7,7 @@ def test_pipeline_on_dummy_text(monkeypatch):
     # Patch PdfLoader.__init__ to accept any source without error
     monkeypatch.setattr(
         "src.pdf_investor_summarizer.pdf_loader.PdfLoader.__init__",
-        lambda self, source, ocr_lang='eng', ocr_dpi=300: None
+        lambda self, source, ocr_lang='eng', ocr_dpi=300, **kwargs: None
     )
     # Patch PdfLoader.load to return predictable pages
     monkeypatch.setattr(
@@ -25,3 +25,119 @@ def test_pipeline_on_dummy_text(monkeypatch):
         "key_triggers", "material_factors", "evidence"
     ]:
         assert key in summary
+
+
+def test_streaming_dispatches_chunks_before_loading_finishes(monkeypatch):
+    """
+    In streaming mode the first LLM request starts while later pages are still loading.
+    """
+    import asyncio
+    import threading
+    import time
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    events = []
+
+    def fake_iter_pages(self):
+        for i in range(4):
+            time.sleep(0.05)
+            events.append(f"page{i}")
+            yield f"Revenue guidance for segment {i} was raised significantly."
+
+    async def fake_aextract(chunk):
+        events.append("extract")
+        return {"future_growth_prospects": [chunk], "usage": {"completion_tokens": 1}}
+
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.PdfLoader.__init__",
+        lambda self, source, profiler=None: None
+    )
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.PdfLoader.iter_pages",
+        fake_iter_pages
+    )
+    counting_threads = set()
+
+    def fake_count_tokens_batch(texts, model=None):
+        counting_threads.add(threading.current_thread())
+        return [len(text.split()) for text in texts]
+
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.count_tokens_batch",
+        fake_count_tokens_batch
+    )
+    analyzer = ReportAnalyzer(chunk_size=60, overlap=0, streaming=True)
+    monkeypatch.setattr(analyzer.extractor, "aextract", fake_aextract)
+
+    result = asyncio.run(analyzer.analyze_async("dummy.pdf"))
+
+    assert events.index("extract") < events.index("page3")
+    # Per-chunk token counting stays off the event loop thread
+    assert counting_threads and threading.main_thread() not in counting_threads
+    assert result["future_growth_prospects"][0].startswith("Revenue guidance for segment 0")
+    assert result["usage"]["total_completion_tokens"] == events.count("extract")
+    # Page provenance survives streaming, as in the non-streaming path
+    assert result["provenance"]["future_growth_prospects"][0] == {"chunks": [0], "pages": [0, 1]}
+
+
+def test_concurrent_analyses_keep_event_loop_responsive(monkeypatch):
+    """
+    Loading runs off the event loop: concurrent documents overlap and other
+    tasks keep running while PDFs are parsed.
+    """
+    import asyncio
+    import time
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    def slow_load(self):
+        time.sleep(0.3)
+        return [f"Revenue guidance for {self.source} was raised significantly this year."]
+
+    async def fake_aextract(chunk):
+        return {"future_growth_prospects": [chunk.split(" was ")[0]], "usage": {"completion_tokens": 1}}
+
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.PdfLoader.__init__",
+        lambda self, source, profiler=None: setattr(self, "source", source)
+    )
+    monkeypatch.setattr("src.pdf_investor_summarizer.report_analyzer.PdfLoader.load", slow_load)
+    monkeypatch.setattr(
+        "src.pdf_investor_summarizer.report_analyzer.count_tokens_batch",
+        lambda texts, model=None: [len(t.split()) for t in texts]
+    )
+    analyzer = ReportAnalyzer(chunk_size=200, overlap=0)
+    monkeypatch.setattr(analyzer.extractor, "aextract", fake_aextract)
+
+    async def run():
+        gaps = []
+
+        async def ticker():
+            last = time.perf_counter()
+            while True:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        tick = asyncio.ensure_future(ticker())
+        started = time.perf_counter()
+        results = await asyncio.gather(*(analyzer.analyze_async(f"report-{i}.pdf") for i in range(4)))
+        elapsed = time.perf_counter() - started
+        tick.cancel()
+        return results, elapsed, max(gaps)
+
+    results, elapsed, max_gap = asyncio.run(run())
+
+    assert elapsed < 0.9  # 4 x 0.3s of loading, overlapped
+    assert max_gap < 0.2
+    assert [r["future_growth_prospects"] for r in results] == [[f"Revenue guidance for report-{i}.pdf"] for i in range(4)]
+    # Stage timings recorded by the worker are merged into each document's metrics
+    assert results[0]["metrics"]["stages"]["load"] >= 0.3
+    assert results[0]["metrics"]["counters"]["chunks"] == 1
+
+
+def test_clean_workers_reach_the_cleaner(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    assert ReportAnalyzer().cleaner.workers == 1
+    assert ReportAnalyzer(clean_workers=3).cleaner.workers == 3
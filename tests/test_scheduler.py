@@ -0,0 +1,198 @@
+import asyncio
+import random
+
+import pytest
+
+from src.pdf_investor_summarizer.scheduler import LLMScheduler, RateLimiter
+
+
+class FakeRateLimitError(Exception):
+    pass
+
+
+class FakeLLM:
+    """Local stand-in for Extractor.aextract with latency, failures and concurrency tracking."""
+
+    def __init__(self, failures_per_chunk: int = 0):
+        self.failures_per_chunk = failures_per_chunk
+        self.attempts = {}
+        self.active = 0
+        self.max_active = 0
+
+    async def aextract(self, chunk: str) -> dict:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(random.uniform(0, 0.01))
+            self.attempts[chunk] = self.attempts.get(chunk, 0) + 1
+            if self.attempts[chunk] <= self.failures_per_chunk:
+                raise FakeRateLimitError("429 Too Many Requests")
+            return {"key_triggers": [chunk]}
+        finally:
+            self.active -= 1
+
+
+def test_map_caps_concurrency_and_keeps_order():
+    llm = FakeLLM()
+    scheduler = LLMScheduler(max_concurrency=3)
+    chunks = [f"chunk{i}" for i in range(30)]
+
+    results = asyncio.run(scheduler.map(llm.aextract, chunks))
+
+    assert [r["key_triggers"][0] for r in results] == chunks
+    assert llm.max_active <= 3
+
+
+def test_failures_are_retried_with_backoff():
+    llm = FakeLLM(failures_per_chunk=2)
+    scheduler = LLMScheduler(max_concurrency=4, base_delay=0.001, max_delay=0.01, retry_on=(FakeRateLimitError,))
+
+    results = asyncio.run(scheduler.map(llm.aextract, ["a", "b", "c"]))
+
+    assert [r["key_triggers"] for r in results] == [["a"], ["b"], ["c"]]
+    assert scheduler.stats["retries"] == 6
+    assert scheduler.stats["calls"] == 9
+
+
+def test_retries_are_bounded():
+    llm = FakeLLM(failures_per_chunk=10)
+    scheduler = LLMScheduler(max_retries=2, base_delay=0.001, retry_on=(FakeRateLimitError,))
+
+    with pytest.raises(FakeRateLimitError):
+        asyncio.run(scheduler.submit(llm.aextract, "x"))
+    assert llm.attempts["x"] == 3
+    assert scheduler.stats["failures"] == 1
+
+
+def test_only_transient_api_errors_are_retried_by_default():
+    import httpx
+    import openai
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    errors = {
+        "rate limited": openai.RateLimitError("429", response=httpx.Response(429, request=request), body=None),
+        "timeout": openai.APITimeoutError(request=request),
+        "server error": openai.InternalServerError("502", response=httpx.Response(502, request=request), body=None),
+        "bad request": openai.BadRequestError("context length", response=httpx.Response(400, request=request), body=None),
+        "bug": KeyError("usage"),
+    }
+    attempts = {}
+
+    async def flaky(name):
+        attempts[name] = attempts.get(name, 0) + 1
+        if attempts[name] == 1:
+            raise errors[name]
+        return name
+
+    async def run(name):
+        try:
+            return await scheduler.submit(flaky, name)
+        except Exception as e:
+            return type(e).__name__
+
+    async def run_all():
+        return await asyncio.gather(*(run(name) for name in errors))
+
+    scheduler = LLMScheduler(base_delay=0.001)
+    results = asyncio.run(run_all())
+    assert results == ["rate limited", "timeout", "server error", "BadRequestError", "KeyError"]
+    assert attempts == {"rate limited": 2, "timeout": 2, "server error": 2, "bad request": 1, "bug": 1}
+
+
+def test_backoff_is_exponential_and_capped():
+    scheduler = LLMScheduler(base_delay=1.0, max_delay=5.0)
+    for attempt in range(6):
+        assert 0 <= scheduler.backoff(attempt) <= min(5.0, 2 ** attempt)
+
+
+def test_rate_limiter_waits_for_budget():
+    async def run():
+        limiter = RateLimiter(limit=10, period=0.2)
+        waits = [await limiter.acquire(5) for _ in range(3)]
+        return waits
+
+    waits = asyncio.run(run())
+    # The bucket starts full: two immediate grants, then ~0.1s for 5 more units
+    assert waits[0] == 0 and waits[1] == 0
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+
+
+class FakeBatchExtractor:
+    """Stand-in for Extractor's single and batched async calls; chunks containing "drop" are left out of batches."""
+
+    model = "gpt-3.5-turbo"
+
+    def __init__(self, cached=None):
+        self.single_calls = []
+        self.batch_calls = []
+        self.cached = cached or {}
+
+    def render_prompt(self, chunk: str) -> str:
+        return "template " * 10 + chunk
+
+    def cached_batch_results(self, chunks) -> list:
+        return [self.cached.get(c) for c in chunks]
+
+    def render_batch_prompt(self, chunks) -> str:
+        return "template " * 12 + " ".join(chunks)
+
+    async def aextract(self, chunk: str) -> dict:
+        self.single_calls.append(chunk)
+        return {"key_triggers": [chunk]}
+
+    async def aextract_batch(self, chunks) -> list:
+        self.batch_calls.append(list(chunks))
+        return [{"error": "missing"} if "drop" in c else {"key_triggers": [c]} for c in chunks]
+
+
+def test_chunk_batcher_packs_small_chunks(monkeypatch):
+    from src.pdf_investor_summarizer import scheduler as scheduler_mod
+    from src.pdf_investor_summarizer.scheduler import ChunkBatcher
+
+    monkeypatch.setattr(scheduler_mod, "count_tokens", lambda text, model=None: len(text.split()))
+    ext = FakeBatchExtractor()
+    batcher = ChunkBatcher(ext, LLMScheduler(max_concurrency=2), max_tokens=10, max_sections=4)
+    chunks = [f"c{i}" for i in range(9)] + ["drop me", "big " * 8]
+
+    async def run():
+        return await asyncio.gather(*(batcher.extract(c, len(c.split())) for c in chunks))
+
+    results = asyncio.run(run())
+
+    assert [r["key_triggers"] for r, _ in results] == [[c] for c in chunks]
+    # 10 small chunks (11 tokens) -> 3 batches of at most 4 sections; the oversized one goes alone
+    assert [len(b) for b in ext.batch_calls] == [4, 4, 2]
+    assert sorted(ext.single_calls) == ["big " * 8, "drop me"]
+    # Each chunk is charged its own tokens plus a share of the batch template overhead
+    assert results[0][1] == round(1 + (12 + 4 - 4) / 4)
+    # The failed section also carries the prompt of its retry
+    assert results[9][1] == round(2 + (12 + 3 - 3) / 2) + 10 + 2
+    assert batcher.stats == {"requests": 5, "batched_requests": 3, "batched_chunks": 10}
+
+
+def test_chunk_batcher_charges_only_sent_sections(monkeypatch):
+    from src.pdf_investor_summarizer import scheduler as scheduler_mod
+    from src.pdf_investor_summarizer.scheduler import ChunkBatcher
+
+    monkeypatch.setattr(scheduler_mod, "count_tokens", lambda text, model=None: len(text.split()))
+    cached = {f"c{i}": {"key_triggers": [f"cached {i}"], "usage": {}} for i in range(4)}
+    ext = FakeBatchExtractor(cached=cached)
+    scheduler = LLMScheduler(max_concurrency=2)
+    batcher = ChunkBatcher(ext, scheduler, max_tokens=10, max_sections=4)
+
+    async def run(chunks):
+        return await asyncio.gather(*(batcher.extract(c, 1) for c in chunks))
+
+    # A fully cached batch sends nothing and reports no prompt tokens
+    results = asyncio.run(run([f"c{i}" for i in range(4)]))
+    assert [r["key_triggers"] for r, _ in results] == [[f"cached {i}"] for i in range(4)]
+    assert [tokens for _, tokens in results] == [0, 0, 0, 0]
+    assert ext.batch_calls == [] and ext.single_calls == []
+    assert scheduler.stats["calls"] == 0
+    assert batcher.stats == {"requests": 0, "batched_requests": 0, "batched_chunks": 0}
+
+    # Only the misses of a partly cached batch are sent and charged
+    results = asyncio.run(run(["c0", "c1", "x1", "x2"]))
+    assert ext.batch_calls == [["x1", "x2"]]
+    assert [tokens for _, tokens in results] == [0, 0, round(1 + (12 + 2 - 2) / 2), round(1 + (12 + 2 - 2) / 2)]
+    assert batcher.stats == {"requests": 1, "batched_requests": 1, "batched_chunks": 2}
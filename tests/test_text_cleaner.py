@@ -43,3 +43,113 @@ def test_clean_pages_applies_to_each_page():
     assert isinstance(result, list)
     assert result[0] == "Line1 Line2"
     assert result[1] == "Valid content"
+
+
+def test_keep_paragraphs_separates_paragraphs_with_newlines():
+    raw = "First paragraph line one\nline two of first\n\n3\n\nSecond paragraph here\n"
+    assert TextCleaner(min_line_length=5).clean(raw) == (
+        "First paragraph line one line two of first Second paragraph here"
+    )
+    assert TextCleaner(min_line_length=5, keep_paragraphs=True).clean(raw) == (
+        "First paragraph line one line two of first\nSecond paragraph here"
+    )
+
+
+def legacy_clean(text, min_line_length=10, keep_paragraphs=False):
+    """The original per-line regex cleaner, kept as the reference for equivalence."""
+    import re
+
+    pieces = []
+    new_paragraph = False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            new_paragraph = True
+            continue
+        if re.compile(r"^\s*\d+\s*$").match(stripped):
+            continue
+        if len(stripped) < min_line_length:
+            continue
+        normalized = re.sub(r"\s+", " ", stripped)
+        if pieces:
+            pieces.append("\n" if keep_paragraphs and new_paragraph else " ")
+        pieces.append(normalized)
+        new_paragraph = False
+    return "".join(pieces)
+
+
+def equivalence_corpus():
+    import random
+    from itertools import islice
+    from pathlib import Path
+
+    from src.pdf_investor_summarizer.pdf_loader import _extract_page_texts
+
+    asset = Path(__file__).parent / "assets" / "company_report.pdf"
+    corpus = list(islice(_extract_page_texts(asset), 5))
+    corpus += [
+        "", "\n\n", "   ", "12", " 12 \n", "١٢٣\n", "²³\n", "12 34\n", "Revenue  grew by 5%",
+        "line one\r\nline two\rline three\x0bfour\x0cfive\x1csix\x1dseven\x1eeight\x85nine ten eleven",
+        "tab\tseparated\x1fvalues here\n\n\n   \t\nnext paragraph text\n  　 \nlast one",
+    ]
+    rng = random.Random(42)
+    alphabet = list("abcdefghij0123456789 .,") + [
+        "\n", "\n\n", "\r\n", "\t", "\x0b", "\x0c", "\x1c", "\x1f", "\x85", " ", " ", "　", "٣", "²",
+    ]
+    corpus += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 400))) for _ in range(300)]
+    return corpus
+
+
+def test_clean_is_byte_identical_to_legacy_cleaner():
+    corpus = equivalence_corpus()
+    for min_line_length in (0, 1, 6, 10):
+        for keep_paragraphs in (False, True):
+            cleaner = TextCleaner(min_line_length=min_line_length, keep_paragraphs=keep_paragraphs)
+            for page in corpus:
+                assert cleaner.clean(page) == legacy_clean(page, min_line_length, keep_paragraphs), repr(page)
+
+
+def test_parallel_clean_pages_matches_serial(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.pdf_investor_summarizer import text_cleaner
+
+    # Threads stand in for processes; the batching path is what is under test
+    monkeypatch.setattr(text_cleaner, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(text_cleaner, "PARALLEL_MIN_PAGES", 2)
+    pages = equivalence_corpus()
+    assert TextCleaner(workers=4).clean_pages(pages) == TextCleaner().clean_pages(pages)
+
+
+def test_strip_boilerplate_removes_lines_repeated_across_pages(monkeypatch):
+    from src.pdf_investor_summarizer import text_cleaner
+    from src.pdf_investor_summarizer.utils.profiler import Profiler
+
+    monkeypatch.setattr(text_cleaner, "count_tokens", lambda text: len(text.split()))
+    pages = [
+        f"ACME Holdings plc  Annual Report 2023\nOperating margin held steady.\n"
+        f"Revenue line number {i} grew strongly.\nCash conversion stayed above {90 + i}%.\n"
+        f"Page {i + 1} of 6\nThis document is not an offer of securities."
+        for i in range(6)
+    ]
+    pages[2] = pages[2].replace("Cash conversion", "ACME Holdings plc is mentioned in the body.\nCash conversion")
+
+    profiler = Profiler()
+    cleaned = TextCleaner(strip_boilerplate=True).clean_pages(pages, profiler=profiler)
+    # Repeated body lines go too, but lines differing in a figure only match at page edges
+    assert cleaned[0] == "Revenue line number 0 grew strongly. Cash conversion stayed above 90%."
+    assert cleaned[2] == (
+        "Revenue line number 2 grew strongly. ACME Holdings plc is mentioned in the body. "
+        "Cash conversion stayed above 92%."
+    )
+    counters = profiler.report()["counters"]
+    assert counters["boilerplate_lines"] == 24
+    assert counters["boilerplate_chars"] == 6 * (
+        len("ACME Holdings plc Annual Report 2023") + len("Operating margin held steady.")
+        + len("Page 1 of 6") + len("This document is not an offer of securities.") + 4
+    )
+    assert counters["boilerplate_tokens"] > 0
+
+    # Off by default, and a line must repeat on enough pages to count
+    assert TextCleaner().clean_pages(pages) == [TextCleaner().clean(page) for page in pages]
+    assert TextCleaner(strip_boilerplate=True, boilerplate_min_pages=7).clean_pages(pages) == TextCleaner().clean_pages(pages)